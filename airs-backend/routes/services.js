@@ -7,9 +7,48 @@ const { getRandomFloat, getRandomInt } = require('../utils/helpers');
 
 const router = express.Router();
 
+const REMEDIATION_FILTERS = {
+  in_progress: service => service.remediationInProgress,
+  awaiting: service => service.awaitingRemediation,
+  none: service => !service.remediationInProgress && !service.awaitingRemediation
+};
+
 // Get all services overview
+// Optional filters: status (comma-separated), remediation (in_progress | awaiting | none),
+// name_prefix (case-insensitive), plus limit/offset paging. Filtered or paged responses
+// report the number of matching services in the X-Total-Count header.
 router.get('/services', (req, res) => {
-  const services = getAllServices().map(service => ({
+  const { status, remediation, name_prefix: namePrefix, limit, offset } = req.query;
+  let services = getAllServices();
+
+  if (status) {
+    const statuses = new Set(String(status).split(',').map(s => s.trim()).filter(Boolean));
+    services = services.filter(service => statuses.has(service.status));
+  }
+
+  if (remediation) {
+    const matches = REMEDIATION_FILTERS[remediation];
+    if (!matches) {
+      return res.status(400).json({ error: `Unknown remediation filter: ${remediation}` });
+    }
+    services = services.filter(matches);
+  }
+
+  if (namePrefix) {
+    const prefix = String(namePrefix).toLowerCase();
+    services = services.filter(service => service.name.toLowerCase().startsWith(prefix));
+  }
+
+  const total = services.length;
+  const start = Math.max(0, parseInt(offset, 10) || 0);
+  const end = limit !== undefined ? start + Math.max(0, parseInt(limit, 10) || 0) : undefined;
+  services = services.slice(start, end);
+
+  if (status || remediation || namePrefix || limit !== undefined || offset !== undefined) {
+    res.set('X-Total-Count', String(total));
+  }
+
+  res.json(services.map(service => ({
     id: service.id,
     name: service.name,
     status: service.status,
@@ -17,9 +56,7 @@ router.get('/services', (req, res) => {
     awaitingRemediation: service.awaitingRemediation,
     instanceCount: service.instanceCount,
     lastIncident: service.lastIncident
-  }));
-  
-  res.json(services);
+  })));
 });
 
 // Get detailed metrics and logs for a specific service
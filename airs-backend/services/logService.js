@@ -43,12 +43,14 @@ function analyzeLogs(service) {
     rootCause = 'general_performance_issue';
   }
 
+  // Small fields first and the error list last, so clients streaming the
+  // response can stop reading after the first few errors
   return {
-    recent_errors: recentErrors,
+    root_cause: rootCause,
     patterns: [...new Set(patterns)],
     suggested_actions: [...new Set(suggestedActions)],
-    root_cause: rootCause,
-    analysis_timestamp: new Date().toISOString()
+    analysis_timestamp: new Date().toISOString(),
+    recent_errors: recentErrors
   };
 }
 
@@ -1,17 +1,28 @@
 # diagnostic_tools/health_checker.py
-from typing import Any, Tuple
-import requests
+from typing import Any, Optional
+import httpx
 import re
-import json
-from urllib.parse import urlparse
 from langflow.custom import Component
 from langflow.io import MessageTextInput, Output
 from langflow.schema import Message
 
+from airs_common.concurrency import gather_bounded, run_sync
+from airs_common.http_client import get_async_client
+from airs_common.instrumentation import instrumented, mark_failed, timed, timed_request, timing_summary
+from airs_common.metric_history import metric_history, record_metrics_response
+from airs_common.response_cache import MISSING, response_cache
+from airs_common.serialization import dumps, loads
+from airs_common.service_resolver import resolve_service_id
+from airs_common.thresholds import get_threshold_profiles
+from airs_common.url_validation import validate_backend_url
+
+METRIC_ICONS = {"HEALTHY": "🟢", "WARNING": "🟡", "CRITICAL": "🔴", "UNKNOWN": "⚪"}
+SEVERITY_ORDER = ['healthy', 'warning', 'critical']
+
 
 class HealthChecker(Component):
     display_name = "Health Checker"
-    description = "Check service health status and metrics. Use when you need to know current service state."
+    description = "Check service health status and metrics for one service or all services. Use when you need to know current service state."
     icon = "activity"
     name = "HealthChecker"
 
@@ -25,7 +36,7 @@ class HealthChecker(Component):
         MessageTextInput(
             name="service_input",
             display_name="Service Identifier",
-            info="Service ID or name to check health (e.g., 'S1', 'Payment Gateway')",
+            info="Service ID or name to check health (e.g., 'S1', 'Payment Gateway'), or 'all services' for a fleet-wide sweep",
             tool_mode=True,
             value="Check health of service S1"
         )
@@ -35,7 +46,7 @@ class HealthChecker(Component):
         Output(
             display_name="Health Report",
             name="health_report",
-            method="get_health_report"
+            method="get_health_report_async"
         )
     ]
 
@@ -45,79 +56,42 @@ class HealthChecker(Component):
 
     def _validate_backend_url(self, url: str) -> str:
         """Validate and sanitize backend URL"""
-        if not url:
-            raise ValueError("Backend URL cannot be empty")
-        
-        # Basic URL format validation
-        if not re.match(r'^https?://', url):
-            raise ValueError("Backend URL must start with http:// or https://")
-        
-        parsed = urlparse(url)
-        
-        # Security validations
-        if parsed.scheme not in ['http', 'https']:
-            raise ValueError("Invalid URL scheme. Must be http or https")
-        
-        if not parsed.hostname:
-            raise ValueError("Invalid URL: missing hostname")
-        
-        # Prevent credential leakage in URLs
-        if parsed.username or parsed.password:
-            raise ValueError("URL must not contain username or password")
-        
-        # Prevent potentially dangerous URL components
-        if parsed.query or parsed.fragment:
-            raise ValueError("URL must not contain query parameters or fragments")
-        
-        # Basic port validation
-        if parsed.port and (parsed.port < 1 or parsed.port > 65535):
-            raise ValueError("Invalid port number")
-        
-        return url.rstrip('/')
+        return validate_backend_url(url)
 
-    def _extract_service_id(self, user_input: str) -> str:
-        """Extract service ID from natural language input"""
-        input_lower = user_input.lower()
-        
-        # Look for service IDs like S1, S2, etc.
-        service_id_match = re.search(r'\b(S[1-9]\d*)\b', input_lower.upper())
-        if service_id_match:
-            return service_id_match.group(1)
-        
-        # Map common service names to IDs
-        service_mapping = {
-            'payment': 'S1',
-            'auth': 'S2', 
-            'user auth': 'S2',
-            'inventory': 'S3',
-            'reporting': 'S4',
-            'search': 'S5',
-            'log': 'S6'
-        }
-        
-        for key, service_id in service_mapping.items():
-            if key in input_lower:
-                return service_id
-        
-        # Default to S1 if no match
-        return "S1"
+    async def _extract_service_id(self, user_input: str) -> Optional[str]:
+        """Extract service ID from natural language input, or None if no service is named"""
+        backend_url = self._validate_backend_url(self.backend_url)
+        return await resolve_service_id(
+            backend_url, user_input, lambda: self._make_api_call("/services")
+        )
 
-    def _make_api_call(self, endpoint: str) -> Any:
+    async def _make_api_call(self, endpoint: str) -> Any:
         """Make API call to backend with error handling"""
         # Validate URL first
-        backend_url = self._validate_backend_url(self.backend_url)
+        with timed("validate_url"):
+            backend_url = self._validate_backend_url(self.backend_url)
         url = f"{backend_url}/api{endpoint}"
         
+        # Serve recently fetched documents from the shared cache
+        cached = response_cache.get(url)
+        if cached is not MISSING:
+            return cached
+        
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError:
+            with timed_request("GET", endpoint):
+                response = await get_async_client(backend_url).get(url, timeout=self.timeout)
+                response.raise_for_status()
+            with timed("parse"):
+                data = loads(response.content)
+            response_cache.set(url, data)
+            record_metrics_response(backend_url, endpoint, data)
+            return data
+        except httpx.ConnectError:
             # Sanitized error message - no URL exposure
             raise ConnectionError("Cannot connect to AIRS backend service")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise TimeoutError(f"Backend request timed out after {self.timeout} seconds")
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             # Sanitized - only status code, no URL
             if e.response.status_code == 404:
                 raise ValueError("Service not found")
@@ -126,83 +100,177 @@ class HealthChecker(Component):
             # Generic error without backend details
             raise Exception(f"Error communicating with backend service")
 
-    def _assess_metric_health(self, metric_name: str, value: float) -> Tuple[str, str]:
-        """Assess individual metric health"""
-        thresholds = {
-            'cpu': {'warn': 70, 'crit': 85},
-            'memory': {'warn': 75, 'crit': 90},
-            'latency': {'warn': 300, 'crit': 500},
-            'error_rate': {'warn': 5, 'crit': 10}
+    def _is_fleet_request(self, user_input: str) -> bool:
+        """Check whether the input asks about every service rather than one"""
+        return bool(re.search(r'\b(all|every|everything|fleet|overall)\b', user_input.lower()))
+
+    def _build_service_report(
+        self, service_id: str, service_data: dict[str, Any], levels: Optional[dict[str, str]] = None
+    ) -> dict[str, Any]:
+        """Build the health report entry for a single service.
+
+        levels are the service's metric levels when already classified as part of a fleet.
+        """
+        # Extract metrics and info
+        metrics = service_data.get('metrics', {})
+        thresholds = get_threshold_profiles().table_for(service_id)
+        if levels is None:
+            levels = thresholds.classify(metrics)
+        service_name = service_data.get('name', 'Unknown Service')
+        service_status = service_data.get('status', 'unknown')
+        
+        # Rolling statistics over recent samples smooth out single noisy readings
+        history = metric_history.summary(self._validate_backend_url(self.backend_url), service_id)
+        history_metrics = history['metrics'] if history else {}
+        smoothed_levels = thresholds.classify({m: stats['smoothed'] for m, stats in history_metrics.items()})
+        
+        # Format metrics for JSON response
+        formatted_metrics = []
+        metric_display_map = {
+            'cpu': ("CPU Usage", "%"),
+            'memory': ("Memory Usage", "%"),
+            'latency': ("Latency", "ms"),
+            'error_rate': ("Error Rate", "%"),
+            'throughput': ("Throughput", "req/s")
         }
         
-        if metric_name in thresholds:
-            threshold = thresholds[metric_name]
-            if value >= threshold['crit']:
-                return "🔴", "CRITICAL"
-            elif value >= threshold['warn']:
-                return "🟡", "WARNING"
-            else:
-                return "🟢", "HEALTHY"
-        return "⚪", "UNKNOWN"
+        for metric_name, value in metrics.items():
+            if metric_name in metric_display_map:
+                display_name, unit = metric_display_map[metric_name]
+                status = levels.get(metric_name, 'unknown').upper()
+                entry = {
+                    "name": metric_name,
+                    "display_name": display_name,
+                    "value": value,
+                    "unit": unit,
+                    "status": status,
+                    "icon": METRIC_ICONS[status]
+                }
+                stats = history_metrics.get(metric_name)
+                if stats is not None:
+                    entry.update({
+                        "smoothed_value": stats['smoothed'],
+                        "smoothed_status": smoothed_levels.get(metric_name, 'unknown').upper(),
+                        "p95": stats['p95'],
+                        "trend": stats['trend']
+                    })
+                formatted_metrics.append(entry)
+        
+        smoothed_statuses = [level for level in smoothed_levels.values() if level != 'unknown']
+        
+        return {
+            "service_id": service_id,
+            "service_name": service_name,
+            "overall_status": service_status.upper(),
+            "remediation_in_progress": service_data.get('remediationInProgress', False),
+            "awaiting_remediation": service_data.get('awaitingRemediation', False),
+            "threshold_profile": thresholds.name,
+            "smoothed_status": (
+                max(smoothed_statuses, key=SEVERITY_ORDER.index).upper() if smoothed_statuses else None
+            ),
+            "history": {
+                "samples": history['samples'] if history else 0,
+                "window_seconds": history['window_seconds'] if history else 0.0
+            },
+            "metrics": formatted_metrics
+        }
+
+    async def _get_fleet_health_report(self) -> dict[str, Any]:
+        """Sweep every service's metrics in parallel and build a combined report"""
+        services_data = await self._make_api_call("/services")
+        
+        if not isinstance(services_data, list):
+            raise ValueError("Invalid response format from backend")
+        
+        service_ids = [s.get('id') for s in services_data if isinstance(s, dict) and s.get('id')]
+        
+        # Fan out one metrics request per service; failures are reported per service
+        results = await gather_bounded(
+            *[self._make_api_call(f"/services/{sid}/metrics") for sid in service_ids],
+            return_exceptions=True
+        )
+        
+        with timed("build_response"):
+            # Classify every reachable service's metrics in one vectorized pass
+            fetched = [(sid, r) for sid, r in zip(service_ids, results) if isinstance(r, dict)]
+            fleet_levels = iter(get_threshold_profiles().classify_many(
+                [sid for sid, _ in fetched], [r.get('metrics', {}) for _, r in fetched]
+            ))
+            
+            reports = []
+            status_counts = {'HEALTHY': 0, 'WARNING': 0, 'CRITICAL': 0}
+            unreachable_count = 0
+            for service_id, service_data in zip(service_ids, results):
+                if isinstance(service_data, Exception) or not isinstance(service_data, dict):
+                    unreachable_count += 1
+                    error = str(service_data) if isinstance(service_data, Exception) else "Invalid response format from backend"
+                    reports.append({"service_id": service_id, "overall_status": "UNKNOWN", "error": error})
+                    continue
+                
+                report = self._build_service_report(service_id, service_data, next(fleet_levels))
+                if report["overall_status"] in status_counts:
+                    status_counts[report["overall_status"]] += 1
+                reports.append(report)
+            
+            return {
+                "component": "HealthChecker",
+                "mode": "fleet",
+                "summary": {
+                    "total_services": len(service_ids),
+                    "healthy_count": status_counts['HEALTHY'],
+                    "warning_count": status_counts['WARNING'],
+                    "critical_count": status_counts['CRITICAL'],
+                    "unreachable_count": unreachable_count
+                },
+                "services": reports
+            }
 
     def get_health_report(self) -> Message:
         """Get health report as a tool response"""
+        return run_sync(self.get_health_report_async())
+
+    @instrumented("HealthChecker")
+    async def get_health_report_async(self) -> Message:
+        """Get health report as a tool response without blocking the event loop"""
         try:
             user_input = getattr(self, 'service_input', '').strip()
             if not user_input:
                 raise ValueError("Please specify which service to check")
             
-            service_id = self._extract_service_id(user_input)
+            service_id = await self._extract_service_id(user_input)
+            
+            if service_id is None and self._is_fleet_request(user_input):
+                json_response = await self._get_fleet_health_report()
+                json_response["timings"] = timing_summary()
+                summary = json_response["summary"]
+                self.status = (
+                    f"Fleet health check completed for {summary['total_services']} services - "
+                    f"{summary['critical_count']} critical"
+                )
+                return Message(text=dumps(json_response), sender="HealthChecker")
+            
+            if service_id is None:
+                raise ValueError("Could not identify the service. Please specify a service ID or name, or ask about all services")
             
             # Get service details
-            service_data = self._make_api_call(f"/services/{service_id}/metrics")
+            service_data = await self._make_api_call(f"/services/{service_id}/metrics")
             
             if not isinstance(service_data, dict):
                 raise ValueError("Invalid response format from backend")
             
-            # Extract metrics and info
-            metrics = service_data.get('metrics', {})
-            service_name = service_data.get('name', 'Unknown Service')
-            service_status = service_data.get('status', 'unknown')
-            
-            # Format metrics for JSON response
-            formatted_metrics = []
-            metric_display_map = {
-                'cpu': ("CPU Usage", "%"),
-                'memory': ("Memory Usage", "%"),
-                'latency': ("Latency", "ms"),
-                'error_rate': ("Error Rate", "%"),
-                'throughput': ("Throughput", "req/s")
-            }
-            
-            for metric_name, value in metrics.items():
-                if metric_name in metric_display_map:
-                    display_name, unit = metric_display_map[metric_name]
-                    icon, status = self._assess_metric_health(metric_name, value)
-                    formatted_metrics.append({
-                        "name": metric_name,
-                        "display_name": display_name,
-                        "value": value,
-                        "unit": unit,
-                        "status": status,
-                        "icon": icon
-                    })
-            
             # Create JSON response
-            json_response = {
-                "component": "HealthChecker",
-                "service_id": service_id,
-                "service_name": service_name,
-                "overall_status": service_status.upper(),
-                "remediation_in_progress": service_data.get('remediationInProgress', False),
-                "awaiting_remediation": service_data.get('awaitingRemediation', False),
-                "metrics": formatted_metrics
-            }
+            with timed("build_response"):
+                json_response = {
+                    "component": "HealthChecker",
+                    **self._build_service_report(service_id, service_data)
+                }
+            json_response["timings"] = timing_summary()
 
-            self.status = f"Health check completed for {service_name}"
-            return Message(text=json.dumps(json_response), sender="HealthChecker")
+            self.status = f"Health check completed for {json_response['service_name']}"
+            return Message(text=dumps(json_response), sender="HealthChecker")
             
         except Exception as e:
+            mark_failed()
             error_message = f"❌ Error checking service health: {str(e)}"
             self.status = error_message
-            return Message(text=error_message, sender="HealthChecker")
\ No newline at end of file
+            return Message(text=error_message, sender="HealthChecker")
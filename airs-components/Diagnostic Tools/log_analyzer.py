@@ -1,13 +1,21 @@
 # diagnostic_tools/log_analyzer.py
 from typing import Any
-import requests
-import re
-import json
-from urllib.parse import urlparse
+import httpx
 from langflow.custom import Component
 from langflow.io import MessageTextInput, Output
 from langflow.schema import Message
 
+from airs_common.concurrency import run_sync
+from airs_common.http_client import get_async_client
+from airs_common.instrumentation import instrumented, mark_failed, timed, timed_request, timing_summary
+from airs_common.log_analysis import analyze_logs
+from airs_common.log_templates import distinct_messages, log_templates
+from airs_common.metric_history import record_metrics_response
+from airs_common.response_cache import MISSING, response_cache
+from airs_common.serialization import dumps, loads
+from airs_common.service_resolver import resolve_service_id
+from airs_common.url_validation import validate_backend_url
+
 
 class LogAnalyzer(Component):
     display_name = "Log Analyzer"
@@ -35,7 +43,7 @@ class LogAnalyzer(Component):
         Output(
             display_name="Log Analysis",
             name="log_analysis",
-            method="get_log_analysis"
+            method="get_log_analysis_async"
         )
     ]
 
@@ -45,76 +53,45 @@ class LogAnalyzer(Component):
 
     def _validate_backend_url(self, url: str) -> str:
         """Validate and sanitize backend URL"""
-        if not url:
-            raise ValueError("Backend URL cannot be empty")
-        
-        # Basic URL format validation
-        if not re.match(r'^https?://', url):
-            raise ValueError("Backend URL must start with http:// or https://")
-        
-        parsed = urlparse(url)
-        
-        # Security validations
-        if parsed.scheme not in ['http', 'https']:
-            raise ValueError("Invalid URL scheme. Must be http or https")
-        
-        if not parsed.hostname:
-            raise ValueError("Invalid URL: missing hostname")
-        
-        # Prevent credential leakage in URLs
-        if parsed.username or parsed.password:
-            raise ValueError("URL must not contain username or password")
-        
-        # Prevent potentially dangerous URL components
-        if parsed.query or parsed.fragment:
-            raise ValueError("URL must not contain query parameters or fragments")
-        
-        # Basic port validation
-        if parsed.port and (parsed.port < 1 or parsed.port > 65535):
-            raise ValueError("Invalid port number")
-        
-        return url.rstrip('/')
+        return validate_backend_url(url)
 
-    def _extract_service_id(self, user_input: str) -> str:
+    async def _extract_service_id(self, user_input: str) -> str:
         """Extract service ID from natural language input"""
-        input_lower = user_input.lower()
-        
-        service_id_match = re.search(r'\b(S[1-9]\d*)\b', input_lower.upper())
-        if service_id_match:
-            return service_id_match.group(1)
-        
-        service_mapping = {
-            'payment': 'S1',
-            'auth': 'S2',
-            'user auth': 'S2',
-            'inventory': 'S3', 
-            'reporting': 'S4',
-            'search': 'S5',
-            'log': 'S6'
-        }
-        
-        for key, service_id in service_mapping.items():
-            if key in input_lower:
-                return service_id
-        
-        return "S1"
+        backend_url = self._validate_backend_url(self.backend_url)
+        service_id = await resolve_service_id(
+            backend_url, user_input, lambda: self._make_api_call("/services")
+        )
+        if service_id is None:
+            raise ValueError("Could not identify the service. Please specify a service ID or name")
+        return service_id
 
-    def _make_api_call(self, endpoint: str) -> Any:
+    async def _make_api_call(self, endpoint: str) -> Any:
         """Make API call to backend with error handling"""
         # Validate URL first
-        backend_url = self._validate_backend_url(self.backend_url)
+        with timed("validate_url"):
+            backend_url = self._validate_backend_url(self.backend_url)
         url = f"{backend_url}/api{endpoint}"
         
+        # Serve recently fetched documents from the shared cache
+        cached = response_cache.get(url)
+        if cached is not MISSING:
+            return cached
+        
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError:
+            with timed_request("GET", endpoint):
+                response = await get_async_client(backend_url).get(url, timeout=self.timeout)
+                response.raise_for_status()
+            with timed("parse"):
+                data = loads(response.content)
+            response_cache.set(url, data)
+            record_metrics_response(backend_url, endpoint, data)
+            return data
+        except httpx.ConnectError:
             # Sanitized error message - no URL exposure
             raise ConnectionError("Cannot connect to AIRS backend service")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise TimeoutError(f"Backend request timed out after {self.timeout} seconds")
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             # Sanitized - only status code, no URL
             if e.response.status_code == 404:
                 raise ValueError("Service not found")
@@ -125,37 +102,60 @@ class LogAnalyzer(Component):
 
     def get_log_analysis(self) -> Message:
         """Get log analysis as a tool response"""
+        return run_sync(self.get_log_analysis_async())
+
+    @instrumented("LogAnalyzer")
+    async def get_log_analysis_async(self) -> Message:
+        """Get log analysis as a tool response without blocking the event loop"""
         try:
             user_input = getattr(self, 'service_input', '').strip()
             if not user_input:
                 raise ValueError("Please specify which service to analyze")
             
-            service_id = self._extract_service_id(user_input)
+            service_id = await self._extract_service_id(user_input)
             
-            # Get log analysis from backend
-            analysis_data = self._make_api_call(f"/services/{service_id}/logs/analysis")
+            # The metrics document carries the service's recent logs - analyze them
+            # locally instead of a second round trip to /logs/analysis
+            service_data = await self._make_api_call(f"/services/{service_id}/metrics")
             
-            if not isinstance(analysis_data, dict):
+            if not isinstance(service_data, dict):
                 raise ValueError("Invalid response format from backend")
             
-            # Get service details for context
-            service_data = self._make_api_call(f"/services/{service_id}/metrics")
-            service_name = service_data.get('name', 'Unknown Service') if isinstance(service_data, dict) else 'Unknown Service'
+            logs = service_data.get('logs') or []
+            with timed("analyze"):
+                analysis_data = analyze_logs(logs)
+            
+            # Fold only the entries not seen on earlier calls into the service's templates
+            with timed("mine_templates"):
+                backend_url = self._validate_backend_url(self.backend_url)
+                templates = log_templates.update(backend_url, service_id, logs, limit=5)
+            
+            with timed("build_response"):
+                service_name = service_data.get('name', 'Unknown Service')
             
-            # Create JSON response directly
-            json_response = {
-                "component": "LogAnalyzer",
-                "service_id": service_id,
-                "service_name": service_name,
-                "root_cause": analysis_data.get('root_cause', 'unknown'),
-                "patterns": analysis_data.get('patterns', []),
-                "suggested_actions": analysis_data.get('suggested_actions', [])[:3],
-                "recent_errors": analysis_data.get('recent_errors', [])[:5]
-            }
+                # Create JSON response directly
+                json_response = {
+                    "component": "LogAnalyzer",
+                    "service_id": service_id,
+                    "service_name": service_name,
+                    "root_cause": analysis_data.get('root_cause', 'unknown'),
+                    "patterns": analysis_data.get('patterns', []),
+                    "suggested_actions": analysis_data.get('suggested_actions', [])[:3],
+                    # One message per template, so repeats differing only in IDs do not crowd out other errors
+                    "recent_errors": distinct_messages(analysis_data.get('recent_errors', []), 5),
+                    "error_templates": templates["templates"],
+                    "error_template_count": templates["template_count"],
+                    "category_counts": {
+                        category: count
+                        for category, count in analysis_data.get('category_counts', {}).items() if count
+                    }
+                }
+            json_response["timings"] = timing_summary()
             self.status = f"Log analysis completed for {service_name}"
-            return Message(text=json.dumps(json_response), sender="LogAnalyzer")
+            return Message(text=dumps(json_response), sender="LogAnalyzer")
             
         except Exception as e:
+            mark_failed()
             error_message = f"❌ Error analyzing logs: {str(e)}"
             self.status = error_message
             return Message(text=error_message, sender="LogAnalyzer")
\ No newline at end of file
@@ -1,17 +1,51 @@
 # diagnostic_tools/root_cause_identifier.py
-from typing import Any
-import requests
+from collections import Counter
+from typing import Any, Mapping, Optional
+import httpx
 import re
-import json
-from urllib.parse import urlparse
 from langflow.custom import Component
 from langflow.io import MessageTextInput, Output
 from langflow.schema import Message
 
+from airs_common.concurrency import gather_bounded, run_sync
+from airs_common.correlation import correlate_services
+from airs_common.dependency_graph import get_dependency_graph
+from airs_common.http_client import get_async_client
+from airs_common.instrumentation import instrumented, mark_failed, timed, timed_request, timing_summary
+from airs_common.json_stream import LOG_ANALYSIS_FIELDS, fields_cache_key, read_fields
+from airs_common.log_analysis import get_log_classifier, recent_errors
+from airs_common.metric_history import record_metrics_response
+from airs_common.response_cache import MISSING, response_cache
+from airs_common.root_cause_scoring import rank_root_causes
+from airs_common.serialization import dumps, loads
+from airs_common.service_resolver import resolve_service_ids
+from airs_common.thresholds import get_threshold_profiles
+from airs_common.url_validation import validate_backend_url
+
+# Candidate causes listed per report
+CANDIDATE_CAUSES = 3
+
+# Minimum posterior of the reported root cause for each confidence level
+CONFIDENCE_LEVELS = ((0.6, "High"), (0.35, "Medium"))
+
+# Service statuses that count as failing for dependency impact analysis
+UNHEALTHY_STATUSES = ('critical', 'warning', 'degraded')
+
+# Impacted services named per dependency root (the rest are counted)
+IMPACTED_SERVICES_LISTED = 10
+
+# How a metric at or above its warning threshold is cited as evidence
+EVIDENCE_FORMATS = {
+    'cpu': "CPU at {value}%",
+    'memory': "Memory at {value}%",
+    'latency': "Latency at {value}ms",
+    'error_rate': "Error rate at {value}%",
+}
+
 
 class RootCauseIdentifier(Component):
     display_name = "Root Cause Identifier"
-    description = "Identify the root cause of service issues. Use after gathering health and log data."
+    description = "Identify the root cause of service issues for one service, several services or all critical services. Use after gathering health and log data."
     icon = "search"
     name = "RootCauseIdentifier"
 
@@ -25,7 +59,7 @@ class RootCauseIdentifier(Component):
         MessageTextInput(
             name="service_input",
             display_name="Service Identifier",
-            info="Service ID or name to identify root cause for",
+            info="Service ID or name, a list of services, or 'all critical' to identify root causes for",
             tool_mode=True,
             value="Find root cause for service S1"
         )
@@ -35,7 +69,7 @@ class RootCauseIdentifier(Component):
         Output(
             display_name="Root Cause Analysis",
             name="root_cause_analysis", 
-            method="get_root_cause_analysis"
+            method="get_root_cause_analysis_async"
         )
     ]
 
@@ -45,76 +79,77 @@ class RootCauseIdentifier(Component):
 
     def _validate_backend_url(self, url: str) -> str:
         """Validate and sanitize backend URL"""
-        if not url:
-            raise ValueError("Backend URL cannot be empty")
-        
-        # Basic URL format validation
-        if not re.match(r'^https?://', url):
-            raise ValueError("Backend URL must start with http:// or https://")
-        
-        parsed = urlparse(url)
-        
-        # Security validations
-        if parsed.scheme not in ['http', 'https']:
-            raise ValueError("Invalid URL scheme. Must be http or https")
-        
-        if not parsed.hostname:
-            raise ValueError("Invalid URL: missing hostname")
-        
-        # Prevent credential leakage in URLs
-        if parsed.username or parsed.password:
-            raise ValueError("URL must not contain username or password")
-        
-        # Prevent potentially dangerous URL components
-        if parsed.query or parsed.fragment:
-            raise ValueError("URL must not contain query parameters or fragments")
-        
-        # Basic port validation
-        if parsed.port and (parsed.port < 1 or parsed.port > 65535):
-            raise ValueError("Invalid port number")
-        
-        return url.rstrip('/')
+        return validate_backend_url(url)
 
-    def _extract_service_id(self, user_input: str) -> str:
-        """Extract service ID from natural language input"""
-        input_lower = user_input.lower()
-        
-        service_id_match = re.search(r'\b(S[1-9]\d*)\b', input_lower.upper())
-        if service_id_match:
-            return service_id_match.group(1)
-        
-        service_mapping = {
-            'payment': 'S1',
-            'auth': 'S2',
-            'user auth': 'S2',
-            'inventory': 'S3',
-            'reporting': 'S4',
-            'search': 'S5', 
-            'log': 'S6'
-        }
-        
-        for key, service_id in service_mapping.items():
-            if key in input_lower:
-                return service_id
-        
-        return "S1"
+    def _is_critical_batch_request(self, user_input: str) -> bool:
+        """Check whether the input asks about every critical service"""
+        return bool(re.search(r'\b(all|every)\b.*\bcritical\b', user_input, re.IGNORECASE))
 
-    def _make_api_call(self, endpoint: str) -> Any:
-        """Make API call to backend with error handling"""
-        # Validate URL first
+    def _is_correlation_request(self, user_input: str) -> bool:
+        """Check whether the input explicitly asks for a cause shared across services"""
+        return bool(re.search(r'\b(correlat\w*|(shared|common) (root )?causes?)\b', user_input, re.IGNORECASE))
+
+    async def _get_all_service_ids(self) -> list[str]:
+        """List every service ID known to the backend"""
+        services_data = await self._make_api_call("/services")
+        if not isinstance(services_data, list):
+            raise ValueError("Invalid response format from backend")
+        return [s['id'] for s in services_data if isinstance(s, dict) and s.get('id')]
+
+    async def _get_critical_service_ids(self) -> list[str]:
+        """List the IDs of every service the backend reports as critical"""
+        services_data = await self._make_api_call("/services")
+        if not isinstance(services_data, list):
+            raise ValueError("Invalid response format from backend")
+        return [
+            s['id'] for s in services_data
+            if isinstance(s, dict) and s.get('id') and s.get('status') == 'critical'
+        ]
+
+    async def _extract_service_ids(self, user_input: str) -> list[str]:
+        """Extract every service the input refers to, or an empty list if it names none"""
         backend_url = self._validate_backend_url(self.backend_url)
+        return await resolve_service_ids(
+            backend_url, user_input, lambda: self._make_api_call("/services")
+        )
+
+    async def _make_api_call(self, endpoint: str, fields: Optional[Mapping[str, Optional[int]]] = None) -> Any:
+        """Make API call to backend with error handling.
+
+        With fields, only those fields of the JSON object are read (see json_stream).
+        """
+        # Validate URL first
+        with timed("validate_url"):
+            backend_url = self._validate_backend_url(self.backend_url)
         url = f"{backend_url}/api{endpoint}"
         
+        # Serve recently fetched documents from the shared cache
+        cache_key = url if fields is None else fields_cache_key(url, fields)
+        cached = response_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+        
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError:
+            if fields is not None:
+                with timed_request("GET", endpoint):
+                    async with get_async_client(backend_url).stream("GET", url, timeout=self.timeout) as response:
+                        response.raise_for_status()
+                        data = await read_fields(response, fields)
+            else:
+                with timed_request("GET", endpoint):
+                    response = await get_async_client(backend_url).get(url, timeout=self.timeout)
+                    response.raise_for_status()
+                with timed("parse"):
+                    data = loads(response.content)
+            response_cache.set(cache_key, data)
+            record_metrics_response(backend_url, endpoint, data)
+            return data
+        except httpx.ConnectError:
             # Sanitized error message - no URL exposure
             raise ConnectionError("Cannot connect to AIRS backend service")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise TimeoutError(f"Backend request timed out after {self.timeout} seconds")
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             # Sanitized - only status code, no URL
             if e.response.status_code == 404:
                 raise ValueError("Service not found")
@@ -123,61 +158,298 @@ class RootCauseIdentifier(Component):
             # Generic error without backend details
             raise Exception(f"Error communicating with backend service")
 
+    def _build_root_cause_report(
+        self,
+        service_id: str,
+        health_data: dict[str, Any],
+        log_analysis: dict[str, Any],
+        levels: Optional[dict[str, str]] = None,
+        category_counts: Optional[dict[str, int]] = None,
+        candidates: Optional[list[dict[str, Any]]] = None
+    ) -> dict[str, Any]:
+        """Combine one service's metrics and log analysis into a root cause report.
+
+        levels, category_counts and candidates are the service's metric levels,
+        log category hits and every ranked cause when already computed as part of a batch.
+        """
+        service_name = health_data.get('name', 'Unknown Service')
+        service_status = health_data.get('status', 'unknown')
+        metrics = health_data.get('metrics', {})
+        if levels is None:
+            levels = get_threshold_profiles().classify(service_id, metrics)
+        if category_counts is None:
+            category_counts = get_log_classifier().count(recent_errors(health_data.get('logs') or [], None))
+        if candidates is None:
+            candidates = rank_root_causes(
+                [service_id], [metrics], [list(category_counts.values())], tuple(category_counts)
+            )[0]
+        
+        # The log analysis names the cause; how far the metric and log evidence
+        # supports it sets the confidence
+        root_cause = log_analysis.get('root_cause', 'unknown')
+        errors = log_analysis.get('recent_errors', [])
+        probability = next((c['probability'] for c in candidates if c['cause'] == root_cause), 0.0)
+        confidence = next((level for minimum, level in CONFIDENCE_LEVELS if probability >= minimum), "Low")
+        
+        # Build critical metrics evidence
+        critical_metrics = [
+            EVIDENCE_FORMATS.get(metric, metric + " at {value}").format(value=metrics[metric])
+            for metric, level in levels.items()
+            if level in ('warning', 'critical')
+        ]
+        
+        return {
+            "service_id": service_id,
+            "service_name": service_name,
+            "service_status": service_status,
+            "root_cause": root_cause,
+            "confidence": confidence,
+            "root_cause_probability": probability,
+            # Ranked alternatives from the metric and log evidence; root_cause stays the log analysis' cause
+            "candidate_causes": candidates[:CANDIDATE_CAUSES],
+            "critical_metrics_count": len(critical_metrics),
+            "critical_metrics": critical_metrics,
+            "recent_errors": errors[:3] if errors else [],
+            "log_category_counts": {category: count for category, count in category_counts.items() if count}
+        }
+
+    async def _get_dependency_impact(self) -> Optional[dict[str, Any]]:
+        """Trace the fleet's unhealthy services to the failing services furthest upstream.
+
+        None when no dependency graph is configured.
+        """
+        graph = get_dependency_graph()
+        if not len(graph):
+            return None
+        services_data = await self._make_api_call("/services")
+        if not isinstance(services_data, list):
+            raise ValueError("Invalid response format from backend")
+        services = {s['id']: s for s in services_data if isinstance(s, dict) and s.get('id')}
+        
+        with timed("dependency_impact"):
+            impact = graph.impact(
+                sid for sid, service in services.items() if service.get('status') in UNHEALTHY_STATUSES
+            )
+            roots = []
+            for root in impact['roots']:
+                service = services.get(root['service_id'], {})
+                roots.append({
+                    "service_id": root['service_id'],
+                    "service_name": service.get('name', 'Unknown Service'),
+                    "service_status": service.get('status', 'unknown'),
+                    "members": root['members'],
+                    "blast_radius": root['blast_radius'],
+                    "impacted_unhealthy_count": len(root['impacted_unhealthy']),
+                    "impacted_unhealthy": root['impacted_unhealthy'][:IMPACTED_SERVICES_LISTED],
+                    "impacted_healthy_count": len(root['impacted_healthy']),
+                    "impacted_healthy": root['impacted_healthy'][:IMPACTED_SERVICES_LISTED],
+                })
+        return {
+            "roots": roots,
+            "roots_by_id": {root['service_id']: root for root in roots},
+            "root_of": impact['root_of'],
+            "unmapped": impact['unmapped']
+        }
+
+    def _apply_dependency_impact(self, report: dict[str, Any], impact: Optional[dict[str, Any]]) -> None:
+        """Point a report at the upstream failure its service is downstream of"""
+        if impact is None:
+            return
+        root = impact['roots_by_id'].get(impact['root_of'].get(report['service_id']))
+        if root is not None and report['service_id'] not in root['members']:
+            report["upstream_root_cause"] = {
+                "service_id": root['service_id'],
+                "service_name": root['service_name'],
+                "service_status": root['service_status'],
+            }
+        elif root is not None:
+            report["blast_radius"] = root['blast_radius']
+
+    def _dependency_summary(self, impact: dict[str, Any]) -> dict[str, Any]:
+        """Roots of the fleet's failures, most impactful first"""
+        return {"root_failures": impact['roots'], "unmapped_unhealthy": impact['unmapped']}
+
+    def _severity_key(self, report: dict[str, Any]) -> tuple[int, int, int]:
+        """Sort key ranking the most severe service first"""
+        status_rank = {'critical': 2, 'degraded': 1, 'warning': 1}.get(report['service_status'], 0)
+        confidence_rank = {'High': 2, 'Medium': 1}.get(report['confidence'], 0)
+        return (status_rank, report['critical_metrics_count'], confidence_rank)
+
+    async def _fetch_service_documents(
+        self, service_ids: list[str]
+    ) -> tuple[list[tuple[str, dict[str, Any], dict[str, Any]]], list[dict[str, Any]]]:
+        """Fetch metrics and log analysis for many services in one bounded fan-out.
+
+        Returns (service_id, health_data, log_analysis) for every service that
+        could be fetched, and an error entry for every service that could not.
+        """
+        # One flat fan-out over every document, so the whole batch costs about one round trip
+        requests = [
+            request
+            for sid in service_ids
+            for request in (
+                (f"/services/{sid}/metrics", None),
+                (f"/services/{sid}/logs/analysis", LOG_ANALYSIS_FIELDS)
+            )
+        ]
+        results = await gather_bounded(
+            *[self._make_api_call(endpoint, fields) for endpoint, fields in requests],
+            return_exceptions=True
+        )
+        
+        documents = []
+        failed = []
+        for index, service_id in enumerate(service_ids):
+            health_data, log_analysis = results[2 * index], results[2 * index + 1]
+            error = next((r for r in (health_data, log_analysis) if isinstance(r, Exception)), None)
+            if error is None and not (isinstance(health_data, dict) and isinstance(log_analysis, dict)):
+                error = ValueError("Invalid response format from backend")
+            if error is not None:
+                failed.append({"service_id": service_id, "error": str(error)})
+                continue
+            documents.append((service_id, health_data, log_analysis))
+        return documents, failed
+
+    async def _get_batch_root_cause_report(self, service_ids: list[str]) -> dict[str, Any]:
+        """Analyze several services in one bounded fan-out and rank the results"""
+        documents, failed = await self._fetch_service_documents(service_ids)
+        impact = await self._get_dependency_impact()
+        
+        with timed("build_response"):
+            # Classify every service's metrics in one vectorized pass
+            batch_levels = get_threshold_profiles().classify_many(
+                [service_id for service_id, _, _ in documents],
+                [health_data.get('metrics', {}) for _, health_data, _ in documents]
+            )
+            # Count every service's log categories in one scan over the batch,
+            # then score every service's candidate causes in one pass
+            classifier = get_log_classifier()
+            batch_counts = classifier.count_matrix(
+                [recent_errors(health_data.get('logs') or [], None) for _, health_data, _ in documents]
+            )
+            batch_candidates = rank_root_causes(
+                [service_id for service_id, _, _ in documents],
+                [health_data.get('metrics', {}) for _, health_data, _ in documents],
+                batch_counts, classifier.categories
+            )
+            reports = [
+                self._build_root_cause_report(
+                    service_id, health_data, log_analysis, levels,
+                    dict(zip(classifier.categories, counts.tolist())), candidates
+                )
+                for (service_id, health_data, log_analysis), levels, counts, candidates
+                in zip(documents, batch_levels, batch_counts, batch_candidates)
+            ]
+            reports.sort(key=self._severity_key, reverse=True)
+            for rank, report in enumerate(reports, start=1):
+                report["rank"] = rank
+                self._apply_dependency_impact(report, impact)
+            
+            root_cause_counts = Counter(report['root_cause'] for report in reports)
+            json_response = {
+                "component": "RootCauseIdentifier",
+                "mode": "batch",
+                "summary": {
+                    "services_requested": len(service_ids),
+                    "services_analyzed": len(reports),
+                    "failed_count": len(failed),
+                    "root_cause_counts": dict(root_cause_counts.most_common()),
+                    "most_common_root_cause": root_cause_counts.most_common(1)[0][0] if reports else None
+                },
+                "services": reports,
+                "failed": failed
+            }
+            if impact is not None:
+                json_response["dependency_impact"] = self._dependency_summary(impact)
+            return json_response
+
+    async def _get_correlated_root_cause_report(self, service_ids: list[str]) -> dict[str, Any]:
+        """Correlate anomalies across services and report likely shared causes"""
+        documents, failed = await self._fetch_service_documents(service_ids)
+        
+        with timed("correlate"):
+            correlation = correlate_services(
+                [{**health_data, 'id': service_id} for service_id, health_data, _ in documents],
+                [log_analysis for _, _, log_analysis in documents]
+            )
+        
+        json_response = {
+            "component": "RootCauseIdentifier",
+            "mode": "correlated",
+            **correlation,
+            "failed": failed
+        }
+        impact = await self._get_dependency_impact()
+        if impact is not None:
+            json_response["dependency_impact"] = self._dependency_summary(impact)
+        return json_response
+
     def get_root_cause_analysis(self) -> Message:
         """Get root cause analysis as a tool response"""
+        return run_sync(self.get_root_cause_analysis_async())
+
+    @instrumented("RootCauseIdentifier")
+    async def get_root_cause_analysis_async(self) -> Message:
+        """Get root cause analysis as a tool response without blocking the event loop"""
         try:
             user_input = getattr(self, 'service_input', '').strip()
             if not user_input:
                 raise ValueError("Please specify which service to analyze")
             
-            service_id = self._extract_service_id(user_input)
+            service_ids = await self._extract_service_ids(user_input)
             
-            # Get health data
-            health_data = self._make_api_call(f"/services/{service_id}/metrics")
+            # Correlate the services named in the input, or the whole fleet when none is named;
+            # a single named service gets its own report
+            if len(service_ids) != 1 and self._is_correlation_request(user_input):
+                if not service_ids:
+                    service_ids = await self._get_all_service_ids()
+                json_response = await self._get_correlated_root_cause_report(service_ids)
+                json_response["timings"] = timing_summary()
+                self.status = (
+                    f"Correlated {json_response['anomalous_count']} anomalous services into "
+                    f"{len(json_response['correlated_groups'])} groups"
+                )
+                return Message(text=dumps(json_response), sender="RootCauseIdentifier")
             
-            # Get log analysis
-            log_analysis = self._make_api_call(f"/services/{service_id}/logs/analysis")
+            # "All critical" only applies when the input names no service itself
+            critical_batch = not service_ids and self._is_critical_batch_request(user_input)
+            if critical_batch:
+                service_ids = await self._get_critical_service_ids()
+            elif not service_ids:
+                raise ValueError("Could not identify the service. Please specify a service ID or name, or ask about all critical services")
             
-            if not isinstance(health_data, dict) or not isinstance(log_analysis, dict):
-                raise ValueError("Invalid response format from backend")
+            if len(service_ids) != 1 or critical_batch:
+                json_response = await self._get_batch_root_cause_report(service_ids)
+                json_response["timings"] = timing_summary()
+                summary = json_response["summary"]
+                self.status = f"Root cause analysis completed for {summary['services_analyzed']} services"
+                return Message(text=dumps(json_response), sender="RootCauseIdentifier")
             
-            service_name = health_data.get('name', 'Unknown Service')
-            service_status = health_data.get('status', 'unknown')
-            metrics = health_data.get('metrics', {})
+            service_id = service_ids[0]
             
-            # Determine root cause based on combined analysis
-            root_cause = log_analysis.get('root_cause', 'unknown')
-            recent_errors = log_analysis.get('recent_errors', [])
-            confidence = "High" if len(recent_errors) > 2 else "Medium" if recent_errors else "Low"
+            # Get health data and log analysis concurrently
+            health_data, log_analysis = await gather_bounded(
+                self._make_api_call(f"/services/{service_id}/metrics"),
+                self._make_api_call(f"/services/{service_id}/logs/analysis", LOG_ANALYSIS_FIELDS)
+            )
             
-            # Build critical metrics evidence
-            critical_metrics = []
-            for metric, value in metrics.items():
-                if metric == 'cpu' and value > 70:
-                    critical_metrics.append(f"CPU at {value}%")
-                elif metric == 'memory' and value > 75:
-                    critical_metrics.append(f"Memory at {value}%")
-                elif metric == 'latency' and value > 300:
-                    critical_metrics.append(f"Latency at {value}ms")
-                elif metric == 'error_rate' and value > 5:
-                    critical_metrics.append(f"Error rate at {value}%")
+            if not isinstance(health_data, dict) or not isinstance(log_analysis, dict):
+                raise ValueError("Invalid response format from backend")
+            impact = await self._get_dependency_impact()
             
             # Create JSON response
-            json_response = {
-                "component": "RootCauseIdentifier",
-                "service_id": service_id,
-                "service_name": service_name,
-                "service_status": service_status,
-                "root_cause": root_cause,
-                "confidence": confidence,
-                "critical_metrics_count": len(critical_metrics),
-                "critical_metrics": critical_metrics,
-                "recent_errors": recent_errors[:3] if recent_errors else []
-            }
-            self.status = f"Root cause analysis completed for {service_name}"
-            return Message(text=json.dumps(json_response), sender="RootCauseIdentifier")
+            with timed("build_response"):
+                json_response = {
+                    "component": "RootCauseIdentifier",
+                    **self._build_root_cause_report(service_id, health_data, log_analysis)
+                }
+                self._apply_dependency_impact(json_response, impact)
+            json_response["timings"] = timing_summary()
+            self.status = f"Root cause analysis completed for {json_response['service_name']}"
+            return Message(text=dumps(json_response), sender="RootCauseIdentifier")
             
         except Exception as e:
+            mark_failed()
             error_message = f"❌ Error identifying root cause: {str(e)}"
             self.status = error_message
-            return Message(text=error_message, sender="RootCauseIdentifier")
\ No newline at end of file
+            return Message(text=error_message, sender="RootCauseIdentifier")
@@ -1,13 +1,26 @@
 # diagnostic_tools/service_lister.py
-from typing import Any
-import requests
-import json
+from collections import Counter
+from typing import Any, Optional
+import httpx
 import re
-from urllib.parse import urlparse
 from langflow.custom import Component
-from langflow.io import MessageTextInput, Output
+from langflow.io import DropdownInput, IntInput, MessageTextInput, Output
 from langflow.schema import Message
 
+from airs_common.concurrency import run_sync
+from airs_common.fleet_snapshot import FleetSnapshot, content_hash, get_fleet_snapshot
+from airs_common.http_client import get_async_client
+from airs_common.instrumentation import instrumented, mark_failed, timed, timed_request, timing_summary
+from airs_common.serialization import dumps, loads
+from airs_common.url_validation import validate_backend_url
+
+# Remediation filter values, matching the backend's remediation query parameter
+REMEDIATION_FILTERS = {
+    'in_progress': lambda service: bool(service.get('remediationInProgress')),
+    'awaiting': lambda service: bool(service.get('awaitingRemediation')),
+    'none': lambda service: not service.get('remediationInProgress') and not service.get('awaitingRemediation'),
+}
+
 
 class ServiceLister(Component):
     display_name = "Service Lister"
@@ -28,6 +41,56 @@ class ServiceLister(Component):
             info="Natural language query about system status",
             tool_mode=True,
             value="List all services and their status",
+        ),
+        MessageTextInput(
+            name="since_cursor",
+            display_name="Since Cursor",
+            info="Cursor from a previous response; when set, only services whose status or remediation flags changed since then are returned",
+            tool_mode=True,
+            value="",
+        ),
+        MessageTextInput(
+            name="status_filter",
+            display_name="Status Filter",
+            info="Only list services with these statuses, comma-separated (e.g. critical,warning)",
+            tool_mode=True,
+            value="",
+        ),
+        MessageTextInput(
+            name="remediation_filter",
+            display_name="Remediation Filter",
+            info="Only list services whose remediation state is in_progress, awaiting or none",
+            tool_mode=True,
+            value="",
+        ),
+        MessageTextInput(
+            name="name_prefix",
+            display_name="Name Prefix",
+            info="Only list services whose name starts with this text (case-insensitive)",
+            tool_mode=True,
+            value="",
+        ),
+        IntInput(
+            name="page_size",
+            display_name="Page Size",
+            info="Maximum services per response; 0 lists all matching services",
+            tool_mode=True,
+            value=0,
+        ),
+        MessageTextInput(
+            name="page_cursor",
+            display_name="Page Cursor",
+            info="next_page_cursor from a previous paged response",
+            tool_mode=True,
+            value="",
+        ),
+        DropdownInput(
+            name="detail_level",
+            display_name="Detail Level",
+            info="full lists every service, non_healthy lists only services that are not healthy, counts returns only the summary. A query asking for counts only or for unhealthy services overrides this.",
+            options=["full", "non_healthy", "counts"],
+            value="full",
+            advanced=True,
         )
     ]
 
@@ -35,7 +98,7 @@ class ServiceLister(Component):
         Output(
             display_name="Services Overview",
             name="services_overview",
-            method="get_services_overview",
+            method="get_services_overview_async",
         )
     ]
 
@@ -45,52 +108,33 @@ class ServiceLister(Component):
 
     def _validate_backend_url(self, url: str) -> str:
         """Validate and sanitize backend URL"""
-        if not url:
-            raise ValueError("Backend URL cannot be empty")
-        
-        # Basic URL format validation
-        if not re.match(r'^https?://', url):
-            raise ValueError("Backend URL must start with http:// or https://")
-        
-        parsed = urlparse(url)
-        
-        # Security validations
-        if parsed.scheme not in ['http', 'https']:
-            raise ValueError("Invalid URL scheme. Must be http or https")
-        
-        if not parsed.hostname:
-            raise ValueError("Invalid URL: missing hostname")
-        
-        # Prevent credential leakage in URLs
-        if parsed.username or parsed.password:
-            raise ValueError("URL must not contain username or password")
-        
-        # Prevent potentially dangerous URL components
-        if parsed.query or parsed.fragment:
-            raise ValueError("URL must not contain query parameters or fragments")
-        
-        # Basic port validation
-        if parsed.port and (parsed.port < 1 or parsed.port > 65535):
-            raise ValueError("Invalid port number")
-        
-        return url.rstrip('/')
+        return validate_backend_url(url)
 
-    def _make_api_call(self, endpoint: str) -> Any:
-        """Make API call to backend with error handling"""
+    async def _make_conditional_api_call(
+        self, endpoint: str, etag: Optional[str], params: Optional[dict[str, Any]] = None
+    ) -> Optional[httpx.Response]:
+        """GET with If-None-Match; returns None when the backend answers 304 Not Modified"""
         # Validate URL first
-        backend_url = self._validate_backend_url(self.backend_url)
+        with timed("validate_url"):
+            backend_url = self._validate_backend_url(self.backend_url)
         url = f"{backend_url}/api{endpoint}"
+        headers = {"If-None-Match": etag} if etag else None
         
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError:
+            with timed_request("GET", endpoint):
+                response = await get_async_client(backend_url).get(
+                    url, headers=headers, params=params, timeout=self.timeout
+                )
+                if response.status_code == 304:
+                    return None
+                response.raise_for_status()
+            return response
+        except httpx.ConnectError:
             # Sanitized error message - no URL exposure
             raise ConnectionError("Cannot connect to AIRS backend service")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise TimeoutError(f"Backend request timed out after {self.timeout} seconds")
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             # Sanitized - only status code, no URL
             if e.response.status_code == 404:
                 raise ValueError("Requested resource not found")
@@ -99,54 +143,244 @@ class ServiceLister(Component):
             # Generic error without backend details
             raise Exception(f"Error communicating with backend service")
 
+    async def _refresh_snapshot(self, response: Optional[httpx.Response] = None) -> tuple[FleetSnapshot, bool]:
+        """Bring the backend's fleet snapshot up to date; return it and whether the payload was unchanged.
+
+        response is an already fetched full /services response to apply instead of fetching one.
+        """
+        snapshot = get_fleet_snapshot(self._validate_backend_url(self.backend_url))
+        if response is None:
+            response = await self._make_conditional_api_call("/services", snapshot.etag)
+            if response is None:
+                return snapshot, True
+        
+        body_hash = content_hash(response.content)
+        if snapshot.is_unchanged(response.headers.get("ETag"), body_hash):
+            # Same bytes as last time - skip parsing entirely
+            return snapshot, True
+        
+        with timed("parse"):
+            services_data = loads(response.content)
+        if not isinstance(services_data, list):
+            raise ValueError("Invalid response format from backend")
+        snapshot.apply(services_data, response.headers.get("ETag"), body_hash)
+        return snapshot, False
+
+    def _requested_cursor(self, user_input: str) -> str:
+        """Cursor from the Since Cursor input, or one quoted in the query"""
+        cursor = (getattr(self, 'since_cursor', '') or '').strip()
+        if cursor:
+            return cursor
+        match = re.search(r'\bsince\s+(?:cursor\s+)?([0-9a-f]+-\d+)\b', user_input, re.IGNORECASE)
+        return match.group(1) if match else ''
+
+    def _requested_filters(self) -> dict[str, str]:
+        """Filters set on the inputs, keyed by backend query parameter"""
+        filters = {}
+        statuses = [s.strip().lower() for s in (getattr(self, 'status_filter', '') or '').split(',') if s.strip()]
+        if statuses:
+            filters['status'] = ','.join(statuses)
+        
+        remediation = (getattr(self, 'remediation_filter', '') or '').strip().lower().replace('-', '_').replace(' ', '_')
+        if remediation and remediation not in ('any', 'all'):
+            if remediation not in REMEDIATION_FILTERS:
+                raise ValueError("Remediation filter must be in_progress, awaiting or none")
+            filters['remediation'] = remediation
+        
+        prefix = (getattr(self, 'name_prefix', '') or '').strip()
+        if prefix:
+            filters['name_prefix'] = prefix
+        return filters
+
+    def _requested_page(self) -> tuple[int, int]:
+        """(offset, page size) from the paging inputs; page size 0 means unpaged"""
+        page_size = int(getattr(self, 'page_size', 0) or 0)
+        if page_size < 0:
+            raise ValueError("Page size cannot be negative")
+        page_cursor = str(getattr(self, 'page_cursor', '') or '').strip()
+        if page_cursor and not page_cursor.isdigit():
+            raise ValueError("Invalid page cursor")
+        return int(page_cursor or 0), page_size
+
+    def _matches_filters(self, service: dict[str, Any], filters: dict[str, str]) -> bool:
+        """Apply the backend's filter semantics locally"""
+        if 'status' in filters and service.get('status') not in filters['status'].split(','):
+            return False
+        if 'remediation' in filters and not REMEDIATION_FILTERS[filters['remediation']](service):
+            return False
+        if 'name_prefix' in filters and not str(service.get('name', '')).lower().startswith(filters['name_prefix'].lower()):
+            return False
+        return True
+
+    async def _get_filtered_page(
+        self, filters: dict[str, str], offset: int, page_size: int, list_services: bool
+    ) -> dict[str, Any]:
+        """List one page of services matching filters, filtered by the backend when it supports it"""
+        snapshot = get_fleet_snapshot(self._validate_backend_url(self.backend_url))
+        
+        page = None
+        if snapshot.supports_filters is not False:
+            params: dict[str, Any] = {**filters, 'offset': offset}
+            if not list_services:
+                # Counts only - X-Total-Count carries the answer, so ask for no services at all
+                params['limit'] = 0
+            elif page_size:
+                params['limit'] = page_size
+            response = await self._make_conditional_api_call("/services", None, params)
+            
+            if 'X-Total-Count' in response.headers:
+                snapshot.supports_filters = True
+                page = []
+                if list_services:
+                    with timed("parse"):
+                        page = loads(response.content)
+                    if not isinstance(page, list):
+                        raise ValueError("Invalid response format from backend")
+                total = int(response.headers['X-Total-Count'])
+                filtered_by = "backend"
+            else:
+                # Backend ignored the filters and sent the full list - keep it as the snapshot
+                snapshot.supports_filters = False
+                await self._refresh_snapshot(response)
+        else:
+            await self._refresh_snapshot()
+
+        if page is None:
+            # Stream over the snapshot, formatting only the requested page
+            page = []
+            total = 0
+            end = offset + page_size if page_size else None
+            for service in snapshot.services:
+                if not self._matches_filters(service, filters):
+                    continue
+                if total >= offset and (end is None or total < end) and list_services:
+                    page.append(service)
+                total += 1
+            filtered_by = "local"
+        
+        returned = len(page)
+        next_offset = offset + returned
+        json_response = {
+            "component": "ServiceLister",
+            "mode": "filtered",
+            "filters": filters,
+            "filtered_by": filtered_by,
+            "summary": {
+                "matching_services": total,
+                "returned": returned,
+                "offset": offset
+            },
+            "next_page_cursor": str(next_offset) if page_size and returned and next_offset < total else None
+        }
+        if list_services:
+            json_response["services"] = [self._format_service(service) for service in page]
+        return json_response
+
+    def _requested_detail_level(self, user_input: str) -> str:
+        """Detail level asked for in the query, else the configured one"""
+        text = user_input.lower()
+        if re.search(r'\b(counts? only|only (the )?counts?|just (the )?counts?|summary only|how many)\b', text):
+            return "counts"
+        if re.search(r'\b(non[- ]?healthy|unhealthy|not healthy|problem\w*|failing|degraded)\b', text):
+            return "non_healthy"
+        return getattr(self, 'detail_level', None) or "full"
+
+    def _format_service(self, service: dict[str, Any]) -> dict[str, Any]:
+        """Format one /services entry for the JSON response"""
+        return {
+            "id": service.get("id", "Unknown"),
+            "name": service.get("name", "Unknown"),
+            "status": service.get("status", "unknown"),
+            "remediation_in_progress": service.get("remediationInProgress", False),
+            "awaiting_remediation": service.get("awaitingRemediation", False)
+        }
+
     def get_services_overview(self) -> Message:
         """Get formatted overview of all services as a tool response"""
+        return run_sync(self.get_services_overview_async())
+
+    @instrumented("ServiceLister")
+    async def get_services_overview_async(self) -> Message:
+        """Get formatted overview of all services as a tool response without blocking the event loop"""
         try:
-            services_data = self._make_api_call("/services")
-
-            if not isinstance(services_data, list):
-                raise ValueError("Invalid response format from backend")
-
-            # Calculate statistics
-            total_services = len(services_data)
-            healthy_count = sum(
-                1 for s in services_data if s.get("status") == "healthy"
-            )
-            warning_count = sum(
-                1 for s in services_data if s.get("status") == "warning"
-            )
-            critical_count = sum(
-                1 for s in services_data if s.get("status") == "critical"
-            )
-
-            # Format services for JSON response
-            formatted_services = []
-            for service in services_data:
-                service_info = {
-                    "id": service.get("id", "Unknown"),
-                    "name": service.get("name", "Unknown"),
-                    "status": service.get("status", "unknown"),
-                    "remediation_in_progress": service.get("remediationInProgress", False),
-                    "awaiting_remediation": service.get("awaitingRemediation", False)
-                }
-                formatted_services.append(service_info)
+            user_input = getattr(self, 'query', '') or ''
+            cursor = self._requested_cursor(user_input)
+            detail_level = self._requested_detail_level(user_input)
+            filters = self._requested_filters()
+            offset, page_size = self._requested_page()
+            
+            if not cursor and (filters or page_size or offset):
+                json_response = await self._get_filtered_page(filters, offset, page_size, detail_level != "counts")
+                json_response["timings"] = timing_summary()
+                summary = json_response["summary"]
+                self.status = f"Found {summary['matching_services']} matching services, returned {summary['returned']}"
+                return Message(text=dumps(json_response), sender="ServiceLister")
+            
+            snapshot, unchanged = await self._refresh_snapshot()
+            services_data = snapshot.services
+            
+            since_version = snapshot.parse_cursor(cursor) if cursor else None
+            list_services = since_version is None and detail_level != "counts"
+
+            with timed("build_response"):
+                # Count statuses and format the listed services in one pass
+                status_counts = Counter()
+                formatted_services = []
+                for service in services_data:
+                    status = service.get("status", "unknown")
+                    status_counts[status] += 1
+                    if list_services and (detail_level == "full" or status != "healthy"):
+                        formatted_services.append(self._format_service(service))
 
-            # Create JSON response
-            json_response = {
-                "component": "ServiceLister",
-                "summary": {
+                total_services = len(services_data)
+                healthy_count = status_counts["healthy"]
+                critical_count = status_counts["critical"]
+                summary = {
                     "total_services": total_services,
                     "healthy_count": healthy_count,
-                    "warning_count": warning_count,
-                    "critical_count": critical_count
-                },
-                "services": formatted_services
-            }
+                    "warning_count": status_counts["warning"],
+                    "critical_count": critical_count,
+                    "status_counts": dict(status_counts)
+                }
+                
+                if since_version is not None:
+                    # Delta: only services whose tracked fields changed after the cursor
+                    changed, removed = snapshot.changes_since(since_version)
+                    json_response = {
+                        "component": "ServiceLister",
+                        "mode": "delta",
+                        "cursor": snapshot.cursor,
+                        "since_cursor": cursor,
+                        "unchanged": not changed and not removed,
+                        "summary": summary
+                    }
+                    if detail_level != "counts":
+                        json_response["changed_services"] = [
+                            self._format_service(service) for service in changed
+                            if self._matches_filters(service, filters)
+                        ]
+                        json_response["removed_service_ids"] = removed
+                else:
+                    json_response = {
+                        "component": "ServiceLister",
+                        "cursor": snapshot.cursor,
+                        "detail_level": detail_level,
+                        "summary": summary
+                    }
+                    if list_services:
+                        json_response["services"] = formatted_services
+                    if cursor:
+                        # Unknown or expired cursor - fall back to the full list
+                        json_response["mode"] = "full"
+                        json_response["cursor_expired"] = True
+                json_response["payload_unchanged"] = unchanged
+            json_response["timings"] = timing_summary()
 
             self.status = f"Found {total_services} services - {healthy_count} healthy, {critical_count} critical"
-            return Message(text=json.dumps(json_response), sender="ServiceLister")
+            return Message(text=dumps(json_response), sender="ServiceLister")
 
         except Exception as e:
+            mark_failed()
             error_message = f"❌ Error getting service list: {str(e)}"
             self.status = error_message
             return Message(text=error_message, sender="ServiceLister")
\ No newline at end of file
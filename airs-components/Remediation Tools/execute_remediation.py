@@ -1,13 +1,19 @@
 # remediation_tools/execute_remediation.py
 from typing import Any, Optional
-import requests
-import re
-import json
-from urllib.parse import urlparse
+import httpx
 from langflow.custom import Component
 from langflow.io import MessageTextInput, Output
 from langflow.schema import Message
 
+from airs_common.concurrency import run_sync
+from airs_common.http_client import get_async_client
+from airs_common.instrumentation import instrumented, mark_failed, timed, timed_request, timing_summary
+from airs_common.metric_history import record_metrics_response
+from airs_common.response_cache import response_cache
+from airs_common.serialization import dumps, loads
+from airs_common.service_resolver import resolve_service_id
+from airs_common.url_validation import validate_backend_url
+
 
 class ExecuteRemediation(Component):
     display_name = "Execute Remediation"
@@ -35,7 +41,7 @@ class ExecuteRemediation(Component):
         Output(
             display_name="Remediation Result",
             name="remediation_result",
-            method="execute_remediation_action"
+            method="execute_remediation_action_async"
         )
     ]
 
@@ -45,58 +51,19 @@ class ExecuteRemediation(Component):
 
     def _validate_backend_url(self, url: str) -> str:
         """Validate and sanitize backend URL"""
-        if not url:
-            raise ValueError("Backend URL cannot be empty")
-        
-        # Basic URL format validation
-        if not re.match(r'^https?://', url):
-            raise ValueError("Backend URL must start with http:// or https://")
-        
-        parsed = urlparse(url)
-        
-        # Security validations
-        if parsed.scheme not in ['http', 'https']:
-            raise ValueError("Invalid URL scheme. Must be http or https")
-        
-        if not parsed.hostname:
-            raise ValueError("Invalid URL: missing hostname")
-        
-        # Prevent credential leakage in URLs
-        if parsed.username or parsed.password:
-            raise ValueError("URL must not contain username or password")
-        
-        # Prevent potentially dangerous URL components
-        if parsed.query or parsed.fragment:
-            raise ValueError("URL must not contain query parameters or fragments")
-        
-        # Basic port validation
-        if parsed.port and (parsed.port < 1 or parsed.port > 65535):
-            raise ValueError("Invalid port number")
-        
-        return url.rstrip('/')
+        return validate_backend_url(url)
 
-    def _parse_remediation_command(self, user_input: str) -> tuple[str, str, str]:
+    async def _parse_remediation_command(self, user_input: str) -> tuple[str, str, str]:
         """Parse remediation command to extract service ID, action, and reason"""
         user_input_lower = user_input.lower()
         
         # Extract service ID
-        service_id_match = re.search(r'\b(S[1-9]\d*)\b', user_input.upper())
-        if service_id_match:
-            service_id = service_id_match.group(1)
-        else:
-            service_mapping = {
-                'payment': 'S1',
-                'auth': 'S2',
-                'inventory': 'S3',
-                'reporting': 'S4', 
-                'search': 'S5',
-                'log': 'S6'
-            }
-            service_id = "S1"
-            for key, sid in service_mapping.items():
-                if key in user_input_lower:
-                    service_id = sid
-                    break
+        backend_url = self._validate_backend_url(self.backend_url)
+        service_id = await resolve_service_id(
+            backend_url, user_input, lambda: self._make_api_call("/services")
+        )
+        if service_id is None:
+            raise ValueError("Could not identify the service to remediate. Please specify a service ID or name")
         
         # Extract action
         action_mapping = {
@@ -118,36 +85,43 @@ class ExecuteRemediation(Component):
         
         return service_id, action, reason
 
-    def _make_api_call(self, endpoint: str, method: str = "GET", data: Optional[dict] = None) -> Any:
+    async def _make_api_call(self, endpoint: str, method: str = "GET", data: Optional[dict] = None) -> Any:
         """Make API call to backend with error handling"""
         # Validate URL first
-        backend_url = self._validate_backend_url(self.backend_url)
+        with timed("validate_url"):
+            backend_url = self._validate_backend_url(self.backend_url)
         url = f"{backend_url}/api{endpoint}"
         
         try:
-            if method.upper() == "POST":
-                # For POST requests, data should not be None
-                if data is None:
-                    data = {}
-                response = requests.post(url, json=data, timeout=self.timeout)
-            else:
-                response = requests.get(url, timeout=self.timeout)
-                
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError:
+            with timed_request(method, endpoint):
+                if method.upper() == "POST":
+                    # For POST requests, data should not be None
+                    if data is None:
+                        data = {}
+                    response = await get_async_client(backend_url).post(url, json=data, timeout=self.timeout)
+                    # Service state may have changed - drop cached diagnostics for this backend
+                    response_cache.invalidate(f"{backend_url}/api/services")
+                else:
+                    response = await get_async_client(backend_url).get(url, timeout=self.timeout)
+                    
+                response.raise_for_status()
+            with timed("parse"):
+                data = loads(response.content)
+            record_metrics_response(backend_url, endpoint, data)
+            return data
+        except httpx.ConnectError:
             # Sanitized error message - no URL exposure
             raise ConnectionError("Cannot connect to AIRS backend service")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise TimeoutError(f"Backend request timed out after {self.timeout} seconds")
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             # Sanitized error messages
             if e.response.status_code == 404:
                 raise ValueError("Service not found")
             elif e.response.status_code == 409:
                 # Try to get error message from response, but sanitize it
                 try:
-                    error_data = e.response.json()
+                    error_data = loads(e.response.content)
                     error_msg = error_data.get('error', 'Remediation conflict')
                     raise Exception(f"Remediation conflict: {error_msg}")
                 except:
@@ -159,16 +133,21 @@ class ExecuteRemediation(Component):
 
     def execute_remediation_action(self) -> Message:
         """Execute remediation action and return result"""
+        return run_sync(self.execute_remediation_action_async())
+
+    @instrumented("ExecuteRemediation")
+    async def execute_remediation_action_async(self) -> Message:
+        """Execute remediation action and return result without blocking the event loop"""
         try:
             user_input = getattr(self, 'remediation_command', '').strip()
             if not user_input:
                 raise ValueError("Please specify the remediation action to execute")
             
             # Parse the command
-            service_id, action, reason = self._parse_remediation_command(user_input)
+            service_id, action, reason = await self._parse_remediation_command(user_input)
             
             # First, check if service exists and is in a state that allows remediation
-            service_data = self._make_api_call(f"/services/{service_id}/metrics")
+            service_data = await self._make_api_call(f"/services/{service_id}/metrics")
             service_name = service_data.get('name', 'Unknown Service')
             service_status = service_data.get('status', 'unknown')
             
@@ -185,32 +164,35 @@ class ExecuteRemediation(Component):
                 "reason": reason
             }
             
-            result = self._make_api_call(
+            result = await self._make_api_call(
                 f"/services/{service_id}/remediate", 
                 method="POST", 
                 data=remediation_data
             )
             
-            # Create JSON response
-            json_response = {
-                "component": "ExecuteRemediation",
-                "service_id": service_id,
-                "service_name": service_name,
-                "service_status": service_status,
-                "action": action,
-                "action_display_name": action.replace('_', ' ').title(),
-                "reason": reason,
-                "status": "initiated",
-                "estimated_completion_ms": result.get('estimated_completion', 5000) if isinstance(result, dict) else 5000,
-                "success_probability": result.get('success_probability', 0.8) if isinstance(result, dict) else 0.8,
-                "backend_message": result.get('message', 'Remediation initiated') if isinstance(result, dict) else 'Remediation initiated',
-                "remediation_in_progress": True
-            }
+            with timed("build_response"):
+                # Create JSON response
+                json_response = {
+                    "component": "ExecuteRemediation",
+                    "service_id": service_id,
+                    "service_name": service_name,
+                    "service_status": service_status,
+                    "action": action,
+                    "action_display_name": action.replace('_', ' ').title(),
+                    "reason": reason,
+                    "status": "initiated",
+                    "estimated_completion_ms": result.get('estimated_completion', 5000) if isinstance(result, dict) else 5000,
+                    "success_probability": result.get('success_probability', 0.8) if isinstance(result, dict) else 0.8,
+                    "backend_message": result.get('message', 'Remediation initiated') if isinstance(result, dict) else 'Remediation initiated',
+                    "remediation_in_progress": True
+                }
+            json_response["timings"] = timing_summary()
 
             self.status = f"Remediation action '{action}' initiated for {service_name}"
-            return Message(text=json.dumps(json_response), sender="ExecuteRemediation")
+            return Message(text=dumps(json_response), sender="ExecuteRemediation")
             
         except Exception as e:
+            mark_failed()
             error_message = f"❌ Error executing remediation action: {str(e)}"
             self.status = error_message
             return Message(text=error_message, sender="ExecuteRemediation")
\ No newline at end of file
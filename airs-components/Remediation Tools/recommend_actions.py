@@ -1,13 +1,20 @@
 # remediation_tools/recommend_actions.py
-from typing import Any
-import requests
-import re
-import json
-from urllib.parse import urlparse
+from typing import Any, Mapping, Optional
+import httpx
 from langflow.custom import Component
 from langflow.io import MessageTextInput, Output
 from langflow.schema import Message
 
+from airs_common.concurrency import gather_bounded, run_sync
+from airs_common.http_client import get_async_client
+from airs_common.instrumentation import instrumented, mark_failed, timed, timed_request, timing_summary
+from airs_common.json_stream import LOG_ANALYSIS_FIELDS, fields_cache_key, read_fields
+from airs_common.metric_history import record_metrics_response
+from airs_common.response_cache import MISSING, response_cache
+from airs_common.serialization import dumps, loads
+from airs_common.service_resolver import resolve_service_id
+from airs_common.url_validation import validate_backend_url
+
 
 class RecommendActions(Component):
     display_name = "Recommend Actions"
@@ -35,7 +42,7 @@ class RecommendActions(Component):
         Output(
             display_name="Action Recommendations",
             name="action_recommendations",
-            method="get_action_recommendations",
+            method="get_action_recommendations_async",
         )
     ]
 
@@ -45,77 +52,57 @@ class RecommendActions(Component):
 
     def _validate_backend_url(self, url: str) -> str:
         """Validate and sanitize backend URL"""
-        if not url:
-            raise ValueError("Backend URL cannot be empty")
-        
-        # Basic URL format validation
-        if not re.match(r'^https?://', url):
-            raise ValueError("Backend URL must start with http:// or https://")
-        
-        parsed = urlparse(url)
-        
-        # Security validations
-        if parsed.scheme not in ['http', 'https']:
-            raise ValueError("Invalid URL scheme. Must be http or https")
-        
-        if not parsed.hostname:
-            raise ValueError("Invalid URL: missing hostname")
-        
-        # Prevent credential leakage in URLs
-        if parsed.username or parsed.password:
-            raise ValueError("URL must not contain username or password")
-        
-        # Prevent potentially dangerous URL components
-        if parsed.query or parsed.fragment:
-            raise ValueError("URL must not contain query parameters or fragments")
-        
-        # Basic port validation
-        if parsed.port and (parsed.port < 1 or parsed.port > 65535):
-            raise ValueError("Invalid port number")
-        
-        return url.rstrip('/')
+        return validate_backend_url(url)
 
-    def _extract_service_id(self, user_input: str) -> str:
+    async def _extract_service_id(self, user_input: str) -> str:
         """Extract service ID from natural language input"""
-        input_upper = user_input.upper()
-
-        service_id_match = re.search(r"\b(S[1-9]\d*)\b", input_upper)
-        if service_id_match:
-            return service_id_match.group(1)
-
-        service_mapping = {
-            "PAYMENT": "S1",
-            "AUTH": "S2",
-            "INVENTORY": "S3",
-            "REPORTING": "S4",
-            "SEARCH": "S5",
-            "LOG": "S6",
-        }
-
-        for key, service_id in service_mapping.items():
-            if key in input_upper:
-                return service_id
+        backend_url = self._validate_backend_url(self.backend_url)
+        service_id = await resolve_service_id(
+            backend_url, user_input, lambda: self._make_api_call("/services")
+        )
+        if service_id is None:
+            raise ValueError("Could not identify the service. Please specify a service ID or name")
+        return service_id
 
-        return "S1"
+    async def _make_api_call(self, endpoint: str, fields: Optional[Mapping[str, Optional[int]]] = None) -> Any:
+        """Make API call to backend with error handling.
 
-    def _make_api_call(self, endpoint: str) -> Any:
-        """Make API call to backend with error handling"""
+        With fields, only those fields of the JSON object are read (see json_stream).
+        """
         # Validate URL first
-        backend_url = self._validate_backend_url(self.backend_url)
+        with timed("validate_url"):
+            backend_url = self._validate_backend_url(self.backend_url)
         url = f"{backend_url}/api{endpoint}"
         
+        # Serve recently fetched documents from the shared cache
+        cache_key = url if fields is None else fields_cache_key(url, fields)
+        cached = response_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+        
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError:
+            if fields is not None:
+                with timed_request("GET", endpoint):
+                    async with get_async_client(backend_url).stream("GET", url, timeout=self.timeout) as response:
+                        response.raise_for_status()
+                        data = await read_fields(response, fields)
+            else:
+                with timed_request("GET", endpoint):
+                    response = await get_async_client(backend_url).get(url, timeout=self.timeout)
+                    response.raise_for_status()
+                with timed("parse"):
+                    data = loads(response.content)
+            response_cache.set(cache_key, data)
+            record_metrics_response(backend_url, endpoint, data)
+            return data
+        except httpx.ConnectError:
             # Sanitized error message - no URL exposure
             raise ConnectionError("Cannot connect to AIRS backend service")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise TimeoutError(
                 f"Backend request timed out after {self.timeout} seconds"
             )
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             # Sanitized - only status code, no URL
             if e.response.status_code == 404:
                 raise ValueError("Service not found")
@@ -215,6 +202,11 @@ class RecommendActions(Component):
 
     def get_action_recommendations(self) -> Message:
         """Get recommended remediation actions as a tool response"""
+        return run_sync(self.get_action_recommendations_async())
+
+    @instrumented("RecommendActions")
+    async def get_action_recommendations_async(self) -> Message:
+        """Get recommended remediation actions as a tool response without blocking the event loop"""
         try:
             user_input = getattr(self, "service_input", "").strip()
             if not user_input:
@@ -222,40 +214,45 @@ class RecommendActions(Component):
                     "Please specify the service and context for action recommendations"
                 )
 
-            service_id = self._extract_service_id(user_input)
+            service_id = await self._extract_service_id(user_input)
 
             # Get service health and log analysis to determine root cause
-            health_data = self._make_api_call(f"/services/{service_id}/metrics")
-            log_analysis = self._make_api_call(f"/services/{service_id}/logs/analysis")
+            health_data, log_analysis = await gather_bounded(
+                self._make_api_call(f"/services/{service_id}/metrics"),
+                self._make_api_call(f"/services/{service_id}/logs/analysis", LOG_ANALYSIS_FIELDS),
+            )
 
             if not isinstance(health_data, dict) or not isinstance(log_analysis, dict):
                 raise ValueError("Invalid response format from backend")
 
-            service_name = health_data.get("name", "Unknown Service")
-            service_status = health_data.get("status", "unknown")
-            root_cause = log_analysis.get("root_cause", "general_performance_issue")
+            with timed("build_response"):
+                service_name = health_data.get("name", "Unknown Service")
+                service_status = health_data.get("status", "unknown")
+                root_cause = log_analysis.get("root_cause", "general_performance_issue")
 
-            # Get recommended actions
-            recommendations = self._recommend_actions_by_root_cause(
-                root_cause, health_data
-            )
+                # Get recommended actions
+                recommendations = self._recommend_actions_by_root_cause(
+                    root_cause, health_data
+                )
 
-            # Create JSON response
-            json_response = {
-                "component": "RecommendActions",
-                "service_id": service_id,
-                "service_name": service_name,
-                "service_status": service_status,
-                "root_cause": root_cause,
-                "root_cause_display": root_cause.replace("_", " ").title(),
-                "recommendations": recommendations,
-                "total_recommendations": len(recommendations),
-            }
+                # Create JSON response
+                json_response = {
+                    "component": "RecommendActions",
+                    "service_id": service_id,
+                    "service_name": service_name,
+                    "service_status": service_status,
+                    "root_cause": root_cause,
+                    "root_cause_display": root_cause.replace("_", " ").title(),
+                    "recommendations": recommendations,
+                    "total_recommendations": len(recommendations),
+                }
+            json_response["timings"] = timing_summary()
 
             self.status = f"Generated {len(recommendations)} action recommendations for {service_name}"
-            return Message(text=json.dumps(json_response), sender="RecommendActions")
+            return Message(text=dumps(json_response), sender="RecommendActions")
 
         except Exception as e:
+            mark_failed()
             error_message = f"❌ Error generating action recommendations: {str(e)}"
             self.status = error_message
             return Message(text=error_message, sender="RecommendActions")
\ No newline at end of file
@@ -1,13 +1,22 @@
 # remediation_tools/remediation_verifier.py
-from typing import Any
-import requests
+from typing import Any, Optional
+import asyncio
+import httpx
 import re
-import json
-from urllib.parse import urlparse
+import time
 from langflow.custom import Component
-from langflow.io import MessageTextInput, Output
+from langflow.io import BoolInput, IntInput, MessageTextInput, Output
 from langflow.schema import Message
 
+from airs_common.concurrency import run_sync
+from airs_common.http_client import get_async_client
+from airs_common.instrumentation import instrumented, mark_failed, timed, timed_request, timing_summary
+from airs_common.metric_history import metric_history, record_metrics_response
+from airs_common.serialization import dumps, loads
+from airs_common.service_resolver import resolve_service_id
+from airs_common.thresholds import get_threshold_profiles
+from airs_common.url_validation import validate_backend_url
+
 
 class RemediationVerifier(Component):
     display_name = "Remediation Verifier"
@@ -28,6 +37,20 @@ class RemediationVerifier(Component):
             info="Service to verify remediation success for (e.g., 'verify S1 recovery', 'check if Payment Gateway is healthy')",
             tool_mode=True,
             value="Verify remediation for service S1"
+        ),
+        BoolInput(
+            name="wait_for_recovery",
+            display_name="Wait For Recovery",
+            info="Poll until remediation settles instead of taking a single snapshot. Also enabled by 'wait' or 'until' in the request.",
+            value=False,
+            advanced=True,
+        ),
+        IntInput(
+            name="max_wait_seconds",
+            display_name="Max Wait (seconds)",
+            info="Upper bound on how long to poll when waiting for recovery",
+            value=60,
+            advanced=True,
         )
     ]
 
@@ -35,85 +58,51 @@ class RemediationVerifier(Component):
         Output(
             display_name="Verification Result",
             name="verification_result",
-            method="verify_remediation_success"
+            method="verify_remediation_success_async"
         )
     ]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.timeout = 10
+        self.initial_poll_interval = 0.5  # Seconds before the second poll
+        self.max_poll_interval = 4.0  # Backoff ceiling between polls
 
     def _validate_backend_url(self, url: str) -> str:
         """Validate and sanitize backend URL"""
-        if not url:
-            raise ValueError("Backend URL cannot be empty")
-        
-        # Basic URL format validation
-        if not re.match(r'^https?://', url):
-            raise ValueError("Backend URL must start with http:// or https://")
-        
-        parsed = urlparse(url)
-        
-        # Security validations
-        if parsed.scheme not in ['http', 'https']:
-            raise ValueError("Invalid URL scheme. Must be http or https")
-        
-        if not parsed.hostname:
-            raise ValueError("Invalid URL: missing hostname")
-        
-        # Prevent credential leakage in URLs
-        if parsed.username or parsed.password:
-            raise ValueError("URL must not contain username or password")
-        
-        # Prevent potentially dangerous URL components
-        if parsed.query or parsed.fragment:
-            raise ValueError("URL must not contain query parameters or fragments")
-        
-        # Basic port validation
-        if parsed.port and (parsed.port < 1 or parsed.port > 65535):
-            raise ValueError("Invalid port number")
-        
-        return url.rstrip('/')
+        return validate_backend_url(url)
 
-    def _extract_service_id(self, user_input: str) -> str:
+    async def _extract_service_id(self, user_input: str) -> str:
         """Extract service ID from natural language input"""
-        input_upper = user_input.upper()
-        
-        service_id_match = re.search(r'\b(S[1-9]\d*)\b', input_upper)
-        if service_id_match:
-            return service_id_match.group(1)
-        
-        service_mapping = {
-            'PAYMENT': 'S1',
-            'AUTH': 'S2',
-            'INVENTORY': 'S3',
-            'REPORTING': 'S4',
-            'SEARCH': 'S5',
-            'LOG': 'S6'
-        }
-        
-        for key, service_id in service_mapping.items():
-            if key in input_upper:
-                return service_id
-        
-        return "S1"
+        backend_url = self._validate_backend_url(self.backend_url)
+        service_id = await resolve_service_id(
+            backend_url, user_input, lambda: self._make_api_call("/services")
+        )
+        if service_id is None:
+            raise ValueError("Could not identify the service. Please specify a service ID or name")
+        return service_id
 
-    def _make_api_call(self, endpoint: str) -> Any:
+    async def _make_api_call(self, endpoint: str) -> Any:
         """Make API call to backend with error handling"""
         # Validate URL first
-        backend_url = self._validate_backend_url(self.backend_url)
+        with timed("validate_url"):
+            backend_url = self._validate_backend_url(self.backend_url)
         url = f"{backend_url}/api{endpoint}"
         
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError:
+            with timed_request("GET", endpoint):
+                response = await get_async_client(backend_url).get(url, timeout=self.timeout)
+                response.raise_for_status()
+            with timed("parse"):
+                data = loads(response.content)
+            record_metrics_response(backend_url, endpoint, data)
+            return data
+        except httpx.ConnectError:
             # Sanitized error message - no URL exposure
             raise ConnectionError("Cannot connect to AIRS backend service")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise TimeoutError(f"Backend request timed out after {self.timeout} seconds")
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             # Sanitized - only status code, no URL
             if e.response.status_code == 404:
                 raise ValueError("Service not found")
@@ -128,21 +117,9 @@ class RemediationVerifier(Component):
         service_status = service_data.get('status', 'unknown')
         
         # Check critical metrics against thresholds
-        healthy_metrics = 0
-        total_metrics = 0
-        
-        metric_thresholds = {
-            'cpu': 70,  # Below 70% is healthy
-            'memory': 75,  # Below 75% is healthy  
-            'latency': 300,  # Below 300ms is healthy
-            'error_rate': 5  # Below 5% is healthy
-        }
-        
-        for metric, threshold in metric_thresholds.items():
-            if metric in metrics:
-                total_metrics += 1
-                if metrics[metric] < threshold:
-                    healthy_metrics += 1
+        levels = get_threshold_profiles().classify(service_data.get('id'), metrics)
+        total_metrics = len(levels)
+        healthy_metrics = sum(1 for level in levels.values() if level == 'healthy')
         
         # Calculate health score
         health_score = (healthy_metrics / total_metrics) * 100 if total_metrics > 0 else 0
@@ -170,88 +147,175 @@ class RemediationVerifier(Component):
             'total_metrics': total_metrics
         }
 
-    def _assess_metric_status(self, metric_name: str, value: float) -> str:
-        """Assess individual metric status"""
-        thresholds = {
-            'cpu': {'warn': 70, 'crit': 85},
-            'memory': {'warn': 75, 'crit': 90},
-            'latency': {'warn': 300, 'crit': 500},
-            'error_rate': {'warn': 5, 'crit': 10}
+    def _wants_convergence(self, user_input: str) -> bool:
+        """Check whether to poll until remediation settles"""
+        if getattr(self, 'wait_for_recovery', False):
+            return True
+        return bool(re.search(r'\b(wait|until)\b', user_input.lower()))
+
+    def _get_action_completion_times(self) -> dict[str, int]:
+        """Expected completion time in ms for each remediation action"""
+        return {
+            'restart_service': 4000,
+            'scale_instances': 6000,
+            'scale_memory': 5000,
+            'clear_cache': 3000,
+            'kill_connections': 3500
         }
+
+    def _get_wait_deadline_seconds(self, user_input: str, service_data: dict[str, Any]) -> float:
+        """Derive how long to poll from the action's estimated completion time"""
+        # Prefer an estimate handed over from ExecuteRemediation's response
+        estimate_match = re.search(r'\bestimated_completion_ms\b["\']?\s*[:=]?\s*(\d+)', user_input.lower())
+        if estimate_match:
+            estimated_ms = int(estimate_match.group(1))
+        else:
+            last_incident = service_data.get('lastIncident') or {}
+            action = last_incident.get('action_taken') if isinstance(last_incident, dict) else None
+            estimated_ms = self._get_action_completion_times().get(action, 5000)
         
-        if metric_name in thresholds:
-            threshold = thresholds[metric_name]
-            if value >= threshold['crit']:
-                return "critical"
-            elif value >= threshold['warn']:
-                return "warning"
-            else:
-                return "healthy"
-        return "unknown"
+        # Allow twice the estimate for the backend to settle, within the configured cap
+        max_wait = getattr(self, 'max_wait_seconds', 60) or 60
+        return min(2 * estimated_ms / 1000, float(max_wait))
+
+    async def _poll_until_converged(
+        self, service_id: str, user_input: str
+    ) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+        """Poll service state with exponential backoff until remediation settles or the deadline passes"""
+        started = time.monotonic()
+        delay = self.initial_poll_interval
+        deadline: Optional[float] = None
+        polls = 0
+        
+        while True:
+            service_data = await self._make_api_call(f"/services/{service_id}/metrics")
+            polls += 1
+            
+            if not isinstance(service_data, dict):
+                raise ValueError("Invalid response format from backend")
+            
+            verification_result = self._assess_remediation_success(service_data)
+            elapsed = time.monotonic() - started
+            if deadline is None:
+                deadline = self._get_wait_deadline_seconds(user_input, service_data)
+            
+            # Done once the service has recovered or the backend finished remediating
+            converged = verification_result['success'] is True or not service_data.get('remediationInProgress', False)
+            if converged or elapsed >= deadline:
+                break
+            
+            await asyncio.sleep(min(delay, deadline - elapsed))
+            delay = min(delay * 2, self.max_poll_interval)
+        
+        convergence = {
+            "mode": "until_converged",
+            "converged": converged,
+            "polls": polls,
+            "wait_deadline_seconds": deadline,
+            "elapsed_seconds": round(elapsed, 3),
+            "time_to_recovery_seconds": round(elapsed, 3) if verification_result['success'] is True else None
+        }
+        return service_data, verification_result, convergence
 
     def verify_remediation_success(self) -> Message:
         """Verify remediation success and return result"""
+        return run_sync(self.verify_remediation_success_async())
+
+    @instrumented("RemediationVerifier")
+    async def verify_remediation_success_async(self) -> Message:
+        """Verify remediation success and return result without blocking the event loop"""
         try:
             user_input = getattr(self, 'verification_request', '').strip()
             if not user_input:
                 raise ValueError("Please specify which service to verify")
             
-            service_id = self._extract_service_id(user_input)
-            
-            # Get current service state
-            service_data = self._make_api_call(f"/services/{service_id}/metrics")
+            service_id = await self._extract_service_id(user_input)
             
-            if not isinstance(service_data, dict):
-                raise ValueError("Invalid response format from backend")
-            
-            service_name = service_data.get('name', 'Unknown Service')
+            convergence = None
+            if self._wants_convergence(user_input):
+                service_data, verification_result, convergence = await self._poll_until_converged(
+                    service_id, user_input
+                )
+            else:
+                # Get current service state
+                service_data = await self._make_api_call(f"/services/{service_id}/metrics")
+                
+                if not isinstance(service_data, dict):
+                    raise ValueError("Invalid response format from backend")
+                
+                # Assess remediation success
+                verification_result = self._assess_remediation_success(service_data)
             
-            # Assess remediation success
-            verification_result = self._assess_remediation_success(service_data)
+            with timed("build_response"):
+                service_name = service_data.get('name', 'Unknown Service')
             
-            # Format metrics for JSON response
-            metrics = service_data.get('metrics', {})
-            formatted_metrics = []
-            metric_display = {
-                'cpu': ('CPU Usage', '%'),
-                'memory': ('Memory Usage', '%'), 
-                'latency': ('Latency', 'ms'),
-                'error_rate': ('Error Rate', '%'),
-                'throughput': ('Throughput', 'req/s')
-            }
+                # Format metrics for JSON response
+                metrics = service_data.get('metrics', {})
+                formatted_metrics = []
+                metric_display = {
+                    'cpu': ('CPU Usage', '%'),
+                    'memory': ('Memory Usage', '%'), 
+                    'latency': ('Latency', 'ms'),
+                    'error_rate': ('Error Rate', '%'),
+                    'throughput': ('Throughput', 'req/s')
+                }
             
-            for metric_key, (display_name, unit) in metric_display.items():
-                if metric_key in metrics:
-                    value = metrics[metric_key]
-                    status = self._assess_metric_status(metric_key, value)
-                    formatted_metrics.append({
-                        "name": metric_key,
-                        "display_name": display_name,
-                        "value": value,
-                        "unit": unit,
-                        "status": status
-                    })
+                thresholds = get_threshold_profiles().table_for(service_id)
+                levels = thresholds.classify(metrics)
+                
+                # Trends over recent samples show whether recovery is holding
+                history = metric_history.summary(self._validate_backend_url(self.backend_url), service_id)
+                history_metrics = history['metrics'] if history else {}
+                
+                for metric_key, (display_name, unit) in metric_display.items():
+                    if metric_key in metrics:
+                        value = metrics[metric_key]
+                        status = levels.get(metric_key, 'unknown')
+                        entry = {
+                            "name": metric_key,
+                            "display_name": display_name,
+                            "value": value,
+                            "unit": unit,
+                            "status": status
+                        }
+                        stats = history_metrics.get(metric_key)
+                        if stats is not None:
+                            entry.update({
+                                "smoothed_value": stats['smoothed'],
+                                "p95": stats['p95'],
+                                "trend": stats['trend']
+                            })
+                        formatted_metrics.append(entry)
             
-            # Create JSON response
-            json_response = {
-                "component": "RemediationVerifier",
-                "service_id": service_id,
-                "service_name": service_name,
-                "remediation_success": verification_result['success'],
-                "confidence": verification_result['confidence'],
-                "health_score": verification_result['health_score'],
-                "service_status": verification_result['service_status'],
-                "healthy_metrics": verification_result['healthy_metrics'],
-                "total_metrics": verification_result['total_metrics'],
-                "remediation_in_progress": service_data.get('remediationInProgress', False),
-                "awaiting_remediation": service_data.get('awaitingRemediation', False),
-                "metrics": formatted_metrics
-            }
+                # Create JSON response
+                json_response = {
+                    "component": "RemediationVerifier",
+                    "service_id": service_id,
+                    "service_name": service_name,
+                    "remediation_success": verification_result['success'],
+                    "confidence": verification_result['confidence'],
+                    "health_score": verification_result['health_score'],
+                    "service_status": verification_result['service_status'],
+                    "healthy_metrics": verification_result['healthy_metrics'],
+                    "total_metrics": verification_result['total_metrics'],
+                    "remediation_in_progress": service_data.get('remediationInProgress', False),
+                    "awaiting_remediation": service_data.get('awaitingRemediation', False),
+                    "threshold_profile": thresholds.name,
+                    "history": {
+                        "samples": history['samples'] if history else 0,
+                        "window_seconds": history['window_seconds'] if history else 0.0
+                    },
+                    "metrics": formatted_metrics
+                }
+                if convergence is not None:
+                    json_response["convergence"] = convergence
+            json_response["timings"] = timing_summary()
 
             self.status = f"Verification completed for {service_name}: {verification_result['success']}"
-            return Message(text=json.dumps(json_response), sender="RemediationVerifier")
+            return Message(text=dumps(json_response), sender="RemediationVerifier")
             
         except Exception as e:
+            mark_failed()
             error_message = f"❌ Error verifying remediation: {str(e)}"
             self.status = error_message
             return Message(text=error_message, sender="RemediationVerifier")
\ No newline at end of file
@@ -0,0 +1,78 @@
+# airs_common/__init__.py
+"""
+AIRS Shared Component Utilities
+
+Helpers shared by the diagnostic and remediation tool packages. This package
+contains no Langflow components of its own.
+"""
+
+from .concurrency import gather_bounded, run_sync
+from .correlation import correlate_services
+from .dependency_graph import DependencyGraph, get_dependency_graph, load_service_dependencies
+from .http_client import aclose_clients, configure_pool_size, get_async_client
+from .instrumentation import MetricsRegistry, instrumented, metrics_registry, timed, timing_summary
+from .json_stream import LOG_ANALYSIS_FIELDS, FieldExtractor, extract_fields, read_fields
+from .keyword_classifier import KeywordClassifier
+from .log_analysis import LOG_RULES, analyze_logs, get_log_classifier, load_log_categories
+from .log_templates import LogTemplateStore, TemplateMiner, distinct_messages, log_templates
+from .metric_history import MetricHistory, MetricHistoryStore, metric_history, record_metrics_response
+from .response_cache import MISSING, ResponseCache, response_cache
+from .root_cause_scoring import RootCauseScorer, get_root_cause_scorer, rank_root_causes
+from .serialization import configure_json_codec, dumps, get_json_codec, loads
+from .service_resolver import ServiceResolver, get_service_resolver, resolve_service_id, resolve_service_ids
+from .thresholds import ThresholdProfiles, ThresholdTable, get_threshold_profiles, load_threshold_profiles
+from .url_validation import check_backend_url, validate_backend_url
+
+__all__ = [
+    "DependencyGraph",
+    "FieldExtractor",
+    "KeywordClassifier",
+    "LOG_ANALYSIS_FIELDS",
+    "LOG_RULES",
+    "LogTemplateStore",
+    "MISSING",
+    "MetricHistory",
+    "MetricHistoryStore",
+    "MetricsRegistry",
+    "ResponseCache",
+    "RootCauseScorer",
+    "ServiceResolver",
+    "TemplateMiner",
+    "ThresholdProfiles",
+    "ThresholdTable",
+    "aclose_clients",
+    "analyze_logs",
+    "check_backend_url",
+    "configure_json_codec",
+    "configure_pool_size",
+    "correlate_services",
+    "distinct_messages",
+    "dumps",
+    "extract_fields",
+    "gather_bounded",
+    "get_async_client",
+    "get_dependency_graph",
+    "get_json_codec",
+    "get_log_classifier",
+    "get_root_cause_scorer",
+    "get_service_resolver",
+    "get_threshold_profiles",
+    "instrumented",
+    "load_log_categories",
+    "load_service_dependencies",
+    "load_threshold_profiles",
+    "loads",
+    "log_templates",
+    "metric_history",
+    "metrics_registry",
+    "rank_root_causes",
+    "read_fields",
+    "record_metrics_response",
+    "resolve_service_id",
+    "resolve_service_ids",
+    "response_cache",
+    "run_sync",
+    "timed",
+    "timing_summary",
+    "validate_backend_url",
+]
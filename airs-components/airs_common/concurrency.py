@@ -0,0 +1,69 @@
+# airs_common/concurrency.py
+"""
+Concurrent fan-out of backend calls and sync entry points for async code.
+
+Components that need several independent backend documents await them at the
+same time, so a tool call costs the slowest round trip instead of the sum of
+all of them. Synchronous callers run component coroutines on one shared
+background event loop, which keeps that loop's pooled connections warm.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Coroutine, Optional
+
+# Upper bound on backend calls in flight for one fan-out
+MAX_CONCURRENCY = int(os.getenv("AIRS_MAX_CONCURRENCY", "16"))
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+async def gather_bounded(
+    *aws: Awaitable[Any], limit: Optional[int] = None, return_exceptions: bool = False
+) -> list[Any]:
+    """Await aws concurrently, at most limit at a time, returning results in order.
+
+    The first exception is re-raised, so callers keep the same error handling
+    as sequential code. With return_exceptions=True exceptions are returned in
+    place of results instead, for fan-outs where one failed call should not
+    discard the rest.
+    """
+    semaphore = asyncio.Semaphore(limit or MAX_CONCURRENCY)
+
+    async def _bounded(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(
+        *(_bounded(aw) for aw in aws), return_exceptions=return_exceptions
+    )
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared background event loop, starting it on first use"""
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="airs-event-loop", daemon=True
+                ).start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion from synchronous code"""
+    loop = _get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync cannot be called from the shared event loop")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
@@ -0,0 +1,174 @@
+# airs_common/correlation.py
+"""
+Cross-service anomaly correlation.
+
+Takes the metrics and log analyses of many services, encodes each service as
+a boolean anomaly signature (metric threshold breaches plus detected log
+patterns) and groups services whose anomalies co-occur. When several services
+share a signature, a single shared cause is far more likely than several
+independent ones, so each group is reported with the cause its common signals
+point to.
+
+All signatures are compared at once as a matrix: pairwise Jaccard similarity
+is computed with two matrix products, and groups are the connected components
+of the similarity graph above a cut-off.
+"""
+
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+from .thresholds import WARNING, get_threshold_profiles
+
+# Log patterns reported by the backend's log analysis
+LOG_SIGNALS = ("high_cpu_usage", "memory_leak", "database_connection_issues", "high_latency")
+
+# Likely shared cause per signal, in tie-break priority order
+SHARED_CAUSES: dict[str, tuple[str, str]] = {
+    "log:database_connection_issues": ("shared_database_dependency", "A shared database or connection pool is failing"),
+    "log:high_latency": ("upstream_network_latency", "A shared network path or upstream dependency is slow"),
+    "metric:latency": ("upstream_network_latency", "A shared network path or upstream dependency is slow"),
+    "metric:error_rate": ("shared_downstream_failure", "A common downstream dependency is returning errors"),
+    "log:memory_leak": ("shared_memory_pressure", "Memory pressure common to these services, e.g. a shared host or a bad release"),
+    "metric:memory": ("shared_memory_pressure", "Memory pressure common to these services, e.g. a shared host or a bad release"),
+    "log:high_cpu_usage": ("shared_compute_saturation", "A traffic surge or shared host is saturating compute"),
+    "metric:cpu": ("shared_compute_saturation", "A traffic surge or shared host is saturating compute"),
+}
+_CAUSE_PRIORITY = {signal: rank for rank, signal in enumerate(SHARED_CAUSES)}
+
+# Minimum Jaccard similarity for two services to be grouped together
+SIMILARITY_THRESHOLD = 0.5
+
+
+def encode_signatures(
+    services: list[dict[str, Any]], log_analyses: list[dict[str, Any]]
+) -> tuple[tuple[str, ...], np.ndarray]:
+    """Encode services as a boolean (services x signals) anomaly matrix.
+
+    A metric at or above the warning threshold of the service's threshold
+    profile counts as anomalous. Returns the signal names (one per column)
+    and the matrix.
+    """
+    profiles = get_threshold_profiles()
+    values = profiles.values_matrix([s.get("metrics") or {} for s in services])
+    metric_breaches = profiles.classify_matrix([s.get("id") for s in services], values) >= WARNING
+
+    log_patterns = np.array(
+        [[name in set(a.get("patterns") or ()) for name in LOG_SIGNALS] for a in log_analyses],
+        dtype=bool,
+    ).reshape(len(log_analyses), len(LOG_SIGNALS))
+
+    signals = tuple(f"metric:{name}" for name in profiles.metrics) + tuple(f"log:{name}" for name in LOG_SIGNALS)
+    return signals, np.hstack([metric_breaches, log_patterns])
+
+
+def jaccard_similarity(signatures: np.ndarray) -> np.ndarray:
+    """Pairwise Jaccard similarity of boolean signatures"""
+    x = signatures.astype(np.float32)
+    intersection = x @ x.T
+    sizes = x.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, intersection / union, 0.0)
+
+
+def _connected_groups(adjacency: np.ndarray) -> list[list[int]]:
+    """Connected components of a boolean adjacency matrix"""
+    unvisited = np.ones(len(adjacency), dtype=bool)
+    groups = []
+    for start in range(len(adjacency)):
+        if not unvisited[start]:
+            continue
+        unvisited[start] = False
+        group, frontier = [start], [start]
+        while frontier:
+            neighbours = np.flatnonzero(adjacency[frontier].any(axis=0) & unvisited)
+            unvisited[neighbours] = False
+            frontier = neighbours.tolist()
+            group.extend(frontier)
+        groups.append(sorted(group))
+    return groups
+
+
+def _shared_cause(signals: tuple[str, ...], prevalence: np.ndarray) -> int:
+    """Index of the most prevalent signal in a group, ties broken by cause priority"""
+    return max(
+        np.flatnonzero(prevalence > 0),
+        key=lambda i: (prevalence[i], -_CAUSE_PRIORITY.get(signals[i], len(_CAUSE_PRIORITY))),
+    )
+
+
+def _describe_cause(signal: str) -> tuple[str, str]:
+    """Shared cause and description for a signal"""
+    if signal in SHARED_CAUSES:
+        return SHARED_CAUSES[signal]
+    name = signal.split(":", 1)[1]
+    return f"shared_{name}_anomaly", f"{name} is anomalous across these services"
+
+
+def correlate_services(
+    services: list[dict[str, Any]],
+    log_analyses: list[dict[str, Any]],
+    similarity_threshold: float = SIMILARITY_THRESHOLD,
+) -> dict[str, Any]:
+    """Group services whose anomalies co-occur and infer a shared cause per group.
+
+    services are /services/{id}/metrics documents and log_analyses the
+    matching /services/{id}/logs/analysis documents, in the same order.
+    """
+    signals, signatures = encode_signatures(services, log_analyses)
+    anomalous = np.flatnonzero(signatures.any(axis=1))
+
+    similarity = jaccard_similarity(signatures[anomalous])
+    groups = _connected_groups(similarity >= similarity_threshold)
+
+    correlated_groups = []
+    isolated = []
+    for group in groups:
+        members = anomalous[group]
+        if len(members) < 2:
+            service = services[members[0]]
+            isolated.append({
+                "service_id": service.get("id"),
+                "service_name": service.get("name"),
+                "signals": [signals[i] for i in np.flatnonzero(signatures[members[0]])],
+                "root_cause": log_analyses[members[0]].get("root_cause", "unknown"),
+            })
+            continue
+
+        prevalence = signatures[members].mean(axis=0)
+        signal = _shared_cause(signals, prevalence)
+        signal_prevalence = prevalence[signal]
+        cause, description = _describe_cause(signals[signal])
+        pair_similarity = similarity[np.ix_(group, group)][np.triu_indices(len(group), k=1)]
+        backend_causes = Counter(log_analyses[i].get("root_cause", "unknown") for i in members)
+
+        if signal_prevalence == 1.0 and len(members) >= 3:
+            confidence = "High"
+        elif signal_prevalence >= 0.75:
+            confidence = "Medium"
+        else:
+            confidence = "Low"
+
+        correlated_groups.append({
+            "likely_shared_cause": cause,
+            "description": description,
+            "confidence": confidence,
+            "service_count": len(members),
+            "service_ids": [services[i].get("id") for i in members],
+            "shared_signals": [signals[i] for i in np.flatnonzero(prevalence == 1.0)],
+            "signal_prevalence": {
+                signals[i]: round(float(prevalence[i]), 2) for i in np.flatnonzero(prevalence > 0)
+            },
+            "cohesion": round(float(pair_similarity.mean()), 2),
+            "backend_root_causes": dict(backend_causes.most_common()),
+        })
+
+    correlated_groups.sort(key=lambda g: (g["service_count"], g["cohesion"]), reverse=True)
+    return {
+        "services_analyzed": len(services),
+        "anomalous_count": int(len(anomalous)),
+        "correlated_groups": correlated_groups,
+        "isolated_anomalies": isolated,
+    }
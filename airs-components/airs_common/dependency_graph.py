@@ -0,0 +1,224 @@
+# airs_common/dependency_graph.py
+"""
+Service dependency graph and failure impact propagation.
+
+When a shared dependency fails, every service that depends on it degrades
+too, and looking at each one alone reports the same outage many times.
+DependencyGraph holds which services depend on which, indexed both ways
+(each service's upstream dependencies and downstream dependents as integer
+adjacency lists), and explains a set of unhealthy services by the failing
+services furthest upstream:
+
+- A root is an unhealthy service none of whose dependencies is unhealthy.
+  Services that depend on each other in a cycle are found as strongly
+  connected components of the unhealthy subgraph, so a failing cycle is one
+  root with several members.
+- One breadth-first search downstream from all roots at once gives the blast
+  radius; every impacted service is attributed to its nearest root.
+
+Both steps visit each service and dependency edge a constant number of
+times, so analysis stays linear in the size of the graph.
+
+The graph is configured as {"service_id": ["dependency_id", ...]} in a JSON
+file named by AIRS_SERVICE_DEPENDENCIES or inline in
+AIRS_SERVICE_DEPENDENCIES_JSON, or installed with load_service_dependencies().
+"""
+
+import json
+import os
+from collections import deque
+from typing import Any, Iterable, Mapping, Optional
+
+# Dependency graph sources
+DEPENDENCIES_PATH = os.getenv("AIRS_SERVICE_DEPENDENCIES", "")
+DEPENDENCIES_JSON = os.getenv("AIRS_SERVICE_DEPENDENCIES_JSON", "")
+
+
+class DependencyGraph:
+    """Services and their dependencies as upstream and downstream adjacency lists"""
+
+    def __init__(self, dependencies: Optional[Mapping[str, Iterable[str]]] = None):
+        dependencies = dependencies or {}
+        if not isinstance(dependencies, Mapping):
+            raise TypeError("Service dependencies must be an object of service: [dependencies]")
+
+        self.index: dict[str, int] = {}
+        self.services: list[str] = []
+        edges = []
+        for service, upstream in dependencies.items():
+            if isinstance(upstream, str) or not isinstance(upstream, Iterable):
+                raise TypeError(f"Dependencies of service {service!r} must be a list of service IDs")
+            for dependency in upstream:
+                if dependency == service:
+                    raise ValueError(f"Service {service!r} cannot depend on itself")
+                edges.append((self._add(str(service)), self._add(str(dependency))))
+            self._add(str(service))
+
+        # upstream[i]: services i depends on; downstream[i]: services that depend on i
+        self.upstream: list[list[int]] = [[] for _ in self.services]
+        self.downstream: list[list[int]] = [[] for _ in self.services]
+        for dependent, dependency in dict.fromkeys(edges):
+            self.upstream[dependent].append(dependency)
+            self.downstream[dependency].append(dependent)
+        self.edge_count = sum(len(upstream) for upstream in self.upstream)
+
+    def _add(self, service: str) -> int:
+        index = self.index.get(service)
+        if index is None:
+            index = self.index[service] = len(self.services)
+            self.services.append(service)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.services)
+
+    def __contains__(self, service: object) -> bool:
+        return service in self.index
+
+    def dependencies_of(self, service: str) -> list[str]:
+        """Services the service depends on directly"""
+        index = self.index.get(service)
+        return [self.services[i] for i in self.upstream[index]] if index is not None else []
+
+    def dependents_of(self, service: str) -> list[str]:
+        """Services that depend on the service directly"""
+        index = self.index.get(service)
+        return [self.services[i] for i in self.downstream[index]] if index is not None else []
+
+    def _unhealthy_components(self, unhealthy: list[int]) -> list[int]:
+        """Strongly connected component of each unhealthy service over unhealthy edges (Kosaraju).
+
+        Returns component numbers indexed like unhealthy.
+        """
+        position = {node: i for i, node in enumerate(unhealthy)}
+        upstream = [[position[d] for d in self.upstream[node] if d in position] for node in unhealthy]
+        downstream = [[position[d] for d in self.downstream[node] if d in position] for node in unhealthy]
+
+        # First pass: finishing order of an iterative depth-first search along upstream edges
+        order = []
+        visited = [False] * len(unhealthy)
+        for start in range(len(unhealthy)):
+            if visited[start]:
+                continue
+            visited[start] = True
+            stack = [(start, 0)]
+            while stack:
+                node, edge = stack[-1]
+                if edge < len(upstream[node]):
+                    stack[-1] = (node, edge + 1)
+                    following = upstream[node][edge]
+                    if not visited[following]:
+                        visited[following] = True
+                        stack.append((following, 0))
+                else:
+                    stack.pop()
+                    order.append(node)
+
+        # Second pass: components along downstream edges in reverse finishing order
+        component = [-1] * len(unhealthy)
+        count = 0
+        for start in reversed(order):
+            if component[start] != -1:
+                continue
+            component[start] = count
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                for following in downstream[node]:
+                    if component[following] == -1:
+                        component[following] = count
+                        stack.append(following)
+            count += 1
+        return component
+
+    def impact(self, unhealthy: Iterable[str]) -> dict[str, Any]:
+        """Explain unhealthy services by the failing services furthest upstream.
+
+        Returns the roots, each with its member services (more than one for a
+        failing dependency cycle) and the downstream services attributed to it,
+        plus the unhealthy services the graph does not know.
+        """
+        unhealthy = list(dict.fromkeys(unhealthy))
+        nodes = [self.index[service] for service in unhealthy if service in self.index]
+        unmapped = [service for service in unhealthy if service not in self.index]
+
+        component = self._unhealthy_components(nodes)
+        position = {node: i for i, node in enumerate(nodes)}
+        # A component is a root unless one of its members depends on an unhealthy service elsewhere
+        is_root = [True] * (max(component) + 1 if component else 0)
+        for i, node in enumerate(nodes):
+            for dependency in self.upstream[node]:
+                j = position.get(dependency)
+                if j is not None and component[j] != component[i]:
+                    is_root[component[i]] = False
+
+        roots: dict[int, dict[str, Any]] = {}
+        owner = [-1] * len(self.services)
+        queue = deque()
+        for i, node in enumerate(nodes):
+            if is_root[component[i]]:
+                root = roots.setdefault(component[i], {
+                    "service_id": self.services[node],
+                    "members": [],
+                    "impacted_unhealthy": [],
+                    "impacted_healthy": [],
+                })
+                root["members"].append(self.services[node])
+                owner[node] = component[i]
+                queue.append(node)
+
+        # Multi-source breadth-first search: each impacted service goes to its nearest root
+        while queue:
+            node = queue.popleft()
+            for dependent in self.downstream[node]:
+                if owner[dependent] == -1:
+                    owner[dependent] = owner[node]
+                    key = "impacted_unhealthy" if dependent in position else "impacted_healthy"
+                    roots[owner[node]][key].append(self.services[dependent])
+                    queue.append(dependent)
+
+        ranked = sorted(
+            roots.values(),
+            key=lambda root: (len(root["impacted_unhealthy"]), len(root["impacted_healthy"])),
+            reverse=True
+        )
+        for root in ranked:
+            root["blast_radius"] = len(root["impacted_unhealthy"]) + len(root["impacted_healthy"])
+        return {
+            "roots": ranked,
+            "root_of": {
+                self.services[node]: roots[owner[node]]["service_id"]
+                for node in nodes if owner[node] != -1
+            },
+            "unmapped": unmapped,
+        }
+
+
+def _load_initial() -> DependencyGraph:
+    global last_error
+    try:
+        if DEPENDENCIES_PATH:
+            with open(DEPENDENCIES_PATH, encoding="utf-8") as f:
+                return DependencyGraph(json.load(f))
+        if DEPENDENCIES_JSON:
+            return DependencyGraph(json.loads(DEPENDENCIES_JSON))
+    except (OSError, TypeError, ValueError) as e:
+        # Run without a graph rather than stop the components loading
+        last_error = str(e)
+    return DependencyGraph()
+
+
+last_error: Optional[str] = None
+_graph = _load_initial()
+
+
+def get_dependency_graph() -> DependencyGraph:
+    """The shared service dependency graph (empty when none is configured)"""
+    return _graph
+
+
+def load_service_dependencies(dependencies: Optional[Mapping[str, Iterable[str]]]) -> DependencyGraph:
+    """Install a dependency graph from a dict, replacing the configured one (None clears it)"""
+    global _graph
+    _graph = DependencyGraph(dependencies)
+    return _graph
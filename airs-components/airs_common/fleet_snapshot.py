@@ -0,0 +1,117 @@
+# airs_common/fleet_snapshot.py
+"""
+Last known /services snapshot per backend, for incremental fleet polling.
+
+ServiceLister keeps the most recent /services list together with its ETag
+and a content hash, so an unchanged list is recognised from a 304 Not
+Modified response or from its bytes without being parsed again. Each time a
+service's status, remediationInProgress or awaitingRemediation flag changes
+the snapshot version is bumped and the service is stamped with it. A cursor
+names a version, and a caller holding one can ask for only the services that
+changed after it.
+
+Cursors are "<epoch>-<version>". The epoch is random per process, so a cursor
+from another process (or from before a restart) is recognised as unknown
+rather than silently misread.
+"""
+
+import hashlib
+import secrets
+import threading
+from typing import Any, Optional
+
+# Fields whose change makes a service show up in a delta
+TRACKED_FIELDS = ("status", "remediationInProgress", "awaitingRemediation")
+
+
+def content_hash(body: bytes) -> str:
+    """Digest identifying a /services payload"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class FleetSnapshot:
+    """Versioned snapshot of one backend's service list"""
+
+    def __init__(self):
+        self.epoch = secrets.token_hex(4)
+        self.version = 0
+        self.etag: Optional[str] = None
+        self.content_hash: Optional[str] = None
+        self.services: list[dict[str, Any]] = []
+        # Whether the backend filters /services itself; None until known
+        self.supports_filters: Optional[bool] = None
+        self._state: dict[str, tuple[Any, ...]] = {}
+        self._changed_at: dict[str, int] = {}
+        self._removed_at: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cursor(self) -> str:
+        return f"{self.epoch}-{self.version}"
+
+    def is_unchanged(self, etag: Optional[str], body_hash: str) -> bool:
+        """Whether a freshly fetched payload matches the snapshot"""
+        return self.content_hash is not None and (
+            body_hash == self.content_hash or (etag is not None and etag == self.etag)
+        )
+
+    def apply(self, services: list[dict[str, Any]], etag: Optional[str], body_hash: str) -> bool:
+        """Replace the snapshot with a new service list; return whether any tracked field changed"""
+        with self._lock:
+            state = {}
+            changed = []
+            for service in services:
+                if not isinstance(service, dict) or service.get('id') is None:
+                    continue
+                service_id = str(service['id'])
+                fields = tuple(service.get(field) for field in TRACKED_FIELDS)
+                state[service_id] = fields
+                if self._state.get(service_id) != fields:
+                    changed.append(service_id)
+            removed = [service_id for service_id in self._state if service_id not in state]
+
+            if changed or removed:
+                self.version += 1
+                for service_id in changed:
+                    self._changed_at[service_id] = self.version
+                    self._removed_at.pop(service_id, None)
+                for service_id in removed:
+                    self._changed_at.pop(service_id, None)
+                    self._removed_at[service_id] = self.version
+
+            self._state = state
+            self.services = services
+            self.etag = etag
+            self.content_hash = body_hash
+            return bool(changed or removed)
+
+    def parse_cursor(self, cursor: str) -> Optional[int]:
+        """Version named by a cursor, or None if it does not belong to this snapshot"""
+        epoch, _, version = cursor.strip().rpartition('-')
+        if epoch != self.epoch or not version.isdigit() or int(version) > self.version:
+            return None
+        return int(version)
+
+    def changes_since(self, version: int) -> tuple[list[dict[str, Any]], list[str]]:
+        """Services whose tracked fields changed after version, and services removed since"""
+        with self._lock:
+            changed_ids = {sid for sid, at in self._changed_at.items() if at > version}
+            changed = [
+                service for service in self.services
+                if isinstance(service, dict) and str(service.get('id')) in changed_ids
+            ]
+            removed = [sid for sid, at in self._removed_at.items() if at > version]
+            return changed, removed
+
+
+_snapshots: dict[str, FleetSnapshot] = {}
+_registry_lock = threading.Lock()
+
+
+def get_fleet_snapshot(backend_url: str) -> FleetSnapshot:
+    """Get the shared snapshot for a backend"""
+    with _registry_lock:
+        snapshot = _snapshots.get(backend_url)
+        if snapshot is None:
+            snapshot = _snapshots[backend_url] = FleetSnapshot()
+        return snapshot
@@ -0,0 +1,91 @@
+# airs_common/http_client.py
+"""
+Process-wide HTTP client for AIRS components.
+
+Every component talks to the same AIRS backend, so connections are pooled per
+backend host and kept alive between tool invocations instead of opening a new
+TCP/TLS connection for every request. Clients are asynchronous; one client per
+host is kept for each event loop that uses it.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from urllib.parse import urlparse
+
+import httpx
+
+# Default number of pooled keep-alive connections per backend host
+DEFAULT_POOL_SIZE = int(os.getenv("AIRS_HTTP_POOL_SIZE", "10"))
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_pool_sizes: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def _host_key(base_url: str) -> str:
+    """Normalize a backend URL to its scheme://host:port pool key"""
+    parsed = urlparse(base_url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+def _build_client(pool_size: int) -> httpx.AsyncClient:
+    """Create a client that keeps up to pool_size warm connections"""
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=pool_size)
+    return httpx.AsyncClient(limits=limits)
+
+
+def _schedule_close(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Close a client on the loop that owns it"""
+    if loop.is_closed():
+        return
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    else:
+        loop.run_until_complete(client.aclose())
+
+
+def configure_pool_size(base_url: str, pool_size: int) -> None:
+    """Set the connection pool size for a backend host"""
+    if pool_size < 1:
+        raise ValueError("Pool size must be at least 1")
+
+    key = _host_key(base_url)
+    with _lock:
+        _pool_sizes[key] = pool_size
+        # Rebuild lazily on next use so the new size takes effect
+        stale = [
+            (loop, loop_clients.pop(key))
+            for loop, loop_clients in _clients.items()
+            if key in loop_clients
+        ]
+    for loop, client in stale:
+        _schedule_close(loop, client)
+
+
+def get_async_client(base_url: str) -> httpx.AsyncClient:
+    """Get the shared pooled client for a backend host on the running loop"""
+    loop = asyncio.get_running_loop()
+    key = _host_key(base_url)
+
+    with _lock:
+        loop_clients = _clients.get(loop)
+        if loop_clients is None:
+            loop_clients = _clients[loop] = {}
+
+        client = loop_clients.get(key)
+        if client is None or client.is_closed:
+            client = _build_client(_pool_sizes.get(key, DEFAULT_POOL_SIZE))
+            loop_clients[key] = client
+        return client
+
+
+async def aclose_clients() -> None:
+    """Close every pooled client owned by the running loop (e.g. on shutdown)"""
+    with _lock:
+        loop_clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in loop_clients.values():
+        await client.aclose()
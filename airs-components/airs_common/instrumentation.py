@@ -0,0 +1,222 @@
+# airs_common/instrumentation.py
+"""
+Per-call timing instrumentation for AIRS components.
+
+Each tool call records how long it spent validating the backend URL, waiting
+on each backend endpoint, parsing responses and building its result. The
+timings are returned in the tool's JSON as a "timings" block and aggregated
+into process-wide counters and histograms that can be scraped or dumped.
+
+Phases of concurrent backend calls overlap, so their sum can exceed the
+call's total_ms.
+"""
+
+import functools
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+_SERVICE_PATH = re.compile(r"^/services/[^/]+")
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    __slots__ = ("counts", "count", "sum_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        for index, bound in enumerate(BUCKETS_MS):
+            if value_ms <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum_ms += value_ms
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "mean_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(BUCKETS_MS, self.counts)
+            },
+        }
+
+
+class MetricsRegistry:
+    """Process-wide call counters and per-phase latency histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, dict[str, int]] = {}
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+
+    def observe(self, component: str, phase: str, value_ms: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((component, phase))
+            if histogram is None:
+                histogram = self._histograms[(component, phase)] = Histogram()
+            histogram.observe(value_ms)
+
+    def record_call(self, component: str, failed: bool) -> None:
+        with self._lock:
+            counters = self._calls.setdefault(component, {"calls": 0, "errors": 0})
+            counters["calls"] += 1
+            if failed:
+                counters["errors"] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Counters and histograms as a JSON-serializable dict"""
+        with self._lock:
+            components: dict[str, Any] = {
+                component: {**counters, "phases": {}} for component, counters in self._calls.items()
+            }
+            for (component, phase), histogram in self._histograms.items():
+                entry = components.setdefault(component, {"calls": 0, "errors": 0, "phases": {}})
+                entry["phases"][phase] = histogram.as_dict()
+            return components
+
+    def dump(self) -> str:
+        """Snapshot serialized as JSON"""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def render_prometheus(self) -> str:
+        """Snapshot in Prometheus text exposition format"""
+        lines = [
+            "# TYPE airs_component_calls_total counter",
+            "# TYPE airs_component_errors_total counter",
+            "# TYPE airs_component_phase_duration_ms histogram",
+        ]
+        with self._lock:
+            for component, counters in sorted(self._calls.items()):
+                lines.append(f'airs_component_calls_total{{component="{component}"}} {counters["calls"]}')
+                lines.append(f'airs_component_errors_total{{component="{component}"}} {counters["errors"]}')
+            for (component, phase), histogram in sorted(self._histograms.items()):
+                labels = f'component="{component}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS_MS, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else str(bound)
+                    lines.append(f'airs_component_phase_duration_ms_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"airs_component_phase_duration_ms_sum{{{labels}}} {histogram.sum_ms:.3f}")
+                lines.append(f"airs_component_phase_duration_ms_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._histograms.clear()
+
+
+metrics_registry = MetricsRegistry()
+
+
+class CallTimer:
+    """Timings for a single tool call"""
+
+    def __init__(self, component: str):
+        self.component = component
+        self.phases: dict[str, float] = {}
+        self.http_calls = 0
+        self.failed = False
+        self._started = time.perf_counter()
+
+    def add(self, phase: str, elapsed_ms: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed_ms
+        metrics_registry.observe(self.component, phase, elapsed_ms)
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "total_ms": round(self.total_ms, 3),
+            "http_calls": self.http_calls,
+            "phases": {phase: round(ms, 3) for phase, ms in self.phases.items()},
+        }
+
+
+_current_timer: ContextVar[Optional[CallTimer]] = ContextVar("airs_call_timer", default=None)
+
+
+def instrumented(component: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorate an async output method so its call is timed and counted"""
+    def decorator(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(method)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timer = CallTimer(component)
+            token = _current_timer.set(timer)
+            try:
+                return await method(*args, **kwargs)
+            except BaseException:
+                timer.failed = True
+                raise
+            finally:
+                _current_timer.reset(token)
+                metrics_registry.observe(component, "total", timer.total_ms)
+                metrics_registry.record_call(component, timer.failed)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Time a block as a phase of the current tool call (no-op outside one)"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, (time.perf_counter() - started) * 1000)
+
+
+def http_phase(method: str, endpoint: str) -> str:
+    """Phase name for a backend request, with service IDs folded out"""
+    return f"http {method.upper()} {_SERVICE_PATH.sub('/services/{id}', endpoint)}"
+
+
+@contextmanager
+def timed_request(method: str, endpoint: str) -> Iterator[None]:
+    """Time one backend round trip of the current tool call"""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.http_calls += 1
+    with timed(http_phase(method, endpoint)):
+        yield
+
+
+def mark_failed() -> None:
+    """Flag the current tool call as failed"""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.failed = True
+
+
+def timing_summary() -> Optional[dict[str, Any]]:
+    """Timings of the current tool call so far, for the response's timings block"""
+    timer = _current_timer.get()
+    return timer.summary() if timer is not None else None
@@ -0,0 +1,326 @@
+# airs_common/json_stream.py
+"""
+Streaming extraction of selected fields from large JSON objects.
+
+Components only use a handful of fields of some backend documents, and only
+the first few elements of their arrays: RootCauseIdentifier shows three
+recent errors, however many the backend returns. Decoding the
+whole document builds every element only to throw most of them away.
+
+FieldExtractor is fed the response body chunk by chunk as it arrives. It
+decodes just the requested top-level fields, keeps the first K elements of
+arrays with a limit, and skips everything else with a regular expression
+that steps over strings and scalars without building Python objects. Once
+every requested field has been read it stops, and the rest of the body is
+not downloaded.
+
+This only pays off when the requested fields come early in the document:
+the backend sends root_cause, patterns and suggested_actions first and
+recent_errors last, so reading stops after the first few errors. Stepping
+over a large unwanted value is several times slower than decoding it with
+json.loads, so read_fields gives up on streaming once STREAM_FALLBACK_BYTES
+have been read without finding every field, and decodes the whole body
+instead.
+"""
+
+import codecs
+import json
+import re
+import sys
+from typing import Any, Mapping, Optional
+
+import httpx
+
+from .instrumentation import timed
+from .serialization import loads
+
+# Fields of /services/{id}/logs/analysis used by the components, with the
+# most array elements any of them shows (None keeps the whole value)
+LOG_ANALYSIS_FIELDS: dict[str, Optional[int]] = {
+    "root_cause": None,
+    "patterns": None,
+    "suggested_actions": None,
+    "recent_errors": 3,
+}
+
+# Bodies up to this size are decoded in one go, which is faster for small documents
+STREAM_THRESHOLD = 64 * 1024
+
+# Streamed bodies still missing a field after this much input are decoded whole
+STREAM_FALLBACK_BYTES = 256 * 1024
+
+# Consumed input is dropped from the buffer once this much has piled up
+_COMPACT_AFTER = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_LITERAL = re.compile(r"[^,:\]}\s]+")
+if sys.version_info >= (3, 11):
+    # Possessive quantifiers stop the regex engine saving backtracking state for every string
+    _STRING = re.compile(r'"[^"\\]*+(?:\\.[^"\\]*+)*+"', re.DOTALL)
+    # Everything inside a container up to the next bracket, stepping over whole strings
+    _SKIP = re.compile(r'(?:[^"\[\]{}]++|"[^"\\]*+(?:\\.[^"\\]*+)*+")*+', re.DOTALL)
+else:
+    _STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+    _SKIP = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+
+_decoder = json.JSONDecoder()
+
+# Parser states
+_OBJECT_START, _KEY, _COLON, _VALUE, _ARRAY, _SKIP_VALUE, _AFTER_VALUE, _DONE = range(8)
+
+
+class _NeedMore(Exception):
+    """The buffer ends before the next token is complete"""
+
+
+class FieldExtractor:
+    """Incrementally extract selected fields from a JSON object.
+
+    fields maps each wanted top-level key to the number of leading array
+    elements to keep, or None to keep the whole value. Fields missing from
+    the document are absent from the result.
+    """
+
+    def __init__(self, fields: Mapping[str, Optional[int]]):
+        self.fields = dict(fields)
+        self.result: dict[str, Any] = {}
+        self.bytes_read = 0
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _OBJECT_START
+        self._key: Optional[str] = None
+        self._items: list[Any] = []
+        self._depth = 0
+        self._retry_at = 0
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume the next chunk of the body; return whether extraction is complete"""
+        if self.done:
+            return True
+        self.bytes_read += len(chunk)
+        self._buffer += self._text_decoder.decode(chunk)
+        self._run(final=False)
+        return self.done
+
+    def close(self) -> dict[str, Any]:
+        """Finish after the last chunk and return the extracted fields"""
+        if not self.done:
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            self._run(final=True)
+            if not self.done:
+                raise ValueError("Truncated JSON document")
+        return self.result
+
+    def _run(self, final: bool) -> None:
+        try:
+            while self._state != _DONE:
+                self._step(final)
+        except _NeedMore:
+            if final:
+                raise ValueError("Truncated JSON document")
+        if self._pos > _COMPACT_AFTER:
+            self._buffer = self._buffer[self._pos:]
+            self._retry_at -= self._pos
+            self._pos = 0
+
+    def _skip_whitespace(self) -> str:
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        if self._pos >= len(self._buffer):
+            raise _NeedMore
+        return self._buffer[self._pos]
+
+    def _decode_value(self, final: bool) -> Any:
+        """Decode one complete JSON value at the current position"""
+        if not final and len(self._buffer) < self._retry_at:
+            raise _NeedMore
+        try:
+            value, end = _decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Invalid JSON document")
+            # Wait for the buffer to grow substantially before trying again
+            self._retry_at = len(self._buffer) + max(len(self._buffer) - self._pos, 4096)
+            raise _NeedMore
+        if end >= len(self._buffer) and not final and not isinstance(value, (str, list, dict)):
+            # A number or literal may continue in the next chunk
+            raise _NeedMore
+        self._retry_at = 0
+        self._pos = end
+        return value
+
+    def _finish_field(self, value: Any) -> None:
+        self.result[self._key] = value
+        self._state = _DONE if len(self.result) == len(self.fields) else _AFTER_VALUE
+
+    def _step(self, final: bool) -> None:
+        state = self._state
+        if state == _OBJECT_START:
+            if self._skip_whitespace() != "{":
+                raise ValueError("Expected a JSON object")
+            self._pos += 1
+            self._state = _KEY if self.fields else _DONE
+
+        elif state == _KEY:
+            char = self._skip_whitespace()
+            if char == "}":
+                self._state = _DONE
+                return
+            match = _STRING.match(self._buffer, self._pos)
+            if match is None:
+                if char != '"':
+                    raise ValueError("Expected an object key")
+                raise _NeedMore
+            self._key = json.loads(match.group())
+            self._pos = match.end()
+            self._state = _COLON
+
+        elif state == _COLON:
+            if self._skip_whitespace() != ":":
+                raise ValueError("Expected ':' after an object key")
+            self._pos += 1
+            self._state = _VALUE
+
+        elif state == _VALUE:
+            char = self._skip_whitespace()
+            if self._key not in self.fields or self._key in self.result:
+                self._depth = 0
+                self._state = _SKIP_VALUE
+            elif char == "[" and self.fields[self._key] is not None:
+                self._pos += 1
+                self._items = []
+                self._state = _ARRAY
+            else:
+                self._finish_field(self._decode_value(final))
+
+        elif state == _ARRAY:
+            # Collect leading elements until the limit, then skip the rest
+            char = self._skip_whitespace()
+            if char == "]":
+                self._pos += 1
+                self._finish_field(self._items)
+            elif char == "," and self._items:
+                self._pos += 1
+            elif len(self._items) < self.fields[self._key]:
+                self._items.append(self._decode_value(final))
+                if len(self._items) == self.fields[self._key]:
+                    self._truncate_array()
+            else:
+                self._truncate_array()
+
+        elif state == _SKIP_VALUE:
+            self._skip(final)
+
+        elif state == _AFTER_VALUE:
+            char = self._skip_whitespace()
+            if char == ",":
+                self._pos += 1
+                self._state = _KEY
+            elif char == "}":
+                self._state = _DONE
+            else:
+                raise ValueError("Expected ',' or '}' in object")
+
+    def _truncate_array(self) -> None:
+        """Keep the elements collected so far and skip the rest of the array"""
+        self.result[self._key] = self._items
+        if len(self.result) == len(self.fields):
+            self._state = _DONE
+        else:
+            self._depth = 1
+            self._state = _SKIP_VALUE
+
+    def _skip(self, final: bool) -> None:
+        """Step over the rest of a value without decoding it"""
+        buffer = self._buffer
+        if self._depth == 0:
+            char = self._skip_whitespace()
+            if char in "[{":
+                self._pos += 1
+                self._depth = 1
+            else:
+                match = (_STRING if char == '"' else _LITERAL).match(buffer, self._pos)
+                if match is None or (match.end() >= len(buffer) and not final):
+                    raise _NeedMore
+                self._pos = match.end()
+                self._end_skipped_value()
+                return
+
+        while self._depth:
+            self._pos = _SKIP.match(buffer, self._pos).end()
+            if self._pos >= len(buffer):
+                raise _NeedMore
+            char = buffer[self._pos]
+            if char == '"':
+                # An unterminated string: its end has not arrived yet
+                raise _NeedMore
+            self._depth += 1 if char in "[{" else -1
+            self._pos += 1
+        self._end_skipped_value()
+
+    def _end_skipped_value(self) -> None:
+        self._state = _DONE if len(self.result) == len(self.fields) else _AFTER_VALUE
+
+
+def project_fields(document: Any, fields: Mapping[str, Optional[int]]) -> dict[str, Any]:
+    """Apply the same selection as FieldExtractor to an already decoded document"""
+    if not isinstance(document, dict):
+        raise ValueError("Expected a JSON object")
+    result = {}
+    for key, limit in fields.items():
+        if key in document:
+            value = document[key]
+            result[key] = value[:limit] if limit is not None and isinstance(value, list) else value
+    return result
+
+
+def fields_cache_key(url: str, fields: Mapping[str, Optional[int]]) -> str:
+    """Response cache key for a selection of a document's fields"""
+    selection = ",".join(key if limit is None else f"{key}:{limit}" for key, limit in fields.items())
+    return f"{url}#fields={selection}"
+
+
+def extract_fields(body: bytes, fields: Mapping[str, Optional[int]]) -> dict[str, Any]:
+    """Extract selected fields from a complete JSON body"""
+    extractor = FieldExtractor(fields)
+    extractor.feed(body)
+    return extractor.close()
+
+
+async def read_fields(response: httpx.Response, fields: Mapping[str, Optional[int]]) -> dict[str, Any]:
+    """Read selected fields from a streamed response, stopping once they are all read.
+
+    Small bodies (by Content-Length) are read whole and decoded in one go, and
+    so is the rest of a body whose fields are not all found within the first
+    STREAM_FALLBACK_BYTES, as happens when they follow a large unwanted value.
+    """
+    length = response.headers.get("Content-Length")
+    if length is not None and length.isdigit() and int(length) <= STREAM_THRESHOLD:
+        body = await response.aread()
+        with timed("parse"):
+            return project_fields(loads(body), fields)
+
+    extractor = FieldExtractor(fields)
+    chunks = []
+    stream = response.aiter_bytes()
+    async for chunk in stream:
+        chunks.append(chunk)
+        with timed("parse"):
+            done = extractor.feed(chunk)
+        if done:
+            with timed("parse"):
+                return extractor.close()
+        if extractor.bytes_read > STREAM_FALLBACK_BYTES:
+            break
+    else:
+        with timed("parse"):
+            return extractor.close()
+
+    async for chunk in stream:
+        chunks.append(chunk)
+    with timed("parse"):
+        return project_fields(loads(b"".join(chunks)), fields)
@@ -0,0 +1,99 @@
+# airs_common/keyword_classifier.py
+"""
+Multi-keyword classification of log messages.
+
+Log classification asks, for every category, how often any of its keywords
+occurs in a set of messages. Checking each keyword with a substring search
+re-scans every message once per keyword. KeywordClassifier compiles the
+keywords of all categories into one regular expression and scans the joined
+messages with it, counting every occurrence of every keyword, including
+keywords that overlap or contain one another.
+
+The alternatives are ordered longest first, so a match is the longest
+keyword starting at that position, and it also counts every shorter keyword
+that is a prefix of it. Resuming the search one character after each match
+start finds keywords that begin inside an earlier match.
+
+This is not an Aho-Corasick automaton. The regex engine tries the
+alternatives at each position, so the worst case is O(text x keywords), the
+same bound as one search per keyword. It is faster in practice because the
+whole scan runs in the C regex engine: on bench_keyword_classifier it beats
+per-keyword searches, while a pure-Python automaton, linear in the text,
+took about four times as long as this scan.
+
+Matching is case-sensitive, as in the backend's analyzeLogs.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+
+class KeywordClassifier:
+    """Count keyword hits per category over log messages in one scan"""
+
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        self.categories = tuple(categories)
+        keyword_categories: dict[str, list[int]] = {}
+        for index, keywords in enumerate(categories.values()):
+            if isinstance(keywords, str):
+                raise TypeError("Category keywords must be a list of strings")
+            for keyword in keywords:
+                if not isinstance(keyword, str) or not keyword or "\n" in keyword:
+                    raise ValueError(f"Invalid keyword: {keyword!r}")
+                indices = keyword_categories.setdefault(keyword, [])
+                if index not in indices:
+                    indices.append(index)
+        self.keywords = tuple(keyword_categories)
+
+        # A match counts the matched keyword and every keyword that is a prefix of it
+        self._hits = {
+            keyword: tuple(
+                index
+                for other, indices in keyword_categories.items() if keyword.startswith(other)
+                for index in indices
+            )
+            for keyword in keyword_categories
+        }
+        ordered = sorted(keyword_categories, key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, ordered))) if ordered else None
+
+    def _scan(self, text: str) -> Iterable[tuple[int, str]]:
+        """(position, longest keyword) for every position where a keyword starts"""
+        if self._pattern is None:
+            return
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            yield match.start(), match.group()
+            match = search(text, match.start() + 1)
+
+    def count(self, messages: Iterable[str]) -> dict[str, int]:
+        """Keyword hits per category across messages"""
+        counts = [0] * len(self.categories)
+        for _, keyword in self._scan("\n".join(messages)):
+            for index in self._hits[keyword]:
+                counts[index] += 1
+        return dict(zip(self.categories, counts))
+
+    def count_matrix(self, groups: Sequence[Sequence[str]]) -> np.ndarray:
+        """(groups x categories) keyword hit counts, e.g. one row per service.
+
+        All groups are joined and scanned as one text, so a fleet costs a
+        single pass however many services it has.
+        """
+        counts = np.zeros((len(groups), len(self.categories)), dtype=np.int64)
+        starts = []
+        offset = 0
+        for messages in groups:
+            starts.append(offset)
+            offset += sum(len(message) + 1 for message in messages)
+
+        text = "\n".join(message for messages in groups for message in messages)
+        for position, keyword in self._scan(text):
+            row = bisect_right(starts, position) - 1
+            for index in self._hits[keyword]:
+                counts[row, index] += 1
+        return counts
@@ -0,0 +1,140 @@
+# airs_common/log_analysis.py
+"""
+Local log analysis, matching the backend's analyzeLogs.
+
+The /services/{id}/metrics document already carries the service's most
+recent logs, so the analysis the backend serves at /logs/analysis can be
+derived from it without a second round trip. analyze_logs() applies the
+same rules as airs-backend services/logService.js: the first ten ERROR or
+WARN messages are the recent errors, each rule whose keywords appear in any
+of them (case-sensitive substring match) adds its pattern and actions, and
+the last matching rule sets the root cause.
+
+Keyword matching goes through a KeywordClassifier built from LOG_RULES, so
+each batch of messages is scanned once however many categories there are.
+Extra categories can be configured as {"category": ["keyword", ...]} in a
+JSON file named by AIRS_LOG_CATEGORIES or inline in AIRS_LOG_CATEGORIES_JSON,
+or installed with load_log_categories(). User categories are counted next to
+the built-in patterns and reported in category_counts, but never change which
+rules match: a category may not reuse a built-in pattern's name, so the
+root cause, patterns and actions stay those of the backend's analyzeLogs.
+
+The metrics document holds the latest 20 log entries while the backend
+analyzes up to 50, so when fewer than ten of the latest 20 entries are
+errors the local analysis can see fewer errors than the backend's.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Iterable, Mapping, Optional
+
+from .keyword_classifier import KeywordClassifier
+
+# (keywords, pattern, suggested actions, root cause), in the backend's order
+LOG_RULES: tuple[tuple[tuple[str, ...], str, tuple[str, ...], str], ...] = (
+    (("CPU", "thread", "computational"), "high_cpu_usage", ("scale_instances", "restart_service"), "high_cpu_load"),
+    (("memory", "Memory", "heap", "GC"), "memory_leak", ("restart_service", "scale_memory"), "memory_exhaustion"),
+    (("database", "Database", "connection", "transaction"), "database_connection_issues",
+     ("restart_service", "kill_connections"), "database_bottleneck"),
+    (("timeout", "latency", "Network"), "high_latency", ("scale_instances", "clear_cache"), "network_latency"),
+)
+
+ERROR_LEVELS = ("ERROR", "WARN")
+RECENT_ERRORS_LIMIT = 10
+
+DEFAULT_ACTIONS = ("restart_service", "scale_instances")
+DEFAULT_ROOT_CAUSE = "general_performance_issue"
+
+# User-defined log categories
+CATEGORIES_PATH = os.getenv("AIRS_LOG_CATEGORIES", "")
+CATEGORIES_JSON = os.getenv("AIRS_LOG_CATEGORIES_JSON", "")
+
+
+def recent_errors(logs: Iterable[Mapping[str, Any]], limit: Optional[int] = RECENT_ERRORS_LIMIT) -> list[str]:
+    """Messages of the first ERROR or WARN entries (all of them for limit None), newest first"""
+    errors = []
+    for log in logs:
+        if isinstance(log, Mapping) and log.get("level") in ERROR_LEVELS:
+            errors.append(str(log.get("message", "")))
+            if len(errors) == limit:
+                break
+    return errors
+
+
+def _compile_categories(categories: Optional[Mapping[str, Any]]) -> KeywordClassifier:
+    """Classifier for the built-in patterns followed by the user categories"""
+    merged: dict[str, list[str]] = {pattern: list(keywords) for keywords, pattern, _, _ in LOG_RULES}
+    if categories is not None:
+        if not isinstance(categories, Mapping):
+            raise TypeError("Log categories must be an object of category: [keywords]")
+        for name, keywords in categories.items():
+            if isinstance(keywords, str) or not isinstance(keywords, Iterable):
+                raise TypeError(f"Keywords of log category {name!r} must be a list of strings")
+            if str(name) in merged:
+                raise ValueError(f"Log category {name!r} is a built-in pattern or listed twice")
+            merged[str(name)] = list(keywords)
+    return KeywordClassifier(merged)
+
+
+def _load_initial() -> KeywordClassifier:
+    global last_error
+    try:
+        if CATEGORIES_PATH:
+            with open(CATEGORIES_PATH, encoding="utf-8") as f:
+                return _compile_categories(json.load(f))
+        if CATEGORIES_JSON:
+            return _compile_categories(json.loads(CATEGORIES_JSON))
+    except (OSError, TypeError, ValueError) as e:
+        # Fall back to the built-in categories rather than stop the components loading
+        last_error = str(e)
+    return _compile_categories(None)
+
+
+last_error: Optional[str] = None
+_classifier = _load_initial()
+
+
+def get_log_classifier() -> KeywordClassifier:
+    """The shared classifier for the built-in and configured log categories"""
+    return _classifier
+
+
+def load_log_categories(categories: Optional[Mapping[str, Iterable[str]]]) -> KeywordClassifier:
+    """Install user categories from a dict, replacing the configured ones (None keeps only the built-ins)"""
+    global _classifier
+    _classifier = _compile_categories(categories)
+    return _classifier
+
+
+def analyze_logs(logs: Iterable[Mapping[str, Any]]) -> dict[str, Any]:
+    """Analyze a service's log entries into the backend's /logs/analysis document"""
+    messages = recent_errors(logs, None)
+    errors = messages[:RECENT_ERRORS_LIMIT]
+
+    # Rules look at the recent errors; category counts cover every error message
+    classifier = get_log_classifier()
+    recent_counts, older_counts = classifier.count_matrix([errors, messages[RECENT_ERRORS_LIMIT:]])
+    matched = dict(zip(classifier.categories, recent_counts > 0))
+
+    patterns: list[str] = []
+    actions: list[str] = []
+    root_cause = "unknown"
+    for _, pattern, rule_actions, cause in LOG_RULES:
+        if matched[pattern]:
+            patterns.append(pattern)
+            actions.extend(rule_actions)
+            root_cause = cause
+
+    if not actions:
+        actions = list(DEFAULT_ACTIONS)
+        root_cause = DEFAULT_ROOT_CAUSE
+
+    return {
+        "root_cause": root_cause,
+        "patterns": list(dict.fromkeys(patterns)),
+        "suggested_actions": list(dict.fromkeys(actions)),
+        "analysis_timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "recent_errors": errors,
+        "category_counts": dict(zip(classifier.categories, (recent_counts + older_counts).tolist())),
+    }
@@ -0,0 +1,265 @@
+# airs_common/log_templates.py
+"""
+Incremental log template mining for error summaries.
+
+Error logs repeat the same few messages with different request IDs,
+durations and hosts, so listing the latest raw messages spends the whole
+budget on one failure. TemplateMiner groups messages into templates in the
+style of Drain: variable tokens (numbers, hex, UUIDs, IP addresses) are
+masked, messages are bucketed by token count and first token, and a message
+joins the most similar template in its bucket when at least half of the
+tokens agree; tokens that differ become <*>. Each template counts its
+messages and remembers when it was first and last seen.
+
+Miners live in process memory, keyed by backend and service, and remember
+the newest log entry they have processed. The backend returns logs newest
+first, so each update only mines the entries ahead of that one, and repeated
+calls for a service cost time proportional to its new lines. When that entry
+is gone and the log list is shorter than before, or its newest entry is
+older than the remembered one, the backend has reset the service's logs
+(POST /services/reset, or a restart) and the miner starts over, so counts
+describe the current logs rather than adding them to the previous ones.
+Miners are evicted least recently used beyond AIRS_LOG_TEMPLATE_MAX_SERVICES.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Mapping, Optional, Sequence
+
+from .log_analysis import ERROR_LEVELS
+
+# Templates kept per service, and how many services are tracked at most
+MAX_TEMPLATES = int(os.getenv("AIRS_LOG_TEMPLATE_MAX_TEMPLATES", "256"))
+MAX_SERVICES = int(os.getenv("AIRS_LOG_TEMPLATE_MAX_SERVICES", "1024"))
+
+# Fraction of tokens that must match for a message to join a template
+SIMILARITY_THRESHOLD = 0.5
+
+WILDCARD = "<*>"
+
+# Variable parts of a message, most specific first
+_VARIABLE = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"
+    r"|\b0[xX][0-9a-fA-F]+\b"
+    r"|\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}\b"
+    r"|\d+(?:\.\d+)?"
+)
+
+
+def mask_message(message: str) -> list[str]:
+    """Tokens of a message with its variable parts replaced by <*>"""
+    return _VARIABLE.sub(WILDCARD, message).split()
+
+
+def distinct_messages(messages: Iterable[str], limit: Optional[int] = None) -> list[str]:
+    """The first message of each masked form, so messages differing only in IDs and numbers appear once"""
+    seen = set()
+    distinct = []
+    for message in messages:
+        masked = tuple(mask_message(message))
+        if masked not in seen:
+            seen.add(masked)
+            distinct.append(message)
+            if len(distinct) == limit:
+                break
+    return distinct
+
+
+class LogTemplate:
+    """One message template and the messages that matched it"""
+
+    __slots__ = ("template_id", "tokens", "count", "first_seen", "last_seen", "level")
+
+    def __init__(self, template_id: int, tokens: list[str], timestamp: Any, level: Any):
+        self.template_id = template_id
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.level = level
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: Sequence[str]) -> tuple[float, int]:
+        """(fraction of tokens equal to the template's, wildcards in the template)"""
+        equal = wildcards = 0
+        for own, token in zip(self.tokens, tokens):
+            if own == WILDCARD:
+                wildcards += 1
+            elif own == token:
+                equal += 1
+        return equal / len(tokens) if tokens else 1.0, wildcards
+
+    def add(self, tokens: Sequence[str], timestamp: Any, level: Any) -> None:
+        """Count a message, generalizing the tokens it does not share"""
+        self.tokens = [own if own == token else WILDCARD for own, token in zip(self.tokens, tokens)]
+        self.count += 1
+        self.last_seen = timestamp
+        self.level = level
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "template": self.template,
+            "count": self.count,
+            "level": self.level,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        }
+
+
+def _entry_key(log: Mapping[str, Any]) -> Hashable:
+    """Identity of a log entry: its trace ID, or its timestamp and message"""
+    trace_id = log.get("trace_id")
+    return trace_id if trace_id else (log.get("timestamp"), log.get("message"))
+
+
+class TemplateMiner:
+    """Templates of one service's error messages, mined incrementally"""
+
+    def __init__(self, max_templates: int = MAX_TEMPLATES, similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.max_templates = max_templates
+        self.similarity_threshold = similarity_threshold
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every template and the processed log position"""
+        self.lines_mined = 0
+        self._templates: dict[int, LogTemplate] = {}
+        # (token count, first token) -> templates in that bucket
+        self._buckets: dict[tuple[int, str], list[LogTemplate]] = {}
+        self._next_id = 1
+        self._cursor: Optional[Hashable] = None
+        self._cursor_timestamp: Any = None
+        self._seen_length = 0
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def _bucket_key(self, tokens: Sequence[str]) -> tuple[int, str]:
+        return len(tokens), tokens[0] if tokens else ""
+
+    def add(self, message: str, timestamp: Any = None, level: Any = None) -> LogTemplate:
+        """Mine one message and return the template it joined"""
+        tokens = mask_message(message)
+        key = self._bucket_key(tokens)
+
+        # The most similar template, preferring the more general one on ties
+        best, best_score = None, None
+        for template in self._buckets.get(key, ()):
+            score = template.similarity(tokens)
+            if score[0] >= self.similarity_threshold and (best_score is None or score > best_score):
+                best, best_score = template, score
+
+        if best is None:
+            if len(self._templates) >= self.max_templates:
+                self._evict()
+            best = LogTemplate(self._next_id, tokens, timestamp, level)
+            self._templates[best.template_id] = best
+            self._buckets.setdefault(key, []).append(best)
+            self._next_id += 1
+        best.add(tokens, timestamp, level)
+        self.lines_mined += 1
+        return best
+
+    def _evict(self) -> None:
+        """Drop the template updated longest ago"""
+        oldest = min(self._templates.values(), key=lambda template: template.last_seen or "")
+        del self._templates[oldest.template_id]
+        key = self._bucket_key(oldest.tokens)
+        bucket = self._buckets[key]
+        bucket.remove(oldest)
+        if not bucket:
+            del self._buckets[key]
+
+    def update(self, logs: Sequence[Mapping[str, Any]], levels: Iterable[str] = ERROR_LEVELS) -> int:
+        """Mine the entries of a newest-first log list not seen before; returns how many were new"""
+        entries = [log for log in logs if isinstance(log, Mapping)]
+        new = None
+        for index, log in enumerate(entries):
+            if _entry_key(log) == self._cursor:
+                new = index
+                break
+        if new is None:
+            if self._cursor is not None and self._was_reset(entries):
+                self.reset()
+            new = len(entries)
+        self._seen_length = len(entries)
+        if not new:
+            return 0
+
+        levels = frozenset(levels)
+        # Oldest first, so first_seen and last_seen follow the log order
+        for log in reversed(entries[:new]):
+            if log.get("level") in levels:
+                self.add(str(log.get("message", "")), log.get("timestamp"), log.get("level"))
+        self._cursor = _entry_key(entries[0])
+        self._cursor_timestamp = entries[0].get("timestamp")
+        return new
+
+    def _was_reset(self, entries: Sequence[Mapping[str, Any]]) -> bool:
+        """Whether logs without the processed position come from a reset log source.
+
+        More new entries than the backend returns also push the processed one
+        out of the list, but then the list does not shrink and its newest entry
+        is not older than the processed one.
+        """
+        if len(entries) < self._seen_length:
+            return True
+        newest = entries[0].get("timestamp") if entries else None
+        previous = self._cursor_timestamp
+        return isinstance(newest, str) and isinstance(previous, str) and newest < previous
+
+    def templates(self, limit: Optional[int] = None) -> list[LogTemplate]:
+        """Templates by message count, most frequent first (most recent first on ties)"""
+        ranked = sorted(
+            self._templates.values(),
+            key=lambda template: (template.count, template.last_seen or ""),
+            reverse=True
+        )
+        return ranked[:limit] if limit is not None else ranked
+
+    def summary(self, limit: Optional[int] = None) -> dict[str, Any]:
+        """The most frequent templates and how much has been mined"""
+        return {
+            "lines_mined": self.lines_mined,
+            "template_count": len(self._templates),
+            "templates": [template.as_dict() for template in self.templates(limit)],
+        }
+
+
+class LogTemplateStore:
+    """Template miners for every tracked service, least recently used evicted first"""
+
+    def __init__(self, max_services: int = MAX_SERVICES, max_templates: int = MAX_TEMPLATES):
+        self.max_services = max_services
+        self.max_templates = max_templates
+        self._lock = threading.Lock()
+        self._miners: OrderedDict[tuple[str, str], TemplateMiner] = OrderedDict()
+
+    def update(
+        self, backend_url: str, service_id: str, logs: Sequence[Mapping[str, Any]], limit: Optional[int] = None
+    ) -> dict[str, Any]:
+        """Mine a service's new log entries and summarize its top templates"""
+        key = (backend_url, service_id)
+        with self._lock:
+            miner = self._miners.get(key)
+            if miner is None:
+                miner = self._miners[key] = TemplateMiner(self.max_templates)
+                while len(self._miners) > self.max_services:
+                    self._miners.popitem(last=False)
+            else:
+                self._miners.move_to_end(key)
+            new_lines = miner.update(logs)
+            return {"new_lines": new_lines, **miner.summary(limit)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._miners.clear()
+
+
+log_templates = LogTemplateStore()
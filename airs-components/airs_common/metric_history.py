@@ -0,0 +1,209 @@
+# airs_common/metric_history.py
+"""
+Per-service metric history for trend-aware health assessment.
+
+Every metrics document a component fetches from the backend is appended to
+a fixed-size ring buffer for its service. Reads served from the response
+cache are not, so one snapshot read by several tools counts once. Each buffer is one (window x metrics) array plus running
+sums, so the rolling mean and least-squares slope of every metric are
+updated in constant time per sample. Each metric's window is also kept as a
+sorted list, updated by binary search as samples enter and leave, so the p95
+is read by index instead of re-sorting the window on every summary. Health
+reports use these to show smoothed values and a trend
+direction next to the instantaneous sample, so a single noisy reading does
+not flip the answer.
+
+Buffers live in process memory, keyed by backend and service, and are
+evicted least recently used beyond AIRS_METRIC_HISTORY_MAX_SERVICES.
+"""
+
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Mapping, Optional
+
+import numpy as np
+
+# Samples kept per service, and how many services are tracked at most
+HISTORY_SIZE = int(os.getenv("AIRS_METRIC_HISTORY_SIZE", "60"))
+MAX_SERVICES = int(os.getenv("AIRS_METRIC_HISTORY_MAX_SERVICES", "1024"))
+
+HISTORY_METRICS = ("cpu", "memory", "latency", "error_rate", "throughput")
+
+# A metric is "stable" while its fitted change across the window stays within
+# this fraction of its mean
+STABLE_CHANGE_RATIO = 0.05
+
+_METRICS_ENDPOINT = re.compile(r"^/services/([^/]+)/metrics$")
+
+
+class MetricHistory:
+    """Fixed-size ring buffer of one service's metric samples"""
+
+    def __init__(self, size: int = HISTORY_SIZE, metrics: tuple[str, ...] = HISTORY_METRICS):
+        self.size = size
+        self.metrics = metrics
+        self._values = np.full((size, len(metrics)), np.nan)
+        self._times = np.zeros(size)
+        self._head = 0
+        self._count = 0
+        self._base_time: Optional[float] = None
+        # The window's values of each metric in ascending order, NaN excluded
+        self._sorted: list[list[float]] = [[] for _ in metrics]
+        self._reset_sums()
+
+    def _reset_sums(self) -> None:
+        columns = len(self.metrics)
+        self._n = np.zeros(columns)
+        self._sum_t = np.zeros(columns)
+        self._sum_tt = np.zeros(columns)
+        self._sum_y = np.zeros(columns)
+        self._sum_ty = np.zeros(columns)
+
+    def _accumulate(self, t: float, row: np.ndarray, sign: float) -> None:
+        present = ~np.isnan(row)
+        y = np.where(present, row, 0.0)
+        self._n += sign * present
+        self._sum_t += sign * t * present
+        self._sum_tt += sign * t * t * present
+        self._sum_y += sign * y
+        self._sum_ty += sign * t * y
+
+    def _recompute_sums(self) -> None:
+        """Rebuild the running sums from the window, discarding rounding drift"""
+        self._reset_sums()
+        for index in range(self._count):
+            self._accumulate(self._times[index], self._values[index], 1.0)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, metrics: Mapping[str, Any], timestamp: Optional[float] = None) -> None:
+        """Add one metrics sample (timestamp in seconds, monotonic clock by default)"""
+        now = time.monotonic() if timestamp is None else timestamp
+        if self._base_time is None:
+            self._base_time = now
+        t = now - self._base_time
+
+        row = np.array([_as_float(metrics.get(m)) for m in self.metrics])
+        if self._count == self.size:
+            oldest = self._values[self._head]
+            self._accumulate(self._times[self._head], oldest, -1.0)
+            for column, value in zip(self._sorted, oldest.tolist()):
+                if value == value:
+                    del column[bisect_left(column, value)]
+        else:
+            self._count += 1
+        for column, value in zip(self._sorted, row.tolist()):
+            if value == value:
+                insort(column, value)
+
+        self._values[self._head] = row
+        self._times[self._head] = t
+        self._accumulate(t, row, 1.0)
+        self._head = (self._head + 1) % self.size
+        if self._head == 0:
+            self._recompute_sums()
+
+    def summary(self) -> dict[str, Any]:
+        """Rolling mean, p95, slope and trend direction of every metric seen"""
+        if self._count == 0:
+            return {"samples": 0, "window_seconds": 0.0, "metrics": {}}
+
+        n = self._n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self._sum_y / n
+            denominator = n * self._sum_tt - self._sum_t ** 2
+            slope = np.where(
+                (n >= 2) & (denominator > 1e-12),
+                (n * self._sum_ty - self._sum_t * self._sum_y) / denominator,
+                np.nan,
+            )
+        present = n > 0
+        # Oldest and newest samples sit at the ring's ends
+        oldest = self._times[self._head] if self._count == self.size else self._times[0]
+        span = float(self._times[self._head - 1] - oldest)
+
+        metrics = {}
+        for index in np.flatnonzero(present):
+            metrics[self.metrics[index]] = {
+                "smoothed": round(float(mean[index]), 3),
+                "p95": round(_percentile(self._sorted[index], 0.95), 3),
+                "slope_per_minute": None if np.isnan(slope[index]) else round(float(slope[index]) * 60, 3),
+                "trend": _trend(slope[index], mean[index], span),
+            }
+        return {"samples": self._count, "window_seconds": round(span, 3), "metrics": metrics}
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Linearly interpolated percentile of sorted values, as np.percentile computes it"""
+    position = q * (len(values) - 1)
+    lower = int(position)
+    if lower + 1 >= len(values):
+        return values[lower]
+    return values[lower] + (values[lower + 1] - values[lower]) * (position - lower)
+
+
+def _trend(slope: float, mean: float, span: float) -> str:
+    """Direction of a fitted slope, relative to the metric's size"""
+    if np.isnan(slope) or span <= 0:
+        return "unknown"
+    change = slope * span
+    if abs(change) <= STABLE_CHANGE_RATIO * max(abs(mean), 1e-9):
+        return "stable"
+    return "rising" if change > 0 else "falling"
+
+
+class MetricHistoryStore:
+    """Ring buffers for every tracked service, least recently used evicted first"""
+
+    def __init__(self, size: int = HISTORY_SIZE, max_services: int = MAX_SERVICES):
+        self.size = size
+        self.max_services = max_services
+        self._lock = threading.Lock()
+        self._histories: OrderedDict[tuple[str, str], MetricHistory] = OrderedDict()
+
+    def record(
+        self, backend_url: str, service_id: str, metrics: Mapping[str, Any], timestamp: Optional[float] = None
+    ) -> None:
+        """Append a metrics sample to a service's history"""
+        key = (backend_url, service_id)
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                history = self._histories[key] = MetricHistory(self.size)
+                while len(self._histories) > self.max_services:
+                    self._histories.popitem(last=False)
+            else:
+                self._histories.move_to_end(key)
+            history.append(metrics, timestamp)
+
+    def summary(self, backend_url: str, service_id: str) -> Optional[dict[str, Any]]:
+        """Rolling statistics for a service, or None if it has no history"""
+        with self._lock:
+            history = self._histories.get((backend_url, service_id))
+            return history.summary() if history is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histories.clear()
+
+
+metric_history = MetricHistoryStore()
+
+
+def record_metrics_response(backend_url: str, endpoint: str, data: Any) -> None:
+    """Record a /services/{id}/metrics document read by a component in the history"""
+    match = _METRICS_ENDPOINT.match(endpoint)
+    if match and isinstance(data, dict) and isinstance(data.get('metrics'), dict):
+        metric_history.record(backend_url, match.group(1), data['metrics'])
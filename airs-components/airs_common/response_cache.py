@@ -0,0 +1,97 @@
+# airs_common/response_cache.py
+"""
+Short-lived in-process cache for backend GET responses.
+
+Within a single agent turn several diagnostic tools read the same
+/services/{id}/metrics and /services/{id}/logs/analysis documents. Caching them
+for a few seconds means a diagnostic chain costs one backend fetch per document.
+Cached values are shared between callers and must be treated as read-only.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+# Sentinel returned by get() on a miss, since None is a valid JSON document
+MISSING = object()
+
+
+class ResponseCache:
+    """Thread-safe TTL cache with LRU eviction bounded by entry count"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        if max_entries < 1:
+            raise ValueError("Cache must allow at least one entry")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for key, or MISSING if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key, evicting the least recently used entries"""
+        if self.ttl_seconds <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop every entry whose key starts with prefix; returns the count"""
+        with self._lock:
+            if not prefix:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+
+            stale = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by all diagnostic tools
+response_cache = ResponseCache(
+    ttl_seconds=float(os.getenv("AIRS_CACHE_TTL_SECONDS", "5")),
+    max_entries=int(os.getenv("AIRS_CACHE_MAX_ENTRIES", "256")),
+)
@@ -0,0 +1,188 @@
+# airs_common/root_cause_scoring.py
+"""
+Bayesian root cause scoring.
+
+Ranks the candidate root causes of a service by their posterior probability
+given two kinds of evidence: the level (healthy, warning, critical) of each
+metric under the service's threshold profile, and how often each log
+category's keywords appear in its error messages. Every candidate has a
+prior, a table P(level | cause) per metric and a distribution
+P(category | cause) over log categories; the log-likelihoods are precomputed
+once, so a batch of services is scored with one tensor contraction and one
+matrix product, then normalized per service with a softmax.
+
+The tables below are hand-set estimates of how each cause shows up, not
+fitted to incident data, so the probabilities rank the candidates against
+each other rather than measure how often the top one is right.
+
+Evidence is treated as independent given the cause (naive Bayes). Repeated
+lines of one incident are not independent, so each category contributes at
+most MAX_LOG_HITS hits; otherwise a noisy log would push every posterior to
+0 or 1. A metric whose level is unknown contributes nothing.
+"""
+
+from typing import Any, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .log_analysis import DEFAULT_ROOT_CAUSE
+from .thresholds import CRITICAL, HEALTHY, UNKNOWN, WARNING, get_threshold_profiles
+
+# Level columns of the metric tables
+LEVELS = (HEALTHY, WARNING, CRITICAL)
+
+# Log category hits per service counted as evidence at most
+MAX_LOG_HITS = 5
+
+# Per cause: prior, P(healthy, warning, critical | cause) per metric, and
+# P(category | cause) for a log keyword hit. Without evidence the general
+# cause ranks first, as in the backend's analyzeLogs
+LIKELIHOODS: dict[str, dict[str, Any]] = {
+    "high_cpu_load": {
+        "prior": 0.175,
+        "metrics": {
+            "cpu": (0.10, 0.30, 0.60),
+            "memory": (0.60, 0.25, 0.15),
+            "latency": (0.40, 0.35, 0.25),
+            "error_rate": (0.50, 0.30, 0.20),
+        },
+        "logs": {"high_cpu_usage": 0.70, "memory_leak": 0.10, "database_connection_issues": 0.05, "high_latency": 0.15},
+    },
+    "memory_exhaustion": {
+        "prior": 0.175,
+        "metrics": {
+            "cpu": (0.50, 0.30, 0.20),
+            "memory": (0.05, 0.30, 0.65),
+            "latency": (0.50, 0.30, 0.20),
+            "error_rate": (0.40, 0.35, 0.25),
+        },
+        "logs": {"high_cpu_usage": 0.10, "memory_leak": 0.75, "database_connection_issues": 0.05, "high_latency": 0.10},
+    },
+    "database_bottleneck": {
+        "prior": 0.175,
+        "metrics": {
+            "cpu": (0.60, 0.25, 0.15),
+            "memory": (0.60, 0.25, 0.15),
+            "latency": (0.15, 0.35, 0.50),
+            "error_rate": (0.20, 0.35, 0.45),
+        },
+        "logs": {"high_cpu_usage": 0.05, "memory_leak": 0.05, "database_connection_issues": 0.70, "high_latency": 0.20},
+    },
+    "network_latency": {
+        "prior": 0.175,
+        "metrics": {
+            "cpu": (0.70, 0.20, 0.10),
+            "memory": (0.70, 0.20, 0.10),
+            "latency": (0.05, 0.30, 0.65),
+            "error_rate": (0.35, 0.35, 0.30),
+        },
+        "logs": {"high_cpu_usage": 0.05, "memory_leak": 0.05, "database_connection_issues": 0.15, "high_latency": 0.75},
+    },
+    DEFAULT_ROOT_CAUSE: {
+        "prior": 0.3,
+        "metrics": {
+            "cpu": (0.50, 0.30, 0.20),
+            "memory": (0.50, 0.30, 0.20),
+            "latency": (0.50, 0.30, 0.20),
+            "error_rate": (0.50, 0.30, 0.20),
+        },
+        "logs": {"high_cpu_usage": 0.25, "memory_leak": 0.25, "database_connection_issues": 0.25, "high_latency": 0.25},
+    },
+}
+
+
+class RootCauseScorer:
+    """Precomputed log-likelihood tables for scoring candidate root causes"""
+
+    def __init__(self, likelihoods: Mapping[str, Mapping[str, Any]] = LIKELIHOODS, max_log_hits: int = MAX_LOG_HITS):
+        self.causes: tuple[str, ...] = tuple(likelihoods)
+        first = next(iter(likelihoods.values()))
+        self.metrics: tuple[str, ...] = tuple(first["metrics"])
+        self.categories: tuple[str, ...] = tuple(first["logs"])
+        self.max_log_hits = max_log_hits
+
+        priors = np.array([float(likelihoods[c]["prior"]) for c in self.causes])
+        # (metrics x levels x causes) and (categories x causes)
+        metric_tables = np.array(
+            [[likelihoods[c]["metrics"][m] for c in self.causes] for m in self.metrics], dtype=float
+        ).transpose(0, 2, 1)
+        log_tables = np.array([[likelihoods[c]["logs"][k] for c in self.causes] for k in self.categories], dtype=float)
+        if (priors <= 0).any() or (metric_tables <= 0).any() or (log_tables <= 0).any():
+            raise ValueError("Priors and likelihoods must be positive")
+
+        self.log_prior = np.log(priors / priors.sum())
+        self.metric_log_likelihood = np.log(metric_tables / metric_tables.sum(axis=1, keepdims=True))
+        self.log_log_likelihood = np.log(log_tables / log_tables.sum(axis=0, keepdims=True))
+        for array in (self.log_prior, self.metric_log_likelihood, self.log_log_likelihood):
+            array.flags.writeable = False
+
+    def posterior_matrix(self, levels: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """(services x causes) posteriors from (services x metrics) level codes and
+        (services x categories) log hit counts, in the column order of self.metrics
+        and self.categories"""
+        one_hot = (levels[:, :, None] == np.array(LEVELS)).astype(float)
+        scores = np.einsum("nml,mlc->nc", one_hot, self.metric_log_likelihood)
+        scores += np.minimum(counts, self.max_log_hits) @ self.log_log_likelihood
+        scores += self.log_prior
+
+        scores -= scores.max(axis=1, keepdims=True)
+        posteriors = np.exp(scores)
+        posteriors /= posteriors.sum(axis=1, keepdims=True)
+        return posteriors
+
+    def score(
+        self,
+        service_ids: Sequence[Optional[str]],
+        metrics_list: Sequence[Mapping[str, Any]],
+        counts: np.ndarray,
+        categories: Sequence[str],
+    ) -> np.ndarray:
+        """(services x causes) posteriors for services' metrics and log category counts.
+
+        counts has one column per entry of categories; categories the tables
+        do not know are ignored and missing ones count as no hits.
+        """
+        profiles = get_threshold_profiles()
+        levels = profiles.classify_matrix(service_ids, profiles.values_matrix(metrics_list))
+        metric_columns = [profiles.metrics.index(m) if m in profiles.metrics else None for m in self.metrics]
+        scored_levels = np.column_stack([
+            levels[:, column] if column is not None else np.full(len(metrics_list), UNKNOWN)
+            for column in metric_columns
+        ]) if len(metrics_list) else np.zeros((0, len(self.metrics)), dtype=np.int8)
+
+        counts = np.asarray(counts, dtype=float).reshape(len(metrics_list), len(categories))
+        positions = {category: index for index, category in enumerate(categories)}
+        scored_counts = np.zeros((len(metrics_list), len(self.categories)))
+        for column, category in enumerate(self.categories):
+            if category in positions:
+                scored_counts[:, column] = counts[:, positions[category]]
+
+        return self.posterior_matrix(scored_levels, scored_counts)
+
+    def rank(self, posteriors: np.ndarray, top: Optional[int] = None) -> list[list[dict[str, Any]]]:
+        """Candidate causes of each service, most probable first"""
+        order = np.argsort(-posteriors, axis=1, kind="stable")[:, :top]
+        return [
+            [{"cause": self.causes[index], "probability": round(float(row[index]), 3)} for index in indices]
+            for row, indices in zip(posteriors, order)
+        ]
+
+
+_scorer = RootCauseScorer()
+
+
+def get_root_cause_scorer() -> RootCauseScorer:
+    """The shared scorer built from LIKELIHOODS"""
+    return _scorer
+
+
+def rank_root_causes(
+    service_ids: Sequence[Optional[str]],
+    metrics_list: Sequence[Mapping[str, Any]],
+    counts: np.ndarray,
+    categories: Sequence[str],
+    top: Optional[int] = None,
+) -> list[list[dict[str, Any]]]:
+    """Ranked candidate causes with posterior probabilities, for each service, in one pass"""
+    scorer = get_root_cause_scorer()
+    return scorer.rank(scorer.score(service_ids, metrics_list, counts, categories), top)
@@ -0,0 +1,118 @@
+# airs_common/serialization.py
+"""
+JSON encoding and decoding for AIRS components.
+
+Every tool response is a JSON document in a Message, and every backend
+response is parsed from JSON, so on fleet-sized calls the codec shows up in
+the profile. Components encode and decode through dumps() and loads() here,
+which use orjson when it is installed and the standard library otherwise.
+Both write compact JSON with no spaces after separators and non-ASCII
+characters (such as the status icons) as UTF-8, so the Message text is the
+same whichever codec produced it.
+
+The codec is chosen once at import from AIRS_JSON_CODEC: "auto" (default,
+orjson if available), "orjson" or "stdlib". configure_json_codec() switches
+it at runtime, e.g. for benchmarks.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convert NumPy scalars and arrays that a codec cannot encode natively"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JsonCodec(ABC):
+    """A JSON encoder/decoder pair"""
+
+    name = "base"
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> str:
+        """Encode obj as compact JSON text"""
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode a JSON document from bytes or text"""
+
+
+class StdlibCodec(JsonCodec):
+    """The standard library json module, with compact separators and UTF-8 output as orjson writes"""
+
+    name = "stdlib"
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_to_builtin)
+
+    def dumps(self, obj: Any) -> str:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson, which encodes and decodes in Rust"""
+
+    name = "orjson"
+    # Non-string keys are written as strings, as json.dumps does
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj, default=_to_builtin, option=self._OPTIONS).decode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+CODECS: dict[str, type[JsonCodec]] = {"stdlib": StdlibCodec, "orjson": OrjsonCodec}
+
+_codec: JsonCodec = StdlibCodec()
+
+
+def configure_json_codec(name: Optional[str] = None) -> JsonCodec:
+    """Select the codec by name, or the fastest available one for None or "auto" """
+    global _codec
+    if name in (None, "", "auto"):
+        name = "orjson" if orjson is not None else "stdlib"
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {name}")
+    _codec = CODECS[name]()
+    return _codec
+
+
+def get_json_codec() -> JsonCodec:
+    """The codec currently in use"""
+    return _codec
+
+
+def dumps(obj: Any) -> str:
+    """Encode obj as compact JSON text"""
+    return _codec.dumps(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document from bytes or text"""
+    return _codec.loads(data)
+
+
+try:
+    configure_json_codec(os.getenv("AIRS_JSON_CODEC", "auto").strip().lower())
+except (ImportError, ValueError):
+    # A codec that is unknown or not installed must not stop the components loading
+    configure_json_codec("stdlib")
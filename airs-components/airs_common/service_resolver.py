@@ -0,0 +1,250 @@
+# airs_common/service_resolver.py
+"""
+Resolve natural language service references to backend service IDs.
+
+The service catalog is loaded from /services once per backend and compiled
+into an alias index (IDs, full names and distinctive name tokens) that is
+refreshed on a TTL. A query is resolved in one left-to-right pass over its
+tokens, so resolution cost depends on the query length rather than the size
+of the fleet. An explicit ID beats a full name, which beats a single name
+word; operational words such as "log" or "gateway" only identify a service
+when the query names none otherwise.
+
+A query that names an ID the cached catalog does not know, such as a service
+added during an incident, forces one early reload, at most once every
+MIN_REFRESH_SECONDS, rather than failing until the TTL expires.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+# How long a loaded catalog is trusted before it is refetched
+CATALOG_TTL_SECONDS = float(os.getenv("AIRS_SERVICE_CATALOG_TTL_SECONDS", "60"))
+
+# Minimum time between two early reloads for unknown IDs
+MIN_REFRESH_SECONDS = float(os.getenv("AIRS_SERVICE_CATALOG_MIN_REFRESH_SECONDS", "5"))
+
+# Generic words that never identify a service on their own
+STOP_TOKENS = frozenset({
+    "a", "an", "and", "api", "app", "for", "is", "of", "on", "server",
+    "service", "services", "system", "the", "to",
+})
+
+# Operational words that also occur in service names ("Log Ingestion",
+# "Payment Gateway"). Queries use them about every service ("check log
+# errors for auth"), so they only identify a service when nothing else does
+DOMAIN_TOKENS = frozenset({
+    "action", "actions", "alert", "alerts", "analysis", "analyze", "cache", "cause", "check",
+    "connection", "cpu", "critical", "database", "error", "errors", "find", "gateway", "health",
+    "healthy", "issue", "issues", "latency", "log", "logs", "memory", "metric", "metrics",
+    "network", "problem", "problems", "recommend", "request", "requests", "restart", "root",
+    "scale", "status", "timeout", "user", "users", "verify", "warning",
+})
+
+# Alias priorities: an exact ID beats a full name, which beats a single name
+# token, which beats an operational word
+PRIORITY_ID = 3
+PRIORITY_NAME = 2
+PRIORITY_TOKEN = 1
+PRIORITY_DOMAIN = 0
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Service IDs made of a letter prefix and a number ("s1", "svc12")
+_ID_SHAPE = re.compile(r"([a-z]+)[0-9]+")
+
+
+def _tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class ServiceResolver:
+    """Alias index over one backend's service catalog"""
+
+    def __init__(self, ttl_seconds: float = CATALOG_TTL_SECONDS, min_refresh_seconds: float = MIN_REFRESH_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        # (alias index, longest alias in tokens, ID shape), swapped as one unit on reload
+        self._index: tuple[dict[tuple[str, ...], tuple[str, int]], int, Optional[re.Pattern[str]]] = ({}, 1, None)
+        self._loaded_at: Optional[float] = None
+        self._forced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether a catalog has been loaded at least once"""
+        return self._loaded_at is not None
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the catalog needs to be (re)loaded"""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def load(self, services: list[dict[str, Any]]) -> None:
+        """Compile the alias index from a /services response"""
+        aliases: dict[tuple[str, ...], tuple[str, int]] = {}
+        token_owners: dict[str, set[str]] = {}
+        id_prefixes: set[str] = set()
+
+        for service in services:
+            if not isinstance(service, dict) or not service.get("id"):
+                continue
+            service_id = str(service["id"])
+
+            id_tokens = tuple(_tokenize(service_id))
+            if id_tokens:
+                aliases[id_tokens] = (service_id, PRIORITY_ID)
+                shape = _ID_SHAPE.fullmatch(id_tokens[0]) if len(id_tokens) == 1 else None
+                if shape is not None:
+                    id_prefixes.add(shape.group(1))
+
+            name_tokens = tuple(_tokenize(str(service.get("name", ""))))
+            if name_tokens and aliases.get(name_tokens, ("", 0))[1] < PRIORITY_NAME:
+                aliases[name_tokens] = (service_id, PRIORITY_NAME)
+
+            for token in set(name_tokens):
+                if len(token) >= 3 and token not in STOP_TOKENS:
+                    token_owners.setdefault(token, set()).add(service_id)
+
+        # Single name tokens only count when exactly one service uses them
+        for token, owners in token_owners.items():
+            if len(owners) == 1 and (token,) not in aliases:
+                priority = PRIORITY_DOMAIN if token in DOMAIN_TOKENS else PRIORITY_TOKEN
+                aliases[(token,)] = (next(iter(owners)), priority)
+
+        id_shape = re.compile(f"(?:{'|'.join(sorted(id_prefixes))})[0-9]+") if id_prefixes else None
+        self._index = (aliases, max((len(alias) for alias in aliases), default=1), id_shape)
+        self._loaded_at = time.monotonic()
+
+    def unknown_ids(self, query: str) -> list[str]:
+        """Tokens of query shaped like the catalog's IDs that are not in it"""
+        aliases, _, id_shape = self._index
+        if id_shape is None:
+            return []
+        return [token for token in _tokenize(query) if id_shape.fullmatch(token) and (token,) not in aliases]
+
+    def claim_early_refresh(self) -> bool:
+        """Whether an early reload may run now; claiming one holds off the next"""
+        with self._lock:
+            now = time.monotonic()
+            if self._forced_at is not None and now - self._forced_at < self.min_refresh_seconds:
+                return False
+            self._forced_at = now
+            return True
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Return the best-matching service ID in query, or None.
+
+        The highest-priority alias wins; among equals, the first mentioned.
+        """
+        aliases, max_tokens, _ = self._index
+        tokens = _tokenize(query)
+
+        best: Optional[tuple[str, int]] = None
+        for start in range(len(tokens)):
+            # Longest alias starting here wins; the window is bounded by the longest name
+            for length in range(min(max_tokens, len(tokens) - start), 0, -1):
+                match = aliases.get(tuple(tokens[start:start + length]))
+                if match is not None:
+                    if best is None or match[1] > best[1]:
+                        best = match
+                    break
+            if best is not None and best[1] == PRIORITY_ID:
+                break
+
+        return best[0] if best else None
+
+    def resolve_all(self, query: str) -> list[str]:
+        """Return every service ID mentioned in query, in order of mention.
+
+        Operational words count only when the query names no service otherwise.
+        """
+        aliases, max_tokens, _ = self._index
+        tokens = _tokenize(query)
+
+        found: dict[str, None] = {}
+        fallback: dict[str, None] = {}
+        start = 0
+        while start < len(tokens):
+            step = 1
+            for length in range(min(max_tokens, len(tokens) - start), 0, -1):
+                match = aliases.get(tuple(tokens[start:start + length]))
+                if match is not None:
+                    (fallback if match[1] == PRIORITY_DOMAIN else found).setdefault(match[0])
+                    step = length
+                    break
+            start += step
+
+        return list(found or fallback)
+
+
+_resolvers: dict[str, ServiceResolver] = {}
+_registry_lock = threading.Lock()
+
+
+def get_service_resolver(backend_url: str) -> ServiceResolver:
+    """Get the shared resolver for a backend"""
+    with _registry_lock:
+        resolver = _resolvers.get(backend_url)
+        if resolver is None:
+            resolver = _resolvers[backend_url] = ServiceResolver()
+        return resolver
+
+
+async def _refresh_if_stale(resolver: ServiceResolver, fetch_services: Callable[[], Awaitable[Any]]) -> None:
+    """Reload the resolver's catalog when it has expired"""
+    if not resolver.is_stale:
+        return
+    try:
+        services = await fetch_services()
+    except Exception:
+        # Keep answering from the previous catalog if we have one
+        if not resolver.is_loaded:
+            raise
+    else:
+        if not isinstance(services, list):
+            raise ValueError("Invalid response format from backend")
+        resolver.load(services)
+
+
+async def _refresh_for_unknown_ids(
+    resolver: ServiceResolver, user_input: str, fetch_services: Callable[[], Awaitable[Any]]
+) -> None:
+    """Reload the catalog early when user_input names an ID it does not know"""
+    if not resolver.unknown_ids(user_input) or not resolver.claim_early_refresh():
+        return
+    try:
+        services = await fetch_services()
+    except Exception:
+        # The query fails to resolve as it would have without the reload
+        return
+    if isinstance(services, list):
+        resolver.load(services)
+
+
+async def resolve_service_id(
+    backend_url: str,
+    user_input: str,
+    fetch_services: Callable[[], Awaitable[Any]],
+) -> Optional[str]:
+    """Resolve user_input to a service ID, refreshing the catalog when stale or missing a named ID"""
+    resolver = get_service_resolver(backend_url)
+    await _refresh_if_stale(resolver, fetch_services)
+    await _refresh_for_unknown_ids(resolver, user_input, fetch_services)
+    return resolver.resolve(user_input)
+
+
+async def resolve_service_ids(
+    backend_url: str,
+    user_input: str,
+    fetch_services: Callable[[], Awaitable[Any]],
+) -> list[str]:
+    """Resolve every service mentioned in user_input, refreshing the catalog when stale or missing a named ID"""
+    resolver = get_service_resolver(backend_url)
+    await _refresh_if_stale(resolver, fetch_services)
+    await _refresh_for_unknown_ids(resolver, user_input, fetch_services)
+    return resolver.resolve_all(user_input)
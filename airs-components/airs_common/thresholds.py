@@ -0,0 +1,379 @@
+# airs_common/thresholds.py
+"""
+Metric threshold evaluation shared by all components.
+
+Warning and critical levels live in array-backed tables (one column per
+metric) that are built once, instead of threshold dicts rebuilt on every call.
+Metrics for any number of services are classified together: the services are
+stacked into a (services x metrics) matrix and compared against their
+threshold rows in a single vectorized pass.
+
+Thresholds can be tuned per tier or per service with a profiles file (JSON),
+named by AIRS_THRESHOLD_PROFILES, inline JSON in AIRS_THRESHOLD_PROFILES_JSON,
+or a document served over HTTP at AIRS_THRESHOLD_PROFILES_URL:
+
+    {
+      "default": {"cpu": {"warn": 70, "crit": 85}},
+      "tiers": {"latency-sensitive": {"latency": {"warn": 150, "crit": 250}}},
+      "services": {
+        "S1": {"tier": "latency-sensitive"},
+        "S4": {"thresholds": {"memory": {"warn": 85, "crit": 95}}}
+      }
+    }
+
+"default" overrides or extends the built-in thresholds, a tier overrides the
+default and a service's own thresholds override its tier. Profiles are
+compiled into one frozen ThresholdProfiles object shared by every component;
+the file or URL is re-checked at most every AIRS_THRESHOLD_RELOAD_SECONDS and
+recompiled when it changes. A URL is fetched on a background thread, so
+classification never waits on the network; until the first fetch completes
+the built-in thresholds apply. A profile that fails to load, including one
+that is not shaped as above, leaves the previous one in place.
+
+Levels match the backend (airs-backend/config/constants.js): a value at or
+above the warning threshold is a warning, at or above the critical threshold
+it is critical.
+"""
+
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Sequence
+
+import httpx
+import numpy as np
+
+DEFAULT_THRESHOLDS: dict[str, dict[str, float]] = {
+    'cpu': {'warn': 70, 'crit': 85},
+    'memory': {'warn': 75, 'crit': 90},
+    'latency': {'warn': 300, 'crit': 500},
+    'error_rate': {'warn': 5, 'crit': 10},
+}
+
+# Threshold profile sources and how often the file is checked for changes
+PROFILES_PATH = os.getenv("AIRS_THRESHOLD_PROFILES", "")
+PROFILES_JSON = os.getenv("AIRS_THRESHOLD_PROFILES_JSON", "")
+PROFILES_URL = os.getenv("AIRS_THRESHOLD_PROFILES_URL", "")
+PROFILES_URL_TIMEOUT_SECONDS = 5.0
+RELOAD_INTERVAL_SECONDS = float(os.getenv("AIRS_THRESHOLD_RELOAD_SECONDS", "5"))
+
+# Level codes produced by classify_matrix
+UNKNOWN = -1
+HEALTHY = 0
+WARNING = 1
+CRITICAL = 2
+
+LEVEL_NAMES = {UNKNOWN: "unknown", HEALTHY: "healthy", WARNING: "warning", CRITICAL: "critical"}
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _values_matrix(metric_names: Sequence[str], metrics_list: Sequence[Mapping[str, Any]]) -> np.ndarray:
+    """Stack metrics dicts into a (services x metrics) matrix, NaN where missing"""
+    rows = [[metrics.get(m, np.nan) for m in metric_names] for metrics in metrics_list]
+    try:
+        values = np.array(rows, dtype=float)
+    except (TypeError, ValueError):
+        # Some value is not numeric; convert cell by cell
+        values = np.array([[_as_float(v) for v in row] for row in rows], dtype=float)
+    return values.reshape(len(metrics_list), len(metric_names))
+
+
+def _classify(values: np.ndarray, warn: np.ndarray, crit: np.ndarray) -> np.ndarray:
+    """Compare values against (broadcastable) threshold rows and return level codes"""
+    levels = (values >= warn).astype(np.int8) + (values >= crit)
+    levels[np.isnan(values)] = UNKNOWN
+    return levels
+
+
+def _level_dicts(
+    metric_names: Sequence[str], metrics_list: Sequence[Mapping[str, Any]], levels: np.ndarray
+) -> list[dict[str, str]]:
+    """Level names of every known metric present, for each metrics dict"""
+    return [
+        {
+            metric: LEVEL_NAMES[code]
+            for metric, code in zip(metric_names, row)
+            if metric in metrics
+        }
+        for metrics, row in zip(metrics_list, levels.tolist())
+    ]
+
+
+class ThresholdTable:
+    """Immutable warning/critical thresholds, one column per metric"""
+
+    def __init__(self, thresholds: Mapping[str, Mapping[str, float]], name: str = "default"):
+        self.name = name
+        self.metrics: tuple[str, ...] = tuple(thresholds)
+        self.columns = {metric: index for index, metric in enumerate(self.metrics)}
+        self.warn = np.array([float(thresholds[m]['warn']) for m in self.metrics])
+        self.crit = np.array([float(thresholds[m]['crit']) for m in self.metrics])
+        self.warn.flags.writeable = False
+        self.crit.flags.writeable = False
+
+    def values_matrix(self, metrics_list: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Stack metrics dicts into a (services x metrics) matrix, NaN where missing"""
+        return _values_matrix(self.metrics, metrics_list)
+
+    def classify_matrix(self, values: np.ndarray) -> np.ndarray:
+        """Classify a (services x metrics) matrix into level codes in one pass"""
+        return _classify(values, self.warn, self.crit)
+
+    def classify_many(self, metrics_list: Sequence[Mapping[str, Any]]) -> list[dict[str, str]]:
+        """Level names of every known metric present, for each metrics dict"""
+        return _level_dicts(self.metrics, metrics_list, self.classify_matrix(self.values_matrix(metrics_list)))
+
+    def classify(self, metrics: Mapping[str, Any]) -> dict[str, str]:
+        """Level names of every known metric present in one metrics dict"""
+        return self.classify_many([metrics])[0]
+
+    def assess(self, metric_name: str, value: Any) -> str:
+        """Level name of a single metric value ("unknown" for untracked metrics)"""
+        if metric_name not in self.columns:
+            return LEVEL_NAMES[UNKNOWN]
+        return self.classify({metric_name: value})[metric_name]
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        return {
+            metric: {'warn': float(warn), 'crit': float(crit)}
+            for metric, warn, crit in zip(self.metrics, self.warn, self.crit)
+        }
+
+
+def _section(config: Mapping[str, Any], key: str) -> Mapping[str, Any]:
+    """An optional object-valued section of a profiles config"""
+    section = config.get(key)
+    if section is None:
+        return {}
+    if not isinstance(section, Mapping):
+        raise ValueError(f"'{key}' in threshold profiles must be an object")
+    return section
+
+
+def _merge(
+    base: dict[str, dict[str, float]], overrides: Any, allowed: Optional[Sequence[str]], where: str
+) -> dict[str, dict[str, float]]:
+    """Overlay metric thresholds onto base, validating them"""
+    if not isinstance(overrides, Mapping):
+        raise ValueError(f"Thresholds for {where} must be an object")
+    merged = {metric: dict(levels) for metric, levels in base.items()}
+    for metric, levels in overrides.items():
+        if allowed is not None and metric not in allowed:
+            raise ValueError(f"Unknown metric '{metric}' in {where}")
+        if not isinstance(levels, Mapping):
+            raise ValueError(f"Thresholds for '{metric}' in {where} must be an object")
+        entry = {**merged.get(metric, {}), **levels}
+        if set(entry) != {'warn', 'crit'}:
+            raise ValueError(f"'{metric}' in {where} needs exactly warn and crit")
+        if not float(entry['warn']) <= float(entry['crit']):
+            raise ValueError(f"'{metric}' in {where} has warn above crit")
+        merged[metric] = {'warn': float(entry['warn']), 'crit': float(entry['crit'])}
+    return merged
+
+
+class ThresholdProfiles:
+    """Frozen set of threshold tables: a default plus per-tier and per-service profiles.
+
+    Every table has the same metric columns, so a fleet whose services use
+    different profiles is still classified in one vectorized pass by gathering
+    each service's threshold row.
+    """
+
+    def __init__(self, config: Optional[Mapping[str, Any]] = None):
+        if config is None:
+            config = {}
+        if not isinstance(config, Mapping):
+            raise ValueError("Threshold profiles must be an object")
+        default = _merge(DEFAULT_THRESHOLDS, _section(config, 'default'), None, "default")
+        metrics = tuple(default)
+
+        tiers = {
+            tier: _merge(default, overrides, metrics, f"tier '{tier}'")
+            for tier, overrides in _section(config, 'tiers').items()
+        }
+
+        tables = [ThresholdTable(default, "default")]
+        tier_rows = {}
+        for tier, thresholds in tiers.items():
+            tier_rows[tier] = len(tables)
+            tables.append(ThresholdTable(thresholds, f"tier:{tier}"))
+
+        service_rows = {}
+        for service_id, entry in _section(config, 'services').items():
+            if not isinstance(entry, Mapping):
+                raise ValueError(f"Profile for service '{service_id}' must be an object")
+            tier = entry.get('tier')
+            if tier is not None and tier not in tiers:
+                raise ValueError(f"Service '{service_id}' uses unknown tier '{tier}'")
+            if entry.get('thresholds'):
+                base = tiers[tier] if tier is not None else default
+                service_rows[service_id] = len(tables)
+                tables.append(ThresholdTable(
+                    _merge(base, entry['thresholds'], metrics, f"service '{service_id}'"),
+                    f"service:{service_id}"
+                ))
+            elif tier is not None:
+                service_rows[service_id] = tier_rows[tier]
+
+        self.metrics = metrics
+        self.tables = tuple(tables)
+        self.service_rows = MappingProxyType(service_rows)
+        self.warn = np.vstack([table.warn for table in tables])
+        self.crit = np.vstack([table.crit for table in tables])
+        self.warn.flags.writeable = False
+        self.crit.flags.writeable = False
+
+    @property
+    def default(self) -> ThresholdTable:
+        return self.tables[0]
+
+    def table_for(self, service_id: Optional[str]) -> ThresholdTable:
+        """Threshold table that applies to a service"""
+        return self.tables[self.service_rows.get(service_id, 0)]
+
+    def classify(self, service_id: Optional[str], metrics: Mapping[str, Any]) -> dict[str, str]:
+        """Level names of one service's metrics under its profile"""
+        return self.table_for(service_id).classify(metrics)
+
+    def values_matrix(self, metrics_list: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Stack metrics dicts into a (services x metrics) matrix, NaN where missing"""
+        return _values_matrix(self.metrics, metrics_list)
+
+    def classify_matrix(self, service_ids: Sequence[Optional[str]], values: np.ndarray) -> np.ndarray:
+        """Classify a (services x metrics) matrix, each row under its service's profile"""
+        rows = np.array([self.service_rows.get(sid, 0) for sid in service_ids], dtype=np.intp)
+        return _classify(values, self.warn[rows], self.crit[rows])
+
+    def classify_many(
+        self, service_ids: Sequence[Optional[str]], metrics_list: Sequence[Mapping[str, Any]]
+    ) -> list[dict[str, str]]:
+        """Level names of each service's metrics under its profile, in one pass"""
+        levels = self.classify_matrix(service_ids, self.values_matrix(metrics_list))
+        return _level_dicts(self.metrics, metrics_list, levels)
+
+
+class _ProfileRegistry:
+    """Holds the current profiles and reloads them when their source changes"""
+
+    def __init__(self, path: str, inline_json: str, reload_interval: float, url: str = ""):
+        self.path = path
+        self.inline_json = inline_json
+        self.url = url
+        self.reload_interval = reload_interval
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._signature: Optional[Any] = None
+        self._checked_at = 0.0
+        self._fetching = False
+        self._profiles = self._load_initial()
+        if self.url and not self.path:
+            self._start_fetch(time.monotonic())
+
+    def _load_initial(self) -> ThresholdProfiles:
+        try:
+            if self.path:
+                return self._load_file()
+            if self.inline_json:
+                return ThresholdProfiles(json.loads(self.inline_json))
+        except (OSError, TypeError, ValueError) as e:
+            self.last_error = str(e)
+        return ThresholdProfiles()
+
+    def _start_fetch(self, now: float) -> None:
+        """Refresh the profiles from the URL on a background thread (at most one at a time)"""
+        with self._lock:
+            if self._fetching:
+                return
+            self._fetching = True
+            self._checked_at = now
+        threading.Thread(target=self._fetch_url, name="airs-threshold-profiles", daemon=True).start()
+
+    def _fetch_url(self) -> None:
+        url = self.url
+        try:
+            headers = {"If-None-Match": self._signature} if isinstance(self._signature, str) else {}
+            response = httpx.get(url, headers=headers, timeout=PROFILES_URL_TIMEOUT_SECONDS)
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            signature = response.headers.get("etag") or hash(response.content)
+            if signature == self._signature:
+                return
+            profiles = ThresholdProfiles(json.loads(response.content))
+            with self._lock:
+                # A config installed with load() while fetching wins
+                if self.url == url:
+                    self._profiles = profiles
+                    self._signature = signature
+                    self.last_error = None
+        except (httpx.HTTPError, TypeError, ValueError) as e:
+            # Keep serving the last good profiles
+            self.last_error = str(e)
+        finally:
+            self._fetching = False
+
+    def _file_signature(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_file(self) -> ThresholdProfiles:
+        signature = self._file_signature()
+        with open(self.path, encoding="utf-8") as f:
+            profiles = ThresholdProfiles(json.load(f))
+        self._signature = signature
+        self.last_error = None
+        return profiles
+
+    def get(self) -> ThresholdProfiles:
+        """Current profiles, reloading the file or URL if it changed since the last check"""
+        if not self.path:
+            if self.url:
+                now = time.monotonic()
+                if now - self._checked_at >= self.reload_interval:
+                    self._start_fetch(now)
+            return self._profiles
+
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return self._profiles
+
+        with self._lock:
+            if now - self._checked_at >= self.reload_interval:
+                self._checked_at = now
+                try:
+                    if self._file_signature() != self._signature:
+                        self._profiles = self._load_file()
+                except (OSError, TypeError, ValueError) as e:
+                    # Keep serving the last good profiles
+                    self.last_error = str(e)
+        return self._profiles
+
+    def load(self, config: Optional[Mapping[str, Any]]) -> ThresholdProfiles:
+        """Replace the profiles with ones compiled from config (None restores the defaults)"""
+        profiles = ThresholdProfiles(config)
+        with self._lock:
+            self._profiles = profiles
+            self.path = ""
+            self.url = ""
+        return profiles
+
+
+_registry = _ProfileRegistry(PROFILES_PATH, PROFILES_JSON, RELOAD_INTERVAL_SECONDS, PROFILES_URL)
+
+
+def get_threshold_profiles() -> ThresholdProfiles:
+    """Get the shared threshold profiles, hot-reloaded when the profiles file or URL changes"""
+    return _registry.get()
+
+
+def load_threshold_profiles(config: Optional[Mapping[str, Any]]) -> ThresholdProfiles:
+    """Install threshold profiles from a config dict, replacing the file or URL based ones"""
+    return _registry.load(config)
@@ -0,0 +1,54 @@
+# airs_common/url_validation.py
+"""
+Backend URL validation shared by all components.
+
+The backend URL is validated before every API call but almost never changes,
+so successful validations are memoized per URL string and hot tool-call paths
+skip the parse after the first call. Invalid URLs are not cached and raise on
+every call.
+"""
+
+import re
+from functools import lru_cache
+from urllib.parse import urlparse
+
+_SCHEME_PATTERN = re.compile(r'^https?://')
+
+
+def check_backend_url(url: str) -> str:
+    """Validate and sanitize backend URL (uncached)"""
+    if not url:
+        raise ValueError("Backend URL cannot be empty")
+
+    # Basic URL format validation
+    if not _SCHEME_PATTERN.match(url):
+        raise ValueError("Backend URL must start with http:// or https://")
+
+    parsed = urlparse(url)
+
+    # Security validations
+    if parsed.scheme not in ['http', 'https']:
+        raise ValueError("Invalid URL scheme. Must be http or https")
+
+    if not parsed.hostname:
+        raise ValueError("Invalid URL: missing hostname")
+
+    # Prevent credential leakage in URLs
+    if parsed.username or parsed.password:
+        raise ValueError("URL must not contain username or password")
+
+    # Prevent potentially dangerous URL components
+    if parsed.query or parsed.fragment:
+        raise ValueError("URL must not contain query parameters or fragments")
+
+    # Basic port validation
+    if parsed.port and (parsed.port < 1 or parsed.port > 65535):
+        raise ValueError("Invalid port number")
+
+    return url.rstrip('/')
+
+
+@lru_cache(maxsize=64)
+def validate_backend_url(url: str) -> str:
+    """Validate and sanitize backend URL, memoized per URL string"""
+    return check_backend_url(url)
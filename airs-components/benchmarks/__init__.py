@@ -0,0 +1,7 @@
+# benchmarks/__init__.py
+"""
+AIRS Component Benchmarks
+
+Standalone performance scripts. Run from the airs-components directory, e.g.
+`python -m benchmarks.bench_url_validation`. Not a Langflow component package.
+"""
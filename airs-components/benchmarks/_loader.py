@@ -0,0 +1,43 @@
+# benchmarks/_loader.py
+"""
+Load the AIRS components the way Langflow does.
+
+Langflow does not import the tool directories as packages (their names,
+"Diagnostic Tools" and "Remediation Tools", are not valid identifiers); it
+reads each component file and executes its source on its own. The
+components therefore import shared code only absolutely, from the installed
+airs_common package, and this loader executes every component file in a
+fresh module namespace in the same way.
+"""
+
+import sys
+from pathlib import Path
+from types import ModuleType
+
+ROOT = Path(__file__).resolve().parent.parent
+TOOL_DIRECTORIES = ("Diagnostic Tools", "Remediation Tools")
+
+
+def load_component_file(path: Path) -> ModuleType:
+    """Execute one component file as a standalone module"""
+    module = ModuleType(f"airs_component_{path.stem}")
+    module.__file__ = str(path)
+    sys.modules[module.__name__] = module
+    exec(compile(path.read_text(encoding="utf-8"), str(path), "exec"), module.__dict__)
+    return module
+
+
+def load_components() -> dict[str, type]:
+    """Component classes by name, from every component file in the tool directories"""
+    from langflow.custom import Component
+
+    classes = {}
+    for directory in TOOL_DIRECTORIES:
+        for path in sorted((ROOT / directory).glob("*.py")):
+            if path.name == "__init__.py":
+                continue
+            module = load_component_file(path)
+            for name, value in vars(module).items():
+                if isinstance(value, type) and issubclass(value, Component) and value is not Component:
+                    classes[name] = value
+    return classes
@@ -0,0 +1,176 @@
+# benchmarks/bench_components.py
+"""
+Benchmark the AIRS tool chain against an in-process stub backend.
+
+Drives each component's async output method, then the full
+diagnose -> recommend -> execute -> verify chain, and reports p50/p95/p99
+latency, calls per second and backend requests per tool call.
+
+Usage: python -m benchmarks.bench_components [--services N] [--latency-ms MS]
+           [--iterations N] [--concurrency N] [--no-cache] [--dump-metrics]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Callable
+
+import airs_common as common
+
+from ._loader import load_components
+from .stub_backend import StubBackend
+
+# (label, component class, output method, input name, input text for a service ID)
+TOOL_CASES: list[tuple[str, str, str, str, Callable[[str], str]]] = [
+    ("ServiceLister", "ServiceLister", "get_services_overview_async", "query",
+     lambda sid: "List all services and their status"),
+    ("HealthChecker", "HealthChecker", "get_health_report_async", "service_input",
+     lambda sid: f"Check health of service {sid}"),
+    ("HealthChecker (fleet)", "HealthChecker", "get_health_report_async", "service_input",
+     lambda sid: "How is everything?"),
+    ("LogAnalyzer", "LogAnalyzer", "get_log_analysis_async", "service_input",
+     lambda sid: f"Analyze logs for service {sid}"),
+    ("RootCauseIdentifier", "RootCauseIdentifier", "get_root_cause_analysis_async", "service_input",
+     lambda sid: f"Find root cause for service {sid}"),
+    ("RootCauseIdentifier (batch)", "RootCauseIdentifier", "get_root_cause_analysis_async", "service_input",
+     lambda sid: "Find root cause for all critical services"),
+    ("RootCauseIdentifier (fleet)", "RootCauseIdentifier", "get_root_cause_analysis_async", "service_input",
+     lambda sid: "Correlate failures across the fleet"),
+    ("RecommendActions", "RecommendActions", "get_action_recommendations_async", "service_input",
+     lambda sid: f"Recommend actions for service {sid}"),
+    ("RemediationVerifier", "RemediationVerifier", "verify_remediation_success_async", "verification_request",
+     lambda sid: f"Verify remediation for service {sid}"),
+]
+
+
+def _percentile(samples: list[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def _report(label: str, latencies: list[float], elapsed: float, backend_requests: int, errors: int) -> None:
+    calls = len(latencies)
+    ms = [latency * 1000 for latency in latencies]
+    print(
+        f"{label:<30}{calls:>7}{_percentile(ms, 50):>10.2f}{_percentile(ms, 95):>10.2f}"
+        f"{_percentile(ms, 99):>10.2f}{calls / elapsed if elapsed else 0:>10.1f}"
+        f"{backend_requests / calls if calls else 0:>10.2f}{errors:>8}"
+    )
+
+
+def _header(title: str) -> None:
+    print(f"\n{title}")
+    print(f"{'tool':<30}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'calls/s':>10}{'req/call':>10}{'errors':>8}")
+
+
+def _make_component(cls: type, backend_url: str, input_name: str, text: str) -> Any:
+    component = cls()
+    component.set(backend_url=backend_url, **{input_name: text})
+    return component
+
+
+async def _timed_call(component: Any, method: str) -> tuple[float, bool]:
+    started = time.perf_counter()
+    message = await getattr(component, method)()
+    return time.perf_counter() - started, message.text.startswith("❌")
+
+
+async def bench_tools(stub: StubBackend, classes: dict[str, type], iterations: int, concurrency: int) -> None:
+    """Benchmark every read-only tool in isolation"""
+    _header("Per-tool latency")
+    service_ids = [f"S{i + 1}" for i in range(stub.fleet_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    for label, class_name, method, input_name, make_input in TOOL_CASES:
+        stub.reset()
+
+        async def one(i: int) -> tuple[float, bool]:
+            sid = service_ids[i % len(service_ids)]
+            component = _make_component(classes[class_name], stub.url, input_name, make_input(sid))
+            async with semaphore:
+                return await _timed_call(component, method)
+
+        requests_before = stub.total_requests
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(iterations)))
+        elapsed = time.perf_counter() - started
+
+        _report(
+            label,
+            [latency for latency, _ in results],
+            elapsed,
+            stub.total_requests - requests_before,
+            sum(1 for _, failed in results if failed),
+        )
+
+
+async def bench_chain(stub: StubBackend, classes: dict[str, type], iterations: int) -> None:
+    """Benchmark the full diagnose -> recommend -> execute -> verify chain"""
+    _header("Full remediation chain")
+    steps = [
+        ("HealthChecker", "get_health_report_async", "service_input", "Check health of service {sid}"),
+        ("LogAnalyzer", "get_log_analysis_async", "service_input", "Analyze logs for service {sid}"),
+        ("RootCauseIdentifier", "get_root_cause_analysis_async", "service_input", "Find root cause for service {sid}"),
+        ("RecommendActions", "get_action_recommendations_async", "service_input", "Recommend actions for service {sid}"),
+        ("ExecuteRemediation", "execute_remediation_action_async", "remediation_command", "restart service {sid}"),
+        ("RemediationVerifier", "verify_remediation_success_async", "verification_request", "Wait until service {sid} recovers"),
+    ]
+
+    latencies, errors, backend_requests = [], 0, 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        stub.reset()
+        sid = stub.critical_service_ids()[0]
+        requests_before = stub.total_requests
+        chain_started = time.perf_counter()
+        for class_name, method, input_name, template in steps:
+            component = _make_component(classes[class_name], stub.url, input_name, template.format(sid=sid))
+            _, failed = await _timed_call(component, method)
+            errors += failed
+        latencies.append(time.perf_counter() - chain_started)
+        backend_requests += stub.total_requests - requests_before
+    elapsed = time.perf_counter() - started
+
+    _report("chain (6 tools)", latencies, elapsed, backend_requests, errors)
+    print(f"backend requests per tool call in chain: {backend_requests / (iterations * len(steps)):.2f}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    classes = load_components()
+    if args.no_cache:
+        common.response_cache.ttl_seconds = 0
+
+    with StubBackend(
+        fleet_size=args.services,
+        latency_ms=args.latency_ms,
+        remediation_ms=args.remediation_ms,
+    ) as stub:
+        print(
+            f"stub backend: {args.services} services, {args.latency_ms} ms latency, "
+            f"cache {'off' if args.no_cache else 'on'}"
+        )
+        await bench_tools(stub, classes, args.iterations, args.concurrency)
+        await bench_chain(stub, classes, args.chain_iterations)
+        print(f"\nresponse cache: {common.response_cache.stats()}")
+        if args.dump_metrics:
+            print(common.metrics_registry.dump())
+        await common.aclose_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--services", type=int, default=6, help="fleet size served by the stub")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="artificial latency per backend request")
+    parser.add_argument("--remediation-ms", type=float, default=200.0, help="time the stub takes to finish a remediation")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per tool")
+    parser.add_argument("--chain-iterations", type=int, default=10, help="full chain runs")
+    parser.add_argument("--concurrency", type=int, default=1, help="tool calls in flight at once")
+    parser.add_argument("--no-cache", action="store_true", help="disable the shared response cache")
+    parser.add_argument("--dump-metrics", action="store_true", help="print per-phase timing histograms")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
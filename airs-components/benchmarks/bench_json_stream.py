@@ -0,0 +1,107 @@
+# benchmarks/bench_json_stream.py
+"""
+Micro-benchmark: reading a large /logs/analysis payload.
+
+Compares decoding the whole document with json.loads (then slicing, as the
+components used to) against FieldExtractor, which decodes only the fields and
+leading recent_errors the components use. The payload is fed in 64 KiB
+chunks as it would arrive from the network, in both the backend's current
+field order (recent_errors last, so extraction stops early) and the older
+one (recent_errors first, so the bulk has to be skipped). The read_fields
+row runs the components' reader over a streamed response, which falls back
+to decoding the whole body when the fields are not near the front.
+
+Usage: python -m benchmarks.bench_json_stream [--errors N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+import httpx
+
+from airs_common.json_stream import LOG_ANALYSIS_FIELDS, FieldExtractor, project_fields, read_fields
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _payload(errors: int, errors_first: bool) -> bytes:
+    """A log analysis document with the given number of recent errors"""
+    recent_errors = [
+        f"Database timeout after 30000ms: connection pool exhausted (request {n}, trace \"t-{n}\")"
+        for n in range(errors)
+    ]
+    head = {
+        "root_cause": "database_bottleneck",
+        "patterns": ["database_connection_issues", "high_latency"],
+        "suggested_actions": ["restart_service", "kill_connections", "scale_instances", "clear_cache"],
+        "analysis_timestamp": "2024-01-15T10:30:00.000Z",
+    }
+    document = {"recent_errors": recent_errors, **head} if errors_first else {**head, "recent_errors": recent_errors}
+    return json.dumps(document).encode()
+
+
+def _full_decode(body: bytes) -> tuple[dict, int]:
+    return project_fields(json.loads(body), LOG_ANALYSIS_FIELDS), len(body)
+
+
+def _streamed(body: bytes) -> tuple[dict, int]:
+    extractor = FieldExtractor(LOG_ANALYSIS_FIELDS)
+    for start in range(0, len(body), CHUNK_SIZE):
+        if extractor.feed(body[start:start + CHUNK_SIZE]):
+            break
+    return extractor.close(), extractor.bytes_read
+
+
+def _read_fields(body: bytes) -> tuple[dict, int]:
+    consumed = 0
+
+    async def chunks():
+        nonlocal consumed
+        for start in range(0, len(body), CHUNK_SIZE):
+            chunk = body[start:start + CHUNK_SIZE]
+            consumed += len(chunk)
+            yield chunk
+
+    result = asyncio.run(read_fields(httpx.Response(200, content=chunks()), LOG_ANALYSIS_FIELDS))
+    return result, consumed
+
+
+def _measure(func, body: bytes, repeat: int) -> tuple[float, float, int]:
+    """Best-of-repeat time in ms, peak traced memory in MB and bytes consumed"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(body)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    _, consumed = func(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 1e6, consumed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--errors", type=int, default=50000, help="recent_errors in the payload")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'field order':<16}{'reader':<12}{'ms':>10}{'peak MB':>10}{'MB read':>10}")
+    for label, errors_first in (("errors last", False), ("errors first", True)):
+        body = _payload(args.errors, errors_first)
+        expected = _full_decode(body)[0]
+        if _streamed(body)[0] != expected or _read_fields(body)[0] != expected:
+            raise SystemExit("FieldExtractor result differs from json.loads")
+
+        for reader, func in (("json.loads", _full_decode), ("streamed", _streamed), ("read_fields", _read_fields)):
+            ms, peak, consumed = _measure(func, body, args.repeat)
+            print(f"{label:<16}{reader:<12}{ms:>10.2f}{peak:>10.2f}{consumed / 1e6:>10.2f}")
+    print(f"payload size: {len(body) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_keyword_classifier.py
+"""
+Micro-benchmark: log keyword classification.
+
+Counts keyword hits per category over generated log messages with one
+substring search per keyword per message ("naive", as the backend's
+includes() chain does) and with KeywordClassifier, both for one message list
+and for a batch of services classified into one count matrix.
+
+Usage: python -m benchmarks.bench_keyword_classifier [--messages N] [--services N] [--repeat N]
+"""
+
+import argparse
+import random
+import time
+
+from airs_common.keyword_classifier import KeywordClassifier
+from airs_common.log_analysis import LOG_RULES
+
+WORDS = [
+    "request", "failed", "after", "retry", "pool", "exhausted", "worker", "queue", "upstream",
+    "returned", "status", "slow", "query", "cache", "miss", "handler", "shard", "replica",
+]
+KEYWORDS = [keyword for keywords, _, _, _ in LOG_RULES for keyword in keywords]
+
+
+def _messages(count: int, rng: random.Random) -> list[str]:
+    """Log lines of 8-16 words, about a third of them mentioning a category keyword"""
+    messages = []
+    for index in range(count):
+        words = rng.choices(WORDS, k=rng.randint(8, 16))
+        if rng.random() < 0.35:
+            words.insert(rng.randrange(len(words)), rng.choice(KEYWORDS))
+        messages.append(f"{' '.join(words)} (request {index})")
+    return messages
+
+
+def _naive_count(categories: dict[str, list[str]], messages: list[str]) -> dict[str, int]:
+    return {
+        name: sum(message.count(keyword) for message in messages for keyword in keywords)
+        for name, keywords in categories.items()
+    }
+
+
+def _best_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000, help="log messages to classify")
+    parser.add_argument("--services", type=int, default=50, help="services the messages are split across")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per case (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = _messages(args.messages, rng)
+    per_service = max(1, args.messages // args.services)
+    groups = [messages[start:start + per_service] for start in range(0, len(messages), per_service)]
+
+    categories = {pattern: list(keywords) for keywords, pattern, _, _ in LOG_RULES}
+    classifier = KeywordClassifier(categories)
+    assert classifier.count(messages) == _naive_count(categories, messages)
+
+    naive_ms = _best_ms(lambda: _naive_count(categories, messages), args.repeat)
+    classifier_ms = _best_ms(lambda: classifier.count(messages), args.repeat)
+    naive_batch_ms = _best_ms(lambda: [_naive_count(categories, group) for group in groups], args.repeat)
+    matrix_ms = _best_ms(lambda: classifier.count_matrix(groups), args.repeat)
+
+    print(f"{len(messages)} messages, {len(KEYWORDS)} keywords in {len(categories)} categories, {len(groups)} services")
+    print(f"{'case':<28}{'naive ms':>10}{'classifier ms':>15}{'speedup':>9}")
+    print(f"{'one message list':<28}{naive_ms:>10.2f}{classifier_ms:>15.2f}{naive_ms / classifier_ms:>8.1f}x")
+    print(f"{'per-service matrix':<28}{naive_batch_ms:>10.2f}{matrix_ms:>15.2f}{naive_batch_ms / matrix_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
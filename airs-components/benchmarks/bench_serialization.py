@@ -0,0 +1,121 @@
+# benchmarks/bench_serialization.py
+"""
+Micro-benchmark: JSON codecs on fleet-sized payloads.
+
+Encodes a fleet health report and a service listing shaped like the
+HealthChecker and ServiceLister responses, and decodes a /services payload,
+with each available codec. "stdlib (old)" is json.dumps/json.loads with
+default separators, as the components used before the serialization layer.
+
+Usage: python -m benchmarks.bench_serialization [--services N] [--repeat N]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from airs_common.serialization import CODECS
+
+STATUSES = ["healthy", "healthy", "healthy", "warning", "critical"]
+METRICS = [
+    ("cpu", "CPU Usage", "%"),
+    ("memory", "Memory Usage", "%"),
+    ("latency", "Latency", "ms"),
+    ("error_rate", "Error Rate", "%"),
+    ("throughput", "Throughput", "req/s"),
+]
+
+
+def _fleet_report(services: int, rng: random.Random) -> dict:
+    """A HealthChecker fleet report"""
+    reports = []
+    for index in range(services):
+        status = rng.choice(STATUSES).upper()
+        reports.append({
+            "service_id": f"S{index + 1}",
+            "service_name": f"Payment Gateway {index + 1}",
+            "overall_status": status,
+            "remediation_in_progress": False,
+            "awaiting_remediation": status == "CRITICAL",
+            "threshold_profile": "default",
+            "smoothed_status": status,
+            "history": {"samples": 12, "window_seconds": 55.0},
+            "metrics": [
+                {
+                    "name": name, "display_name": display, "value": round(rng.uniform(0, 100), 2), "unit": unit,
+                    "status": "HEALTHY", "icon": "🟢", "smoothed_value": round(rng.uniform(0, 100), 3),
+                    "smoothed_status": "HEALTHY", "p95": round(rng.uniform(0, 100), 3), "trend": "stable",
+                }
+                for name, display, unit in METRICS
+            ],
+        })
+    return {"component": "HealthChecker", "mode": "fleet", "summary": {"total_services": services}, "services": reports}
+
+
+def _service_list(services: int, rng: random.Random) -> list:
+    """A /services payload, which is also the shape ServiceLister lists"""
+    return [
+        {
+            "id": f"S{index + 1}", "name": f"Payment Gateway {index + 1}", "status": rng.choice(STATUSES),
+            "remediationInProgress": False, "awaitingRemediation": False,
+            "instanceCount": rng.randint(1, 4), "lastIncident": None,
+        }
+        for index in range(services)
+    ]
+
+
+class _OldStdlib:
+    """json.dumps/json.loads as the components called them before"""
+
+    name = "stdlib (old)"
+
+    def dumps(self, obj):
+        return json.dumps(obj)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+def _best_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--services", type=int, default=1000, help="services in each payload")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per case (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    report = _fleet_report(args.services, rng)
+    listing = _service_list(args.services, rng)
+    body = json.dumps(listing).encode()
+
+    codecs = [_OldStdlib()]
+    for cls in CODECS.values():
+        try:
+            codecs.append(cls())
+        except ImportError:
+            print(f"{cls.name}: not installed, skipped")
+
+    print(f"{args.services} services; /services payload {len(body) / 1e3:.1f} kB")
+    print(f"{'codec':<16}{'report ms':>11}{'report kB':>11}{'list ms':>10}{'parse ms':>10}{'parse MB/s':>12}")
+    for codec in codecs:
+        report_ms = _best_ms(lambda: codec.dumps(report), args.repeat)
+        report_kb = len(codec.dumps(report).encode()) / 1e3
+        list_ms = _best_ms(lambda: codec.dumps(listing), args.repeat)
+        parse_ms = _best_ms(lambda: codec.loads(body), args.repeat)
+        print(
+            f"{codec.name:<16}{report_ms:>11.2f}{report_kb:>11.1f}{list_ms:>10.2f}"
+            f"{parse_ms:>10.2f}{len(body) / 1e3 / parse_ms:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
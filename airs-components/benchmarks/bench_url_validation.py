@@ -0,0 +1,50 @@
+# benchmarks/bench_url_validation.py
+"""
+Micro-benchmark: per-call cost of backend URL validation.
+
+Compares the uncached validator (regex + urlparse + checks on every call) with
+the memoized one used by components on their hot API-call path.
+
+Usage: python -m benchmarks.bench_url_validation [--calls N]
+"""
+
+import argparse
+import timeit
+
+from airs_common.url_validation import check_backend_url, validate_backend_url
+
+URLS = [
+    "http://localhost:5000",
+    "http://airs-backend.internal:5000/",
+    "https://api.airs.example.com",
+]
+
+
+def _per_call_ns(func, calls: int) -> float:
+    """Best-of-5 average cost of one call in nanoseconds"""
+    def run():
+        for url in URLS:
+            func(url)
+
+    runs = timeit.repeat(run, number=calls, repeat=5)
+    return min(runs) / (calls * len(URLS)) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000, help="calls per URL per run")
+    args = parser.parse_args()
+
+    validate_backend_url.cache_clear()
+    uncached = _per_call_ns(check_backend_url, args.calls)
+    memoized = _per_call_ns(validate_backend_url, args.calls)
+
+    print(f"{'validator':<12}{'ns/call':>12}")
+    print(f"{'uncached':<12}{uncached:>12.1f}")
+    print(f"{'memoized':<12}{memoized:>12.1f}")
+    print(f"speedup: {uncached / memoized:.1f}x")
+    print(f"cache: {validate_backend_url.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+# benchmarks/stub_backend.py
+"""
+In-process stub of the AIRS backend for benchmarks.
+
+Serves the endpoints the components use (/api/services,
+/api/services/{id}/metrics, /api/services/{id}/logs/analysis and
+/api/services/{id}/remediate) with the same JSON shapes as airs-backend, a
+configurable fleet size and an artificial per-request latency. GET responses
+carry a weak ETag and honour If-None-Match like Express. Requests are counted
+per endpoint so benchmarks can report backend calls per tool call.
+/api/services understands the backend's filter and paging query parameters
+unless the stub is created with filters=False, which mimics an older backend.
+"""
+
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs
+
+SERVICE_NAMES = [
+    "Payment Gateway",
+    "User Auth API",
+    "Inventory Service",
+    "Reporting Engine",
+    "Search Indexer",
+    "Log Ingestion",
+]
+
+ERROR_MESSAGES = [
+    "CPU utilization exceeding thresholds",
+    "Thread pool exhaustion",
+    "OutOfMemoryError",
+    "GC overhead limit exceeded",
+    "Connection pool exhausted",
+    "Database timeout",
+    "Gateway timeout",
+    "Network latency spike",
+]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _make_service(index: int, status: str, rng: random.Random) -> dict[str, Any]:
+    """Build a service document shaped like Service.toJSON()"""
+    base_name = SERVICE_NAMES[index % len(SERVICE_NAMES)]
+    name = base_name if index < len(SERVICE_NAMES) else f"{base_name} {index + 1}"
+    critical = status == "critical"
+
+    logs = []
+    if critical:
+        for n in range(rng.randint(3, 12)):
+            logs.append({
+                "timestamp": _now(),
+                "level": rng.choice(["ERROR", "WARN"]),
+                "message": f"{rng.choice(ERROR_MESSAGES)} (request {rng.randint(1000, 9999)})",
+                "trace_id": f"trace-{index}-{n}",
+            })
+    logs.append({"timestamp": _now(), "level": "INFO", "message": f"{name} started", "trace_id": f"trace-{index}-start"})
+
+    return {
+        "id": f"S{index + 1}",
+        "name": name,
+        "status": status,
+        "metrics": {
+            "cpu": round(rng.uniform(86, 98) if critical else rng.uniform(15, 45), 2),
+            "memory": round(rng.uniform(70, 95) if critical else rng.uniform(30, 65), 2),
+            "latency": rng.randint(400, 1200) if critical else rng.randint(20, 150),
+            "error_rate": round(rng.uniform(8, 15.5) if critical else rng.uniform(0.1, 3.0), 2),
+            "throughput": rng.randint(150, 400) if critical else rng.randint(500, 1200),
+        },
+        "logs": logs[:20],
+        "remediationInProgress": False,
+        "awaitingRemediation": critical,
+        "instanceCount": rng.randint(1, 4),
+        "lastIncident": None,
+    }
+
+
+def _analyze_logs(service: dict[str, Any]) -> dict[str, Any]:
+    """Port of airs-backend services/logService.js analyzeLogs"""
+    recent_errors = [
+        log["message"] for log in service["logs"] if log["level"] in ("ERROR", "WARN")
+    ][:10]
+
+    patterns: list[str] = []
+    actions: list[str] = []
+    root_cause = "unknown"
+    rules = [
+        (("CPU", "thread", "computational"), "high_cpu_usage", ["scale_instances", "restart_service"], "high_cpu_load"),
+        (("memory", "Memory", "heap", "GC"), "memory_leak", ["restart_service", "scale_memory"], "memory_exhaustion"),
+        (("database", "Database", "connection", "transaction"), "database_connection_issues", ["restart_service", "kill_connections"], "database_bottleneck"),
+        (("timeout", "latency", "Network"), "high_latency", ["scale_instances", "clear_cache"], "network_latency"),
+    ]
+    for keywords, pattern, pattern_actions, cause in rules:
+        if any(keyword in error for error in recent_errors for keyword in keywords):
+            patterns.append(pattern)
+            actions.extend(pattern_actions)
+            root_cause = cause
+
+    if not actions:
+        actions = ["restart_service", "scale_instances"]
+        root_cause = "general_performance_issue"
+
+    return {
+        "root_cause": root_cause,
+        "patterns": list(dict.fromkeys(patterns)),
+        "suggested_actions": list(dict.fromkeys(actions)),
+        "analysis_timestamp": _now(),
+        "recent_errors": recent_errors,
+    }
+
+
+class StubBackend:
+    """Threaded stub AIRS backend listening on localhost"""
+
+    def __init__(
+        self,
+        fleet_size: int = 6,
+        latency_ms: float = 0.0,
+        critical_ratio: float = 0.3,
+        remediation_ms: float = 200.0,
+        seed: int = 42,
+        filters: bool = True,
+    ):
+        self.fleet_size = fleet_size
+        self.latency_ms = latency_ms
+        self.critical_ratio = critical_ratio
+        self.remediation_ms = remediation_ms
+        self.seed = seed
+        self.filters = filters
+        self.requests: Counter[str] = Counter()
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._services: dict[str, dict[str, Any]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Stub backend is not running")
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def reset(self) -> None:
+        """Restore the initial fleet state (same seed, same fleet)"""
+        rng = random.Random(self.seed)
+        critical_count = max(1, int(self.fleet_size * self.critical_ratio))
+        services = {}
+        for index in range(self.fleet_size):
+            status = "critical" if index < critical_count else "healthy"
+            service = _make_service(index, status, rng)
+            services[service["id"]] = service
+        with self._lock:
+            self._services = services
+
+    def critical_service_ids(self) -> list[str]:
+        with self._lock:
+            return [sid for sid, s in self._services.items() if s["status"] == "critical"]
+
+    def start(self) -> "StubBackend":
+        server = _StubServer(("127.0.0.1", 0), _make_handler(self))
+        threading.Thread(target=server.serve_forever, name="airs-stub-backend", daemon=True).start()
+        self._server = server
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubBackend":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # Request handling -------------------------------------------------
+
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    def count_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def handle_get(self, path: str, query: Optional[dict[str, list[str]]] = None) -> tuple[int, Any, dict[str, str]]:
+        parts = path.strip("/").split("/")
+        if parts == ["api", "services"]:
+            self._count("/services")
+            with self._lock:
+                services = [
+                    {key: s[key] for key in ("id", "name", "status", "remediationInProgress",
+                                             "awaitingRemediation", "instanceCount", "lastIncident")}
+                    for s in self._services.values()
+                ]
+            if self.filters and query:
+                return self._filter_services(services, query)
+            return 200, services, {}
+
+        if len(parts) >= 4 and parts[:2] == ["api", "services"]:
+            endpoint = "/" + "/".join(["services", "{id}"] + parts[3:])
+            self._count(endpoint)
+            with self._lock:
+                service = self._services.get(parts[2])
+                if service is None:
+                    return 404, {"error": "Service not found"}, {}
+                if parts[3:] == ["metrics"]:
+                    return 200, json.loads(json.dumps(service)), {}
+                if parts[3:] == ["logs", "analysis"]:
+                    return 200, _analyze_logs(service), {}
+
+        return 404, {"error": "Not found"}, {}
+
+    def _filter_services(
+        self, services: list[dict[str, Any]], query: dict[str, list[str]]
+    ) -> tuple[int, Any, dict[str, str]]:
+        """Port of the airs-backend GET /services filters and paging"""
+        status = query.get("status", [""])[0]
+        if status:
+            statuses = {s.strip() for s in status.split(",") if s.strip()}
+            services = [s for s in services if s["status"] in statuses]
+
+        remediation = query.get("remediation", [""])[0]
+        if remediation:
+            matches = {
+                "in_progress": lambda s: s["remediationInProgress"],
+                "awaiting": lambda s: s["awaitingRemediation"],
+                "none": lambda s: not s["remediationInProgress"] and not s["awaitingRemediation"],
+            }.get(remediation)
+            if matches is None:
+                return 400, {"error": f"Unknown remediation filter: {remediation}"}, {}
+            services = [s for s in services if matches(s)]
+
+        prefix = query.get("name_prefix", [""])[0].lower()
+        if prefix:
+            services = [s for s in services if s["name"].lower().startswith(prefix)]
+
+        total = len(services)
+        start = max(0, int(query.get("offset", ["0"])[0] or 0))
+        limit = query.get("limit")
+        end = start + max(0, int(limit[0] or 0)) if limit else None
+        return 200, services[start:end], {"X-Total-Count": str(total)}
+
+    def handle_post(self, path: str, body: dict[str, Any]) -> tuple[int, Any]:
+        parts = path.strip("/").split("/")
+        if len(parts) == 4 and parts[:2] == ["api", "services"] and parts[3] == "remediate":
+            self._count("/services/{id}/remediate")
+            with self._lock:
+                service = self._services.get(parts[2])
+                if service is None:
+                    return 404, {"error": "Service not found"}
+                if service["status"] != "critical" and not service["awaitingRemediation"]:
+                    return 409, {"error": "Service does not require remediation - status is not critical"}
+                if service["remediationInProgress"]:
+                    return 409, {"error": "Remediation already in progress"}
+                service["remediationInProgress"] = True
+                service["awaitingRemediation"] = False
+                service["lastIncident"] = {"timestamp": _now(), "action_taken": body.get("action")}
+
+            timer = threading.Timer(self.remediation_ms / 1000, self._complete_remediation, args=(parts[2],))
+            timer.daemon = True
+            timer.start()
+            return 200, {
+                "message": f"Remediation action '{body.get('action')}' initiated",
+                "estimated_completion": self.remediation_ms,
+                "service_status": "remediating",
+                "success_probability": 0.9,
+            }
+
+        return 404, {"error": "Not found"}
+
+    def _complete_remediation(self, service_id: str) -> None:
+        with self._lock:
+            service = self._services[service_id]
+            service["status"] = "healthy"
+            service["remediationInProgress"] = False
+            service["metrics"].update(cpu=25.0, memory=45.0, latency=60, error_rate=0.5, throughput=950)
+
+
+class _StubServer(ThreadingHTTPServer):
+    # Benchmarks open many connections at once; the default backlog of 5 stalls them
+    request_queue_size = 1024
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients that stop reading a streamed body early close the connection
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _make_handler(backend: StubBackend) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; avoid delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, payload: Any, headers: Optional[dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode()
+            # Weak ETag and conditional GET, as Express does by default
+            etag = f'W/"{len(body):x}-{hashlib.sha1(body).hexdigest()[:27]}"'
+            if self.command == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+                backend.count_not_modified()
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _delay(self) -> None:
+            if backend.latency_ms > 0:
+                time.sleep(backend.latency_ms / 1000)
+
+        def do_GET(self) -> None:
+            self._delay()
+            path, _, query = self.path.partition("?")
+            self._send(*backend.handle_get(path, parse_qs(query)))
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length) if length else b""
+            self._delay()
+            self._send(*backend.handle_post(self.path.split("?", 1)[0], json.loads(raw or b"{}")))
+
+    return Handler
@@ -0,0 +1,48 @@
+# tests/test_component_loading.py
+"""Component files must load on their own, as Langflow loads them."""
+
+import ast
+import importlib
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPONENT_FILES = sorted(
+    path
+    for directory in ("Diagnostic Tools", "Remediation Tools")
+    for path in (ROOT / directory).glob("*.py")
+    if path.name != "__init__.py"
+)
+
+
+def _imports(path):
+    return [node for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))) if isinstance(node, ast.ImportFrom)]
+
+
+def test_every_component_file_is_found():
+    assert len(COMPONENT_FILES) == 7
+
+
+@pytest.mark.parametrize("path", COMPONENT_FILES, ids=lambda path: path.name)
+def test_component_uses_no_relative_imports(path):
+    relative = [f"{'.' * node.level}{node.module or ''}" for node in _imports(path) if node.level]
+    assert relative == []
+
+
+@pytest.mark.parametrize("path", COMPONENT_FILES, ids=lambda path: path.name)
+def test_component_shared_imports_resolve(path):
+    for node in _imports(path):
+        if node.module and node.module.split(".")[0] == "airs_common":
+            module = importlib.import_module(node.module)
+            for alias in node.names:
+                assert hasattr(module, alias.name), f"{node.module}.{alias.name}"
+
+
+@pytest.mark.parametrize("path", COMPONENT_FILES, ids=lambda path: path.name)
+def test_component_file_executes_standalone(path):
+    pytest.importorskip("langflow")
+    from benchmarks._loader import load_component_file
+
+    module = load_component_file(path)
+    assert module.__name__.endswith(path.stem)
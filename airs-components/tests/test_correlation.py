@@ -0,0 +1,173 @@
+# tests/test_correlation.py
+import random
+
+import numpy as np
+import pytest
+
+from airs_common import correlation
+from airs_common.correlation import LOG_SIGNALS, _connected_groups, correlate_services, encode_signatures, jaccard_similarity
+from airs_common.thresholds import ThresholdProfiles
+
+HEALTHY_METRICS = {"cpu": 30, "memory": 40, "latency": 100, "error_rate": 1}
+
+
+def _service(service_id, patterns=(), root_cause="unknown", **metrics):
+    return {"id": service_id, "name": f"Service {service_id}", "metrics": {**HEALTHY_METRICS, **metrics}}, {
+        "root_cause": root_cause, "patterns": list(patterns),
+    }
+
+
+def _correlate(*pairs, **kwargs):
+    services, analyses = zip(*pairs) if pairs else ((), ())
+    return correlate_services(list(services), list(analyses), **kwargs)
+
+
+def test_signatures_mark_warning_breaches_and_log_patterns():
+    signals, signatures = encode_signatures(
+        [{"id": "A", "metrics": {"cpu": 70, "memory": 74.9, "latency": 900}}, {"id": "B"}],
+        [{"patterns": ["memory_leak", "unknown_pattern"]}, {}],
+    )
+    assert signals == ("metric:cpu", "metric:memory", "metric:latency", "metric:error_rate") + tuple(
+        f"log:{name}" for name in LOG_SIGNALS
+    )
+    assert [signals[i] for i in np.flatnonzero(signatures[0])] == ["metric:cpu", "metric:latency", "log:memory_leak"]
+    assert not signatures[1].any()
+    assert signatures.dtype == bool
+
+
+def test_signatures_use_each_services_threshold_profile(monkeypatch):
+    profiles = ThresholdProfiles({"services": {"A": {"thresholds": {"cpu": {"warn": 50, "crit": 60}}}}})
+    monkeypatch.setattr(correlation, "get_threshold_profiles", lambda: profiles)
+    _, signatures = encode_signatures([{"id": "A", "metrics": {"cpu": 55}}, {"id": "B", "metrics": {"cpu": 55}}], [{}, {}])
+    assert signatures[:, 0].tolist() == [True, False]
+
+
+def test_signatures_of_no_services():
+    signals, signatures = encode_signatures([], [])
+    assert signatures.shape == (0, len(signals))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_jaccard_matches_set_definition(seed):
+    rng = np.random.default_rng(seed)
+    signatures = rng.random((12, 8)) < 0.3
+    similarity = jaccard_similarity(signatures)
+    for i in range(len(signatures)):
+        for j in range(len(signatures)):
+            a, b = set(np.flatnonzero(signatures[i])), set(np.flatnonzero(signatures[j]))
+            assert similarity[i, j] == pytest.approx(len(a & b) / len(a | b) if a | b else 0.0)
+
+
+def test_jaccard_of_no_signatures():
+    assert jaccard_similarity(np.zeros((0, 4), dtype=bool)).shape == (0, 0)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_connected_groups_match_union_find(seed):
+    rng = random.Random(seed)
+    size = rng.randint(1, 15)
+    adjacency = np.eye(size, dtype=bool)
+    for _ in range(rng.randint(0, size)):
+        i, j = rng.randrange(size), rng.randrange(size)
+        adjacency[i, j] = adjacency[j, i] = True
+
+    parent = list(range(size))
+
+    def find(node):
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    for i, j in zip(*np.nonzero(adjacency)):
+        parent[find(i)] = find(j)
+    expected = {}
+    for node in range(size):
+        expected.setdefault(find(node), []).append(node)
+
+    groups = _connected_groups(adjacency)
+    assert sorted(groups) == sorted(expected.values())
+    # Groups come in order of their lowest member, each sorted
+    assert [group[0] for group in groups] == sorted(group[0] for group in groups)
+
+
+def test_shared_database_failure_is_one_group_with_high_confidence():
+    result = _correlate(
+        _service("S1", ["database_connection_issues"], "database_bottleneck", latency=600),
+        _service("S2", ["database_connection_issues"], "database_bottleneck", latency=700),
+        _service("S3", ["database_connection_issues", "high_latency"], "network_latency", latency=650),
+        _service("S4"),
+    )
+    assert result["services_analyzed"] == 4
+    assert result["anomalous_count"] == 3
+    [group] = result["correlated_groups"]
+    assert group["service_ids"] == ["S1", "S2", "S3"]
+    # latency and database signals are equally prevalent; the database cause has priority
+    assert group["likely_shared_cause"] == "shared_database_dependency"
+    assert group["confidence"] == "High"
+    assert group["shared_signals"] == ["metric:latency", "log:database_connection_issues"]
+    assert group["signal_prevalence"]["log:high_latency"] == 0.33
+    assert group["backend_root_causes"] == {"database_bottleneck": 2, "network_latency": 1}
+    assert result["isolated_anomalies"] == []
+
+
+def test_most_prevalent_signal_wins_over_priority():
+    result = _correlate(
+        _service("S1", ["high_cpu_usage"], cpu=95),
+        _service("S2", ["high_cpu_usage"], cpu=92),
+        _service("S3", ["high_cpu_usage", "database_connection_issues"], cpu=90),
+        _service("S4", ["high_cpu_usage"], cpu=91),
+    )
+    [group] = result["correlated_groups"]
+    assert group["likely_shared_cause"] == "shared_compute_saturation"
+    assert group["confidence"] == "High"
+
+
+@pytest.mark.parametrize("pairs, confidence, cause", [
+    # Two services sharing everything: too few services for High
+    ([_service("S1", cpu=95), _service("S2", cpu=95)], "Medium", "shared_compute_saturation"),
+    # The top signals are in three of four services; memory has priority over CPU
+    ([_service("S1", cpu=95, memory=95), _service("S2", cpu=95, memory=95),
+      _service("S3", cpu=95, memory=95, latency=900, error_rate=12), _service("S4", latency=900, error_rate=12)],
+     "Medium", "shared_memory_pressure"),
+    # Only two of three services share each signal
+    ([_service("S1", cpu=95, memory=95), _service("S2", memory=95, latency=900),
+      _service("S3", latency=900, error_rate=12)], "Low", "upstream_network_latency"),
+])
+def test_confidence_follows_prevalence_of_the_shared_signal(pairs, confidence, cause):
+    [group] = _correlate(*pairs, similarity_threshold=0.3)["correlated_groups"]
+    assert group["service_count"] == len(pairs)
+    assert (group["confidence"], group["likely_shared_cause"]) == (confidence, cause)
+
+
+def test_cohesion_is_the_mean_pairwise_similarity():
+    result = _correlate(
+        _service("S1", cpu=95, memory=95),
+        _service("S2", memory=95, latency=900),
+        _service("S3", latency=900, error_rate=12),
+        similarity_threshold=0.3,
+    )
+    assert result["correlated_groups"][0]["cohesion"] == round((1 / 3 + 0 + 1 / 3) / 3, 2)
+    # At the default cut-off a third of the signals in common is not enough to group
+    assert _correlate(_service("S1", cpu=95, memory=95), _service("S2", memory=95, latency=900))["correlated_groups"] == []
+
+
+def test_dissimilar_anomalies_stay_isolated_and_groups_sort_by_size():
+    result = _correlate(
+        _service("S1", cpu=95),
+        _service("S2", ["memory_leak"], "memory_exhaustion", memory=95),
+        _service("S3", ["memory_leak"], memory=95),
+        _service("S4", ["memory_leak"], memory=95),
+        _service("S5", cpu=95),
+        _service("S6", error_rate=12),
+    )
+    assert [g["service_ids"] for g in result["correlated_groups"]] == [["S2", "S3", "S4"], ["S1", "S5"]]
+    assert result["correlated_groups"][0]["likely_shared_cause"] == "shared_memory_pressure"
+    assert result["isolated_anomalies"] == [{
+        "service_id": "S6", "service_name": "Service S6", "signals": ["metric:error_rate"], "root_cause": "unknown",
+    }]
+
+
+def test_no_anomalies():
+    result = _correlate(_service("S1"), _service("S2"))
+    assert result == {"services_analyzed": 2, "anomalous_count": 0, "correlated_groups": [], "isolated_anomalies": []}
+    assert _correlate()["services_analyzed"] == 0
@@ -0,0 +1,145 @@
+# tests/test_dependency_graph.py
+import random
+from collections import deque
+
+import pytest
+
+from airs_common import dependency_graph
+from airs_common.dependency_graph import DependencyGraph, load_service_dependencies
+
+
+def _distances(graph, sources, edges):
+    """Breadth-first distances from sources along edges ("upstream" or "downstream")"""
+    adjacency = getattr(graph, edges)
+    distance = {graph.index[s]: 0 for s in sources}
+    queue = deque(distance)
+    while queue:
+        node = queue.popleft()
+        for following in adjacency[node]:
+            if following not in distance:
+                distance[following] = distance[node] + 1
+                queue.append(following)
+    return distance
+
+
+def _random_graph(rng, size):
+    services = [f"S{i}" for i in range(size)]
+    dependencies = {s: [] for s in services}
+    for _ in range(rng.randint(0, size * 2)):
+        a, b = rng.sample(services, 2)
+        dependencies[a].append(b)
+    return services, DependencyGraph(dependencies)
+
+
+def test_chain_reports_the_furthest_upstream_failure():
+    graph = DependencyGraph({"web": ["api"], "api": ["db"], "batch": ["db"], "search": []})
+    impact = graph.impact(["web", "api", "db"])
+    assert [root["service_id"] for root in impact["roots"]] == ["db"]
+    root = impact["roots"][0]
+    assert root["members"] == ["db"]
+    assert root["impacted_unhealthy"] == ["api", "web"]
+    assert root["impacted_healthy"] == ["batch"]
+    assert root["blast_radius"] == 3
+    assert impact["root_of"] == {"web": "db", "api": "db", "db": "db"}
+
+
+def test_failing_cycle_is_one_root():
+    graph = DependencyGraph({"a": ["b"], "b": ["c"], "c": ["a"], "d": ["a"]})
+    impact = graph.impact(["a", "b", "c", "d"])
+    assert len(impact["roots"]) == 1
+    assert sorted(impact["roots"][0]["members"]) == ["a", "b", "c"]
+    assert impact["roots"][0]["impacted_unhealthy"] == ["d"]
+
+
+def test_failure_behind_a_healthy_dependency_is_its_own_root():
+    graph = DependencyGraph({"web": ["api"], "api": ["db"]})
+    impact = graph.impact(["web", "db"])
+    # web's only direct dependency is healthy, so db does not explain it
+    assert {root["service_id"] for root in impact["roots"]} == {"db", "web"}
+    db = next(root for root in impact["roots"] if root["service_id"] == "db")
+    assert (db["impacted_healthy"], db["impacted_unhealthy"]) == (["api"], [])
+    assert impact["root_of"] == {"web": "web", "db": "db"}
+
+
+def test_unknown_services_are_unmapped():
+    graph = DependencyGraph({"web": ["db"]})
+    impact = graph.impact(["cache", "web"])
+    assert impact["unmapped"] == ["cache"]
+    assert [root["service_id"] for root in impact["roots"]] == ["web"]
+
+
+def test_empty_graph_and_no_failures():
+    assert DependencyGraph().impact(["S1"]) == {"roots": [], "root_of": {}, "unmapped": ["S1"]}
+    assert DependencyGraph({"a": ["b"]}).impact([]) == {"roots": [], "root_of": {}, "unmapped": []}
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_components_roots_and_attribution_match_brute_force(seed):
+    rng = random.Random(seed)
+    services, graph = _random_graph(rng, rng.randint(2, 14))
+    unhealthy = rng.sample(services, rng.randint(1, len(services)))
+    impact = graph.impact(unhealthy)
+    unhealthy_nodes = {graph.index[s] for s in unhealthy}
+
+    # Strongly connected: mutually reachable through unhealthy services only
+    def reach(service):
+        seen, stack = {graph.index[service]}, [graph.index[service]]
+        while stack:
+            for following in graph.upstream[stack.pop()]:
+                if following in unhealthy_nodes and following not in seen:
+                    seen.add(following)
+                    stack.append(following)
+        return seen
+
+    reachable = {s: {graph.services[n] for n in reach(s)} for s in unhealthy}
+    component_of = {s: frozenset(t for t in reachable[s] if s in reachable[t]) for s in unhealthy}
+    # A root component has no unhealthy dependency outside itself
+    expected_roots = {
+        component for component in component_of.values()
+        if all(
+            graph.services[d] in component
+            for member in component for d in graph.upstream[graph.index[member]] if d in unhealthy_nodes
+        )
+    }
+    assert {frozenset(root["members"]) for root in impact["roots"]} == expected_roots
+
+    # Every service downstream of a root is attributed to a nearest root
+    root_members = [member for root in impact["roots"] for member in root["members"]]
+    nearest = _distances(graph, root_members, "downstream")
+    attributed = {}
+    for root in impact["roots"]:
+        own = _distances(graph, root["members"], "downstream")
+        for service in root["impacted_unhealthy"] + root["impacted_healthy"]:
+            node = graph.index[service]
+            assert own[node] == nearest[node]
+            attributed[service] = root["service_id"]
+        assert root["blast_radius"] == len(root["impacted_unhealthy"]) + len(root["impacted_healthy"])
+    assert set(attributed) == {graph.services[n] for n in nearest} - set(root_members)
+    for service in unhealthy:
+        assert (service in impact["root_of"]) == (graph.index[service] in nearest)
+
+
+def test_deep_chain_does_not_recurse():
+    size = 20000
+    graph = DependencyGraph({f"S{i}": [f"S{i + 1}"] for i in range(size)} | {f"S{size}": ["S0"]})
+    impact = graph.impact(graph.services)
+    assert len(impact["roots"]) == 1
+    assert len(impact["roots"][0]["members"]) == size + 1
+
+
+@pytest.mark.parametrize("dependencies", [["a"], {"a": "b"}, {"a": ["a"]}])
+def test_invalid_graphs_are_rejected(dependencies):
+    with pytest.raises((TypeError, ValueError)):
+        DependencyGraph(dependencies)
+
+
+def test_load_service_dependencies_replaces_the_shared_graph():
+    previous = dependency_graph.get_dependency_graph()
+    try:
+        graph = load_service_dependencies({"web": ["db"]})
+        assert dependency_graph.get_dependency_graph() is graph
+        assert graph.dependents_of("db") == ["web"]
+        assert graph.dependencies_of("web") == ["db"]
+        assert graph.dependencies_of("missing") == []
+    finally:
+        dependency_graph._graph = previous
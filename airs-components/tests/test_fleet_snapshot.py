@@ -0,0 +1,119 @@
+# tests/test_fleet_snapshot.py
+import asyncio
+import json
+
+import pytest
+
+from airs_common.fleet_snapshot import FleetSnapshot, content_hash, get_fleet_snapshot
+from benchmarks.stub_backend import StubBackend
+
+
+def _service(service_id, status="healthy", **fields):
+    return {"id": service_id, "name": f"Service {service_id}", "status": status, "remediationInProgress": False,
+            "awaitingRemediation": False, "instanceCount": 2, **fields}
+
+
+def _apply(snapshot, services, etag=None):
+    return snapshot.apply(services, etag, content_hash(json.dumps(services).encode()))
+
+
+def test_first_apply_stamps_every_service():
+    snapshot = FleetSnapshot()
+    assert _apply(snapshot, [_service("S1"), _service("S2")])
+    assert snapshot.version == 1
+    changed, removed = snapshot.changes_since(0)
+    assert [s["id"] for s in changed] == ["S1", "S2"]
+    assert removed == []
+
+
+def test_only_tracked_field_changes_bump_the_version():
+    snapshot = FleetSnapshot()
+    _apply(snapshot, [_service("S1"), _service("S2")])
+    assert not _apply(snapshot, [_service("S1", instanceCount=5), _service("S2")])
+    assert snapshot.version == 1
+
+    assert _apply(snapshot, [_service("S1", "critical"), _service("S2", awaitingRemediation=True)])
+    assert snapshot.version == 2
+    changed, _ = snapshot.changes_since(1)
+    assert [s["id"] for s in changed] == ["S1", "S2"]
+    assert snapshot.changes_since(2) == ([], [])
+
+
+def test_removed_and_returning_services():
+    snapshot = FleetSnapshot()
+    _apply(snapshot, [_service("S1"), _service("S2")])
+    _apply(snapshot, [_service("S1")])
+    assert snapshot.changes_since(1) == ([], ["S2"])
+
+    _apply(snapshot, [_service("S1"), _service("S2")])
+    changed, removed = snapshot.changes_since(2)
+    assert [s["id"] for s in changed] == ["S2"]
+    assert removed == []
+
+
+def test_invalid_entries_are_ignored():
+    snapshot = FleetSnapshot()
+    _apply(snapshot, [_service("S1"), {"name": "no id"}, "junk"])
+    changed, _ = snapshot.changes_since(0)
+    assert [s["id"] for s in changed] == ["S1"]
+
+
+def test_cursor_round_trip_and_rejection():
+    snapshot = FleetSnapshot()
+    _apply(snapshot, [_service("S1")])
+    assert snapshot.parse_cursor(snapshot.cursor) == 1
+    assert snapshot.parse_cursor(f"{snapshot.epoch}-0") == 0
+    # Ahead of the snapshot, from another process, or malformed
+    assert snapshot.parse_cursor(f"{snapshot.epoch}-2") is None
+    assert snapshot.parse_cursor(f"{FleetSnapshot().epoch}-1") is None
+    assert snapshot.parse_cursor("garbage") is None
+
+
+def test_unchanged_payload_by_etag_or_hash():
+    snapshot = FleetSnapshot()
+    assert not snapshot.is_unchanged('"v1"', "h1")
+    snapshot.apply([_service("S1")], '"v1"', "h1")
+    assert snapshot.is_unchanged(None, "h1")
+    assert snapshot.is_unchanged('"v1"', "other")
+    assert not snapshot.is_unchanged('"v2"', "h2")
+
+
+def test_snapshots_are_shared_per_backend():
+    assert get_fleet_snapshot("http://fleet-a") is get_fleet_snapshot("http://fleet-a")
+    assert get_fleet_snapshot("http://fleet-a") is not get_fleet_snapshot("http://fleet-b")
+
+
+def _overview(backend, **inputs):
+    from benchmarks._loader import load_components
+
+    component = load_components()["ServiceLister"]()
+    component.set(backend_url=backend.url, **inputs)
+    return json.loads(asyncio.run(component.get_services_overview_async()).text)
+
+
+def test_service_lister_polls_with_etag_and_serves_deltas():
+    pytest.importorskip("langflow")
+    with StubBackend(fleet_size=6) as backend:
+        first = _overview(backend)
+        assert first["summary"]["total_services"] == 6
+        assert not first["payload_unchanged"]
+
+        # Unchanged fleet: the backend answers 304 and nothing is re-parsed
+        second = _overview(backend)
+        assert second["payload_unchanged"]
+        assert second["cursor"] == first["cursor"]
+        assert backend.not_modified == 1
+
+        with backend._lock:
+            service_id = next(iter(backend._services))
+            backend._services[service_id]["status"] = "warning"
+        delta = _overview(backend, since_cursor=first["cursor"])
+        assert delta["mode"] == "delta"
+        assert [s["id"] for s in delta["changed_services"]] == [service_id]
+        assert delta["cursor"] != first["cursor"]
+
+        unchanged = _overview(backend, since_cursor=delta["cursor"])
+        assert unchanged["unchanged"] and unchanged["changed_services"] == []
+
+        expired = _overview(backend, since_cursor="0000-1")
+        assert expired["cursor_expired"] and len(expired["services"]) == 6
@@ -0,0 +1,117 @@
+# tests/test_json_stream.py
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from airs_common import json_stream
+from airs_common.json_stream import (
+    LOG_ANALYSIS_FIELDS, FieldExtractor, extract_fields, fields_cache_key, project_fields, read_fields,
+)
+
+DOCUMENT = {
+    "root_cause": "database_bottleneck",
+    "skipped": {"nested": [1, {"a": "b]}"}, "x\\\"y"], "n": -1.5e3},
+    "patterns": ["database_connection_issues"],
+    "suggested_actions": ["restart_service", "kill_connections"],
+    "analysis_timestamp": "2024-05-01T12:00:00.000Z",
+    "recent_errors": ["Database connection pool exhausted", "Ünïcödé ✓ error", "third", "fourth", "fifth"],
+}
+BODY = json.dumps(DOCUMENT, ensure_ascii=False, indent=1).encode()
+EXPECTED = project_fields(DOCUMENT, LOG_ANALYSIS_FIELDS)
+
+
+def _feed_in(chunks):
+    extractor = FieldExtractor(LOG_ANALYSIS_FIELDS)
+    for chunk in chunks:
+        if extractor.feed(chunk):
+            break
+    return extractor.close()
+
+
+def test_whole_body_matches_json_loads():
+    assert extract_fields(BODY, LOG_ANALYSIS_FIELDS) == EXPECTED
+    assert EXPECTED["recent_errors"] == DOCUMENT["recent_errors"][:3]
+
+
+def test_every_two_way_split_matches_json_loads():
+    # Splits land inside keys, strings, escapes, numbers and multi-byte characters
+    for split in range(len(BODY) + 1):
+        assert _feed_in([BODY[:split], BODY[split:]]) == EXPECTED, split
+
+
+def test_one_byte_chunks_match_json_loads():
+    assert _feed_in([BODY[i:i + 1] for i in range(len(BODY))]) == EXPECTED
+
+
+def test_number_split_across_chunks_is_not_cut_short():
+    body = b'{"a": 12345, "b": true}'
+    for split in range(len(body) + 1):
+        extractor = FieldExtractor({"a": None, "b": None})
+        extractor.feed(body[:split])
+        extractor.feed(body[split:])
+        assert extractor.close() == {"a": 12345, "b": True}
+
+
+def test_stops_reading_once_fields_are_complete():
+    errors = [f"error {i}" for i in range(10000)]
+    body = json.dumps({"root_cause": "x", "patterns": [], "suggested_actions": [], "recent_errors": errors}).encode()
+    extractor = FieldExtractor(LOG_ANALYSIS_FIELDS)
+    chunks = [body[i:i + 1024] for i in range(0, len(body), 1024)]
+    consumed = 0
+    for chunk in chunks:
+        consumed += 1
+        if extractor.feed(chunk):
+            break
+    assert extractor.close()["recent_errors"] == errors[:3]
+    assert consumed == 1 < len(chunks)
+
+
+def test_missing_fields_are_absent():
+    assert extract_fields(b'{"root_cause": "x"}', LOG_ANALYSIS_FIELDS) == {"root_cause": "x"}
+
+
+@pytest.mark.parametrize("body", [b'{"root_cause": "x", "patterns": [', b'[1, 2]', b'{"root_cause" "x"}'])
+def test_truncated_or_invalid_documents_raise_value_error(body):
+    with pytest.raises(ValueError):
+        extract_fields(body, LOG_ANALYSIS_FIELDS)
+
+
+def test_cache_key_names_the_selection():
+    assert fields_cache_key("http://b/x", {"a": None, "b": 3}) == "http://b/x#fields=a,b:3"
+
+
+def _streamed_response(body: bytes, chunk_size: int, consumed: list) -> httpx.Response:
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            consumed.append(start)
+            yield body[start:start + chunk_size]
+
+    # No Content-Length, so read_fields streams
+    return httpx.Response(200, content=chunks())
+
+
+def test_read_fields_streams_when_fields_come_first():
+    errors = [f"error {i}" for i in range(50000)]
+    body = json.dumps({"root_cause": "x", "patterns": [], "suggested_actions": [], "recent_errors": errors}).encode()
+    consumed = []
+    result = asyncio.run(read_fields(_streamed_response(body, 64 * 1024, consumed), LOG_ANALYSIS_FIELDS))
+    assert result["recent_errors"] == errors[:3]
+    assert len(consumed) == 1
+
+
+def test_read_fields_decodes_whole_body_when_fields_come_last(monkeypatch):
+    monkeypatch.setattr(json_stream, "STREAM_FALLBACK_BYTES", 4096)
+    logs = [{"level": "ERROR", "message": f"failure {i}"} for i in range(5000)]
+    document = {"logs": logs, "root_cause": "x", "patterns": ["p"], "suggested_actions": ["a"], "recent_errors": ["e"]}
+    body = json.dumps(document).encode()
+    consumed = []
+    result = asyncio.run(read_fields(_streamed_response(body, 1024, consumed), LOG_ANALYSIS_FIELDS))
+    assert result == project_fields(document, LOG_ANALYSIS_FIELDS)
+    assert len(consumed) == -(-len(body) // 1024)
+
+
+def test_read_fields_decodes_small_bodies_whole():
+    response = httpx.Response(200, content=BODY)
+    assert asyncio.run(read_fields(response, LOG_ANALYSIS_FIELDS)) == EXPECTED
@@ -0,0 +1,122 @@
+# tests/test_keyword_classifier.py
+import random
+
+import numpy as np
+import pytest
+
+from airs_common import log_analysis
+from airs_common.keyword_classifier import KeywordClassifier
+from airs_common.log_analysis import LOG_RULES, analyze_logs, load_log_categories
+
+BUILT_IN = {pattern: list(keywords) for keywords, pattern, _, _ in LOG_RULES}
+
+
+def _overlapping_count(text: str, keyword: str) -> int:
+    count = 0
+    position = text.find(keyword)
+    while position != -1:
+        count += 1
+        position = text.find(keyword, position + 1)
+    return count
+
+
+def _reference_count(categories, messages):
+    """One search per keyword per message, counting overlapping occurrences"""
+    return {
+        name: sum(_overlapping_count(message, keyword) for message in messages for keyword in set(keywords))
+        for name, keywords in categories.items()
+    }
+
+
+def _random_messages(rng: random.Random, count: int, alphabet: str, keywords: list[str]) -> list[str]:
+    messages = []
+    for _ in range(count):
+        parts = [
+            rng.choice(keywords) if rng.random() < 0.3 else "".join(rng.choices(alphabet, k=rng.randint(0, 6)))
+            for _ in range(rng.randint(0, 8))
+        ]
+        messages.append("".join(parts))
+    return messages
+
+
+@pytest.fixture(autouse=True)
+def _restore_categories():
+    yield
+    load_log_categories(None)
+
+
+def test_counts_match_per_keyword_search_on_built_in_rules():
+    rng = random.Random(7)
+    keywords = [keyword for values in BUILT_IN.values() for keyword in values]
+    messages = _random_messages(rng, 500, "abcdeMNory GC", keywords)
+    assert KeywordClassifier(BUILT_IN).count(messages) == _reference_count(BUILT_IN, messages)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_counts_match_per_keyword_search_with_overlapping_keywords(seed):
+    rng = random.Random(seed)
+    # Small alphabet so keywords overlap, nest and repeat inside each other
+    categories = {
+        f"c{index}": ["".join(rng.choices("ab", k=rng.randint(1, 4))) for _ in range(rng.randint(1, 3))]
+        for index in range(4)
+    }
+    keywords = [keyword for values in categories.values() for keyword in values]
+    messages = _random_messages(rng, 30, "abc", keywords)
+    assert KeywordClassifier(categories).count(messages) == _reference_count(categories, messages)
+
+
+def test_nonzero_counts_match_the_pre_classifier_any_check():
+    rng = random.Random(3)
+    keywords = [keyword for values in BUILT_IN.values() for keyword in values]
+    classifier = KeywordClassifier(BUILT_IN)
+    for _ in range(200):
+        errors = _random_messages(rng, rng.randint(0, 4), "abcdeMNory GC", keywords)
+        counts = classifier.count(errors)
+        for keywords_of, pattern, _, _ in LOG_RULES:
+            assert (counts[pattern] > 0) == any(keyword in error for error in errors for keyword in keywords_of)
+
+
+def test_keywords_do_not_match_across_messages():
+    classifier = KeywordClassifier({"memory": ["memory"]})
+    assert classifier.count(["mem", "ory"]) == {"memory": 0}
+
+
+def test_count_matrix_rows_match_per_group_counts():
+    rng = random.Random(11)
+    keywords = [keyword for values in BUILT_IN.values() for keyword in values]
+    groups = [_random_messages(rng, rng.randint(0, 20), "abcdeMNory GC", keywords) for _ in range(15)]
+    classifier = KeywordClassifier(BUILT_IN)
+    expected = np.array([list(classifier.count(group).values()) for group in groups])
+    np.testing.assert_array_equal(classifier.count_matrix(groups), expected)
+
+
+def test_keyword_shared_by_categories_counts_for_each():
+    classifier = KeywordClassifier({"a": ["timeout"], "b": ["timeout", "out"]})
+    assert classifier.count(["timeout"]) == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize("categories", [{"a": "memory"}, {"a": [""]}, {"a": ["x\ny"]}, {"a": [3]}])
+def test_invalid_keywords_are_rejected(categories):
+    with pytest.raises((TypeError, ValueError)):
+        KeywordClassifier(categories)
+
+
+def test_empty_classifier_counts_nothing():
+    assert KeywordClassifier({"a": []}).count(["anything"]) == {"a": 0}
+
+
+def test_user_categories_do_not_change_rule_matching():
+    logs = [{"level": "ERROR", "message": "disk quota exceeded on volume"}]
+    baseline = analyze_logs(logs)
+    load_log_categories({"disk": ["disk", "quota"]})
+    analysis = analyze_logs(logs)
+    assert analysis["category_counts"]["disk"] == 2
+    for key in ("root_cause", "patterns", "suggested_actions", "recent_errors"):
+        assert analysis[key] == baseline[key]
+
+
+def test_user_category_may_not_extend_a_built_in_pattern():
+    with pytest.raises(ValueError):
+        load_log_categories({"memory_leak": ["disk"]})
+    # The failed load leaves the installed classifier untouched
+    assert log_analysis.get_log_classifier().categories == tuple(BUILT_IN)
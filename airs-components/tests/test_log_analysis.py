@@ -0,0 +1,84 @@
+# tests/test_log_analysis.py
+import json
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from airs_common.log_analysis import LOG_RULES, analyze_logs, recent_errors
+
+LOG_SERVICE = Path(__file__).resolve().parents[2] / "airs-backend" / "services" / "logService.js"
+
+WORDS = ["request", "failed", "retry", "pool", "worker", "slow", "upstream", "cpu", "Heap", "network"]
+KEYWORDS = [keyword for keywords, _, _, _ in LOG_RULES for keyword in keywords]
+
+
+def _random_logs(rng: random.Random) -> list[dict]:
+    logs = []
+    for n in range(rng.randint(0, 30)):
+        words = rng.choices(WORDS, k=rng.randint(1, 6))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(KEYWORDS))
+        logs.append({
+            "timestamp": f"2024-05-01T12:{n:02d}:00.000Z",
+            "level": rng.choice(["ERROR", "WARN", "INFO", "DEBUG", "error"]),
+            "message": " ".join(words),
+            "trace_id": f"trace-{n}",
+        })
+    return logs
+
+
+def _comparable(analysis: dict) -> dict:
+    return {key: value for key, value in analysis.items() if key not in ("analysis_timestamp", "category_counts")}
+
+
+@pytest.mark.parametrize("messages, root_cause, patterns, actions", [
+    ([], "general_performance_issue", [], ["restart_service", "scale_instances"]),
+    (["disk full"], "general_performance_issue", [], ["restart_service", "scale_instances"]),
+    (["CPU at 99%"], "high_cpu_load", ["high_cpu_usage"], ["scale_instances", "restart_service"]),
+    (["cpu at 99%"], "general_performance_issue", [], ["restart_service", "scale_instances"]),
+    (["GC pause", "Database connection refused"], "database_bottleneck",
+     ["memory_leak", "database_connection_issues"], ["restart_service", "scale_memory", "kill_connections"]),
+    (["thread pool full", "request timeout"], "network_latency",
+     ["high_cpu_usage", "high_latency"], ["scale_instances", "restart_service", "clear_cache"]),
+])
+def test_rules_match_log_service(messages, root_cause, patterns, actions):
+    analysis = analyze_logs([{"level": "ERROR", "message": message} for message in messages])
+    assert analysis["root_cause"] == root_cause
+    assert analysis["patterns"] == patterns
+    assert analysis["suggested_actions"] == actions
+    assert analysis["recent_errors"] == messages
+
+
+def test_only_the_first_ten_errors_drive_the_rules():
+    logs = [{"level": "WARN", "message": f"retry {n}"} for n in range(10)] + [{"level": "ERROR", "message": "heap"}]
+    analysis = analyze_logs(logs)
+    assert analysis["root_cause"] == "general_performance_issue"
+    assert len(analysis["recent_errors"]) == 10
+    # Category counts still cover every error message
+    assert analysis["category_counts"]["memory_leak"] == 1
+
+
+def test_recent_errors_skips_other_levels_and_bad_entries():
+    logs = [{"level": "INFO", "message": "ok"}, "junk", {"level": "WARN", "message": "slow"}, {"level": "ERROR"}]
+    assert recent_errors(logs) == ["slow", ""]
+    assert recent_errors(logs, 1) == ["slow"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None or not LOG_SERVICE.exists(), reason="needs node and airs-backend")
+def test_random_logs_match_backend_analyze_logs():
+    rng = random.Random(21)
+    cases = [_random_logs(rng) for _ in range(300)]
+    script = (
+        f"const {{ analyzeLogs }} = require({json.dumps(str(LOG_SERVICE))});"
+        "const cases = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+        "process.stdout.write(JSON.stringify(cases.map(logs => analyzeLogs({ logs }))));"
+    )
+    output = subprocess.run(["node", "-e", script], input=json.dumps(cases), capture_output=True, text=True, check=True)
+    expected = json.loads(output.stdout)
+    for logs, backend in zip(cases, expected):
+        analysis = analyze_logs(logs)
+        assert _comparable(analysis) == _comparable(backend), logs
+        assert list(analysis)[:5] == list(backend)
@@ -0,0 +1,112 @@
+# tests/test_log_templates.py
+from airs_common.log_templates import (
+    WILDCARD, LogTemplateStore, TemplateMiner, distinct_messages, mask_message,
+)
+
+
+def _log(n, message, level="ERROR"):
+    return {
+        "timestamp": f"2024-05-01T12:00:{n:02d}.000Z",
+        "level": level,
+        "message": message,
+        "trace_id": f"trace-{n}",
+    }
+
+
+def _newest_first(entries):
+    return list(reversed(entries))
+
+
+def test_mask_message_replaces_variable_parts():
+    tokens = mask_message("Timeout after 3000ms from 10.0.0.12:5432 req 550e8400-e29b-41d4-a716-446655440000")
+    assert tokens == ["Timeout", "after", f"{WILDCARD}ms", "from", WILDCARD, "req", WILDCARD]
+
+
+def test_distinct_messages_keeps_first_of_each_masked_form():
+    messages = ["pool exhausted after 30 ms", "pool exhausted after 45 ms", "disk full", "pool exhausted after 9 ms"]
+    assert distinct_messages(messages) == ["pool exhausted after 30 ms", "disk full"]
+    assert distinct_messages(messages, 1) == ["pool exhausted after 30 ms"]
+
+
+def test_similar_messages_share_a_template():
+    miner = TemplateMiner()
+    miner.add("User alice failed login from gateway", "t1", "ERROR")
+    miner.add("User bob failed login from gateway", "t2", "ERROR")
+    miner.add("Disk quota exceeded on volume", "t3", "WARN")
+    templates = miner.templates()
+    assert [t.template for t in templates] == [f"User {WILDCARD} failed login from gateway", "Disk quota exceeded on volume"]
+    assert templates[0].count == 2
+    assert (templates[0].first_seen, templates[0].last_seen) == ("t1", "t2")
+
+
+def test_update_mines_only_new_error_entries():
+    miner = TemplateMiner()
+    entries = [_log(1, "Connection refused by db 1"), _log(2, "started", "INFO"), _log(3, "Connection refused by db 2")]
+    assert miner.update(_newest_first(entries)) == 3
+    assert miner.lines_mined == 2
+
+    entries.append(_log(4, "Connection refused by db 3"))
+    assert miner.update(_newest_first(entries)) == 1
+    assert miner.update(_newest_first(entries)) == 0
+    assert miner.summary()["templates"][0]["count"] == 3
+
+
+def test_more_new_entries_than_the_window_are_not_a_reset():
+    miner = TemplateMiner()
+    entries = [_log(n, f"Connection refused by db {n}") for n in range(5)]
+    miner.update(_newest_first(entries))
+    # Five newer entries push every processed one out of a five-entry window
+    later = [_log(n, f"Connection refused by db {n}") for n in range(5, 10)]
+    assert miner.update(_newest_first(later)) == 5
+    assert miner.summary()["templates"][0]["count"] == 10
+
+
+def test_reset_log_source_starts_over():
+    miner = TemplateMiner()
+    entries = [_log(n, f"Connection refused by db {n}") for n in range(10)]
+    miner.update(_newest_first(entries))
+    assert miner.lines_mined == 10
+
+    # POST /services/reset clears the logs and leaves one INFO entry
+    after_reset = [_log(30, "Service reset to healthy state", "INFO"), _log(31, "Connection refused by db 99")]
+    assert miner.update(_newest_first(after_reset)) == 2
+    summary = miner.summary()
+    assert summary["lines_mined"] == 1
+    assert summary["templates"][0]["count"] == 1
+
+
+def test_older_newest_entry_means_a_different_log_source():
+    miner = TemplateMiner()
+    miner.update(_newest_first([_log(n, f"Connection refused by db {n}") for n in range(40, 45)]))
+    # A restarted backend with a clock behind the old one
+    assert miner.update(_newest_first([_log(n, f"Connection refused by db {n}") for n in range(10, 16)])) == 6
+    assert miner.summary()["lines_mined"] == 6
+
+
+def test_eviction_drops_least_recent_template_and_empty_buckets():
+    miner = TemplateMiner(max_templates=2)
+    miner.add("alpha failed", "t1")
+    miner.add("beta one two", "t2")
+    miner.add("gamma one two three", "t3")
+    assert [t.template for t in miner.templates()] == ["gamma one two three", "beta one two"]
+    assert len(miner._buckets) == 2
+    assert all(miner._buckets.values())
+
+
+def test_eviction_from_the_bucket_being_mined():
+    miner = TemplateMiner(max_templates=1)
+    miner.add("alpha failed hard", "t1")
+    miner.add("alpha went away", "t2")
+    assert [t.template for t in miner.templates()] == ["alpha went away"]
+    assert miner.add("alpha went away", "t3").count == 2
+
+
+def test_store_tracks_services_separately_with_lru_eviction():
+    store = LogTemplateStore(max_services=2)
+    store.update("http://b", "S1", [_log(1, "S1 failure")])
+    store.update("http://b", "S2", [_log(1, "S2 failure")])
+    assert store.update("http://b", "S1", [_log(1, "S1 failure")])["new_lines"] == 0
+    store.update("http://b", "S3", [_log(1, "S3 failure")])
+    # S2 was least recently used, so it starts over
+    assert store.update("http://b", "S2", [_log(1, "S2 failure")])["new_lines"] == 1
+    assert store.update("http://b", "S1", [_log(1, "S1 failure")])["new_lines"] == 1
@@ -0,0 +1,121 @@
+# tests/test_metric_history.py
+import asyncio
+import random
+
+import numpy as np
+import pytest
+
+from airs_common.metric_history import MetricHistory, MetricHistoryStore, metric_history, record_metrics_response
+
+
+def _fill(history, samples, start=0.0):
+    for offset, metrics in enumerate(samples):
+        history.append(metrics, start + offset * 10.0)
+
+
+def _reference(samples, metric):
+    """Statistics of the last window's values of one metric, computed from scratch"""
+    values = np.array([s.get(metric, np.nan) for s in samples], dtype=float)
+    times = np.arange(len(samples), dtype=float) * 10.0
+    present = ~np.isnan(values)
+    slope = np.polyfit(times[present], values[present], 1)[0] if present.sum() >= 2 else None
+    return float(np.mean(values[present])), float(np.percentile(values[present], 95)), slope
+
+
+def test_empty_history_has_no_metrics():
+    assert MetricHistory(5).summary() == {"samples": 0, "window_seconds": 0.0, "metrics": {}}
+
+
+def test_ring_buffer_keeps_only_the_last_window():
+    history = MetricHistory(size=4)
+    _fill(history, [{"cpu": value} for value in (100, 100, 10, 20, 30, 40)])
+    summary = history.summary()
+    assert summary["samples"] == 4
+    assert summary["window_seconds"] == 30.0
+    assert summary["metrics"]["cpu"]["smoothed"] == 25.0
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 16])
+def test_running_statistics_match_recomputation_over_the_window(size):
+    rng = random.Random(size)
+    history = MetricHistory(size=size)
+    samples = []
+    for step in range(5 * size + 3):
+        sample = {"cpu": round(rng.uniform(0, 100), 2), "latency": rng.choice([120, 120, 300, 450])}
+        if rng.random() < 0.2:
+            del sample["latency"]
+        samples.append(sample)
+        history.append(sample, step * 10.0)
+
+        window = samples[-size:]
+        summary = history.summary()
+        for metric in ("cpu", "latency"):
+            if not any(metric in s for s in window):
+                assert metric not in summary["metrics"]
+                continue
+            mean, p95, slope = _reference(window, metric)
+            stats = summary["metrics"][metric]
+            assert stats["smoothed"] == pytest.approx(mean, abs=1e-3)
+            assert stats["p95"] == pytest.approx(p95, abs=1e-3)
+            if slope is None:
+                assert stats["slope_per_minute"] is None
+            else:
+                assert stats["slope_per_minute"] == pytest.approx(slope * 60, abs=1e-2)
+
+
+def test_trend_direction():
+    history = MetricHistory(size=10)
+    _fill(history, [{"cpu": 40 + 5 * i, "memory": 60 - 4 * i, "latency": 200 + (i % 2)} for i in range(10)])
+    metrics = history.summary()["metrics"]
+    assert metrics["cpu"]["trend"] == "rising"
+    assert metrics["memory"]["trend"] == "falling"
+    assert metrics["latency"]["trend"] == "stable"
+
+
+def test_single_sample_trend_is_unknown():
+    history = MetricHistory(size=10)
+    history.append({"cpu": 50}, 0.0)
+    assert history.summary()["metrics"]["cpu"]["trend"] == "unknown"
+
+
+def test_non_numeric_values_are_ignored():
+    history = MetricHistory(size=3)
+    _fill(history, [{"cpu": "n/a"}, {"cpu": 10}, {"cpu": None}, {"cpu": 30}])
+    assert history.summary()["metrics"]["cpu"]["smoothed"] == 20.0
+
+
+def test_store_evicts_least_recently_used_service():
+    store = MetricHistoryStore(size=5, max_services=2)
+    store.record("http://b", "S1", {"cpu": 1}, 0.0)
+    store.record("http://b", "S2", {"cpu": 2}, 0.0)
+    store.record("http://b", "S1", {"cpu": 3}, 10.0)
+    store.record("http://b", "S3", {"cpu": 4}, 0.0)
+    assert store.summary("http://b", "S2") is None
+    assert store.summary("http://b", "S1")["samples"] == 2
+    assert store.summary("http://other", "S1") is None
+
+
+def test_record_metrics_response_only_records_metrics_documents():
+    metric_history.clear()
+    try:
+        record_metrics_response("http://b", "/services/S1/metrics", {"metrics": {"cpu": 50}})
+        record_metrics_response("http://b", "/services/S1/logs/analysis", {"metrics": {"cpu": 99}})
+        record_metrics_response("http://b", "/services/S2/metrics", {"error": "not found"})
+        assert metric_history.summary("http://b", "S1")["samples"] == 1
+        assert metric_history.summary("http://b", "S2") is None
+    finally:
+        metric_history.clear()
+
+
+def test_cached_reads_are_not_recorded():
+    pytest.importorskip("langflow")
+    from benchmarks._loader import load_components
+    from benchmarks.stub_backend import StubBackend
+
+    with StubBackend(fleet_size=2) as backend:
+        component = load_components()["HealthChecker"]()
+        component.set(backend_url=backend.url, service_input="Check health of S1")
+        for _ in range(5):
+            asyncio.run(component.get_health_report_async())
+        assert backend.requests["/services/{id}/metrics"] == 1
+        assert metric_history.summary(component._validate_backend_url(backend.url), "S1")["samples"] == 1
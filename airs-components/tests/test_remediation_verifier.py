@@ -0,0 +1,115 @@
+# tests/test_remediation_verifier.py
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from benchmarks.stub_backend import StubBackend
+
+pytest.importorskip("langflow")
+from benchmarks._loader import load_components  # noqa: E402
+
+
+@pytest.fixture
+def verifier(monkeypatch):
+    """A RemediationVerifier with a short backoff schedule whose sleeps are recorded"""
+    cls = load_components()["RemediationVerifier"]
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        await asyncio.sleep(seconds)
+
+    monkeypatch.setattr(sys.modules[cls.__module__], "asyncio", SimpleNamespace(sleep=sleep))
+    component = cls()
+    component.initial_poll_interval = 0.05
+    component.max_poll_interval = 0.2
+    component.sleeps = sleeps
+    return component
+
+
+def _remediate(backend, service_id, action="restart_service"):
+    response = httpx.post(f"{backend.url}/api/services/{service_id}/remediate", json={"action": action})
+    response.raise_for_status()
+
+
+def _verify(component, backend, request, **inputs):
+    component.set(backend_url=backend.url, verification_request=request, **inputs)
+    return json.loads(asyncio.run(component.verify_remediation_success_async()).text)
+
+
+def _assert_backoff(sleeps, initial, ceiling):
+    # Doubling up to the ceiling; only the last sleep may be cut short by the deadline
+    expected = [min(initial * 2 ** n, ceiling) for n in range(len(sleeps))]
+    assert sleeps[:-1] == pytest.approx(expected[:-1])
+    assert sleeps[-1] <= expected[-1] + 1e-9
+
+
+def test_polls_with_backoff_until_remediation_completes(verifier):
+    with StubBackend(fleet_size=3, remediation_ms=600) as backend:
+        _remediate(backend, "S1")
+        result = _verify(verifier, backend, "Wait until S1 recovers (estimated_completion_ms: 600)")
+    convergence = result["convergence"]
+    assert result["remediation_success"] is True
+    assert result["remediation_in_progress"] is False
+    assert convergence["converged"] is True
+    assert convergence["wait_deadline_seconds"] == 1.2
+    assert convergence["polls"] == len(verifier.sleeps) + 1 > 2
+    assert 0.5 <= convergence["time_to_recovery_seconds"] == convergence["elapsed_seconds"] < 1.2
+    _assert_backoff(verifier.sleeps, 0.05, 0.2)
+
+
+def test_stops_at_the_deadline_capped_by_max_wait(verifier):
+    with StubBackend(fleet_size=3, remediation_ms=5000) as backend:
+        _remediate(backend, "S1")
+        result = _verify(verifier, backend, "Wait until S1 recovers (estimated_completion_ms: 5000)", max_wait_seconds=1)
+    convergence = result["convergence"]
+    assert result["remediation_success"] is False
+    assert result["remediation_in_progress"] is True
+    assert convergence["converged"] is False
+    assert convergence["wait_deadline_seconds"] == 1.0
+    assert 1.0 <= convergence["elapsed_seconds"] < 1.5
+    assert convergence["time_to_recovery_seconds"] is None
+    assert sum(verifier.sleeps) == pytest.approx(1.0, abs=0.1)
+    _assert_backoff(verifier.sleeps, 0.05, 0.2)
+
+
+def test_returns_at_once_when_no_remediation_is_running(verifier):
+    with StubBackend(fleet_size=3) as backend:
+        # S1 is critical but nothing is remediating it, so there is nothing to wait for
+        critical = _verify(verifier, backend, "Wait until S1 recovers")
+        healthy = _verify(verifier, backend, "Wait until S3 recovers")
+    assert critical["remediation_success"] is False
+    assert critical["convergence"]["converged"] is True
+    assert critical["convergence"]["time_to_recovery_seconds"] is None
+    assert healthy["remediation_success"] is True
+    assert healthy["convergence"]["time_to_recovery_seconds"] == healthy["convergence"]["elapsed_seconds"]
+    assert (critical["convergence"]["polls"], healthy["convergence"]["polls"]) == (1, 1)
+    assert verifier.sleeps == []
+
+
+def test_single_snapshot_without_wait(verifier):
+    with StubBackend(fleet_size=3, remediation_ms=5000) as backend:
+        _remediate(backend, "S1")
+        result = _verify(verifier, backend, "Verify remediation for S1")
+    assert "convergence" not in result
+    assert result["remediation_in_progress"] is True
+    assert verifier.sleeps == []
+
+
+@pytest.mark.parametrize("request_text, last_action, expected", [
+    ("wait for S1 (estimated_completion_ms: 4000)", None, 8.0),
+    ('wait for S1 {"estimated_completion_ms": 1500}', "scale_instances", 3.0),
+    ("wait for S1, estimated_completion_ms=2500", None, 5.0),
+    # Other millisecond values in the request are not completion estimates
+    ("wait until S1 latency is under 300ms", "clear_cache", 6.0),
+    ("wait until S1 latency is under 300 ms", None, 10.0),
+    ("wait for S1 (estimated_completion_ms: 900000)", None, 60.0),
+])
+def test_wait_deadline(verifier, request_text, last_action, expected):
+    verifier.set(max_wait_seconds=60)
+    service_data = {"lastIncident": {"action_taken": last_action} if last_action else None}
+    assert verifier._get_wait_deadline_seconds(request_text, service_data) == expected
@@ -0,0 +1,109 @@
+# tests/test_response_cache.py
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from airs_common.response_cache import MISSING, ResponseCache
+
+# The package exports the shared cache instance under the module's name
+response_cache_module = importlib.import_module("airs_common.response_cache")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(response_cache_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_miss_then_hit(clock):
+    cache = ResponseCache(ttl_seconds=5, max_entries=4)
+    assert cache.get("a") is MISSING
+    cache.set("a", {"cpu": 1})
+    assert cache.get("a") == {"cpu": 1}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_none_is_a_cacheable_value(clock):
+    cache = ResponseCache(ttl_seconds=5, max_entries=4)
+    cache.set("a", None)
+    assert cache.get("a") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl_seconds=5, max_entries=4)
+    cache.set("a", 1)
+    clock.now += 4.9
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is MISSING
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_ttl_disables_caching(clock):
+    cache = ResponseCache(ttl_seconds=0, max_entries=4)
+    cache.set("a", 1)
+    assert cache.get("a") is MISSING
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(ttl_seconds=5, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_overwriting_refreshes_ttl_and_recency(clock):
+    cache = ResponseCache(ttl_seconds=5, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    clock.now += 4
+    cache.set("a", 10)
+    cache.set("c", 3)
+    clock.now += 4
+    assert cache.get("a") == 10
+    assert cache.get("b") is MISSING
+
+
+def test_invalidate_by_prefix(clock):
+    cache = ResponseCache(ttl_seconds=5, max_entries=8)
+    cache.set("http://b1/api/services/S1/metrics", 1)
+    cache.set("http://b1/api/services/S2/metrics", 2)
+    cache.set("http://b1/api/health", 3)
+    cache.set("http://b2/api/services/S1/metrics", 4)
+    assert cache.invalidate("http://b1/api/services") == 2
+    assert cache.get("http://b1/api/services/S1/metrics") is MISSING
+    assert cache.get("http://b1/api/health") == 3
+    assert cache.get("http://b2/api/services/S1/metrics") == 4
+    assert cache.invalidate() == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_stats_report_hit_rate(clock):
+    cache = ResponseCache(ttl_seconds=5, max_entries=4)
+    assert cache.stats()["hit_rate"] == 0.0
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_cache_needs_room_for_one_entry():
+    with pytest.raises(ValueError):
+        ResponseCache(ttl_seconds=5, max_entries=0)
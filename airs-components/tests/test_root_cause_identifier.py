@@ -0,0 +1,162 @@
+# tests/test_root_cause_identifier.py
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.stub_backend import StubBackend
+
+pytest.importorskip("langflow")
+from benchmarks._loader import load_components  # noqa: E402
+
+
+class _FailingBackend(StubBackend):
+    """Stub backend whose metrics endpoint fails for some services"""
+
+    def __init__(self, failing=(), **kwargs):
+        self.failing = set(failing)
+        super().__init__(**kwargs)
+
+    def handle_get(self, path, query=None):
+        parts = path.strip("/").split("/")
+        if parts[-1] == "metrics" and parts[2] in self.failing:
+            return 500, {"error": "Internal error"}, {}
+        return super().handle_get(path, query)
+
+
+@pytest.fixture
+def backend():
+    with StubBackend(fleet_size=8, critical_ratio=0.5) as backend:
+        yield backend
+
+
+def _analyze(backend, service_input):
+    component = load_components()["RootCauseIdentifier"]()
+    component.set(backend_url=backend.url, service_input=service_input)
+    text = asyncio.run(component.get_root_cause_analysis_async()).text
+    return json.loads(text) if text.startswith("{") else text
+
+
+def _severity(report):
+    return (
+        {"critical": 2, "degraded": 1, "warning": 1}.get(report["service_status"], 0),
+        report["critical_metrics_count"],
+        {"High": 2, "Medium": 1}.get(report["confidence"], 0),
+    )
+
+
+def test_all_critical_ranks_every_critical_service(backend):
+    result = _analyze(backend, "Root cause for all critical services")
+    assert result["mode"] == "batch"
+    assert sorted(r["service_id"] for r in result["services"]) == backend.critical_service_ids()
+    assert [r["rank"] for r in result["services"]] == [1, 2, 3, 4]
+    keys = [_severity(r) for r in result["services"]]
+    assert keys == sorted(keys, reverse=True)
+    assert result["summary"]["services_requested"] == result["summary"]["services_analyzed"] == 4
+    assert result["failed"] == []
+
+
+def test_all_critical_with_no_critical_services(backend):
+    with backend._lock:
+        for service in backend._services.values():
+            service["status"] = "healthy"
+    result = _analyze(backend, "Find root causes for every critical service")
+    assert result["mode"] == "batch"
+    assert result["services"] == [] and result["failed"] == []
+    assert result["summary"]["services_requested"] == 0
+    assert result["summary"]["most_common_root_cause"] is None
+
+
+def test_named_service_wins_over_all_critical(backend):
+    result = _analyze(backend, "Find root cause for S5, all its metrics look critical")
+    assert "mode" not in result
+    assert result["service_id"] == "S5"
+
+
+def test_named_services_are_batched(backend):
+    result = _analyze(backend, "Find root causes for S6, S1 and S2")
+    assert result["mode"] == "batch"
+    assert sorted(r["service_id"] for r in result["services"]) == ["S1", "S2", "S6"]
+    # The healthy service ranks below the critical ones
+    assert result["services"][-1]["service_id"] == "S6"
+
+
+def test_unfetchable_services_are_listed_as_failed():
+    with _FailingBackend(failing={"S2"}, fleet_size=8, critical_ratio=0.5) as backend:
+        result = _analyze(backend, "Find root causes for S1 and S2")
+    assert [r["service_id"] for r in result["services"]] == ["S1"]
+    assert result["failed"] == [{"service_id": "S2", "error": "Backend returned error: 500"}]
+    assert result["summary"]["failed_count"] == 1
+
+
+def test_unidentified_service_is_an_error(backend):
+    assert _analyze(backend, "Find the root cause").startswith("❌ Error identifying root cause: Could not identify")
+
+
+@pytest.mark.parametrize("service_input", [
+    "Find root cause for S1 related errors",
+    "What caused the latency across regions for Payment Gateway?",
+    "Is there a shared cause for S1?",
+])
+def test_one_named_service_gets_its_own_report(backend, service_input):
+    result = _analyze(backend, service_input)
+    assert "mode" not in result
+    assert result["service_id"] == "S1"
+    assert backend.requests["/services/{id}/metrics"] == 1
+
+
+def test_correlation_of_named_services(backend):
+    result = _analyze(backend, "Is there a shared cause for S1, S2 and S3?")
+    assert result["mode"] == "correlated"
+    assert result["services_analyzed"] == 3
+    assert backend.requests["/services/{id}/metrics"] == 3
+
+
+def test_correlation_without_named_services_covers_the_fleet(backend):
+    result = _analyze(backend, "Correlate the current failures")
+    assert result["mode"] == "correlated"
+    assert result["services_analyzed"] == 8
+    assert result["anomalous_count"] == 4
+
+
+def _report(root_cause, metrics, messages):
+    component = load_components()["RootCauseIdentifier"]()
+    health_data = {"name": "Service S9", "status": "critical", "metrics": metrics,
+                   "logs": [{"level": "ERROR", "message": message} for message in messages]}
+    log_analysis = {"root_cause": root_cause, "recent_errors": messages}
+    return component._build_root_cause_report("S9", health_data, log_analysis)
+
+
+CPU_BOUND = {"cpu": 96, "memory": 40, "latency": 120, "error_rate": 1}
+CPU_ERRORS = ["CPU saturated", "CPU throttled", "thread pool exhausted"]
+
+
+def test_confidence_is_the_posterior_of_the_reported_cause():
+    from airs_common.root_cause_scoring import rank_root_causes
+
+    report = _report("high_cpu_load", CPU_BOUND, CPU_ERRORS)
+    categories = ("high_cpu_usage", "memory_leak", "database_connection_issues", "high_latency")
+    ranked = rank_root_causes(["S9"], [CPU_BOUND], [[3, 0, 0, 0]], categories)[0]
+    assert report["root_cause_probability"] == ranked[0]["probability"] >= 0.6
+    assert report["confidence"] == "High"
+    assert report["candidate_causes"] == ranked[:3]
+
+
+def test_evidence_against_the_reported_cause_gives_low_confidence():
+    # Three errors used to mean High whatever the metrics said
+    report = _report("memory_exhaustion", CPU_BOUND, CPU_ERRORS)
+    assert report["root_cause_probability"] < 0.35
+    assert report["confidence"] == "Low"
+    assert report["candidate_causes"][0]["cause"] == "high_cpu_load"
+
+
+def test_cause_outside_the_scorer_gives_low_confidence():
+    report = _report("unknown", CPU_BOUND, CPU_ERRORS)
+    assert (report["root_cause_probability"], report["confidence"]) == (0.0, "Low")
+
+
+def test_batch_and_single_reports_agree(backend):
+    single = _analyze(backend, "Find root cause for S2")
+    batch = next(r for r in _analyze(backend, "Find root causes for S1 and S2")["services"] if r["service_id"] == "S2")
+    for key in ("root_cause", "confidence", "root_cause_probability", "candidate_causes"):
+        assert batch[key] == single[key]
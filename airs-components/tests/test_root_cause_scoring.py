@@ -0,0 +1,100 @@
+# tests/test_root_cause_scoring.py
+import copy
+import math
+import random
+
+import numpy as np
+import pytest
+
+from airs_common.root_cause_scoring import LIKELIHOODS, MAX_LOG_HITS, RootCauseScorer, rank_root_causes
+from airs_common.thresholds import CRITICAL, HEALTHY, UNKNOWN, WARNING
+
+CATEGORIES = ("high_cpu_usage", "memory_leak", "database_connection_issues", "high_latency")
+
+
+def _reference_posteriors(levels, counts):
+    """Naive Bayes over LIKELIHOODS, one cause at a time"""
+    scores = {}
+    for cause, table in LIKELIHOODS.items():
+        score = math.log(table["prior"] / sum(t["prior"] for t in LIKELIHOODS.values()))
+        for metric, level in zip(table["metrics"], levels):
+            if level != UNKNOWN:
+                row = table["metrics"][metric]
+                score += math.log(row[(HEALTHY, WARNING, CRITICAL).index(level)] / sum(row))
+        for category, count in zip(CATEGORIES, counts):
+            total = sum(t["logs"][category] for t in LIKELIHOODS.values())
+            score += min(count, MAX_LOG_HITS) * math.log(table["logs"][category] / total)
+        scores[cause] = score
+    top = max(scores.values())
+    weights = {cause: math.exp(score - top) for cause, score in scores.items()}
+    return [weights[cause] / sum(weights.values()) for cause in LIKELIHOODS]
+
+
+def test_posterior_matrix_matches_reference_naive_bayes():
+    rng = random.Random(24)
+    scorer = RootCauseScorer()
+    levels = np.array([[rng.choice([UNKNOWN, HEALTHY, WARNING, CRITICAL]) for _ in scorer.metrics] for _ in range(50)])
+    counts = np.array([[rng.randint(0, 8) for _ in scorer.categories] for _ in range(50)])
+    posteriors = scorer.posterior_matrix(levels, counts)
+    for row, service_levels, service_counts in zip(posteriors, levels.tolist(), counts.tolist()):
+        assert row == pytest.approx(_reference_posteriors(service_levels, service_counts))
+
+
+def test_without_evidence_the_general_cause_ranks_first():
+    scorer = RootCauseScorer()
+    posteriors = scorer.posterior_matrix(np.full((1, 4), UNKNOWN), np.zeros((1, 4)))
+    ranked = scorer.rank(posteriors)[0]
+    assert ranked[0] == {"cause": "general_performance_issue", "probability": 0.3}
+    assert sum(candidate["probability"] for candidate in ranked) == pytest.approx(1.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("metrics, counts, expected", [
+    ({"cpu": 95, "memory": 40, "latency": 100, "error_rate": 1}, [3, 0, 0, 0], "high_cpu_load"),
+    ({"cpu": 30, "memory": 95, "latency": 100, "error_rate": 1}, [0, 4, 0, 0], "memory_exhaustion"),
+    ({"cpu": 30, "memory": 40, "latency": 600, "error_rate": 12}, [0, 0, 5, 0], "database_bottleneck"),
+    ({"cpu": 30, "memory": 40, "latency": 900, "error_rate": 2}, [0, 0, 0, 2], "network_latency"),
+])
+def test_clear_evidence_ranks_its_cause_first(metrics, counts, expected):
+    ranked = rank_root_causes(["S9"], [metrics], np.array([counts]), CATEGORIES, top=1)
+    assert ranked[0][0]["cause"] == expected
+
+
+def test_log_hits_are_capped():
+    scorer = RootCauseScorer()
+    levels = np.full((2, 4), UNKNOWN)
+    posteriors = scorer.posterior_matrix(levels, np.array([[MAX_LOG_HITS, 0, 0, 0], [500, 0, 0, 0]]))
+    np.testing.assert_allclose(posteriors[0], posteriors[1])
+
+
+def test_batch_scores_match_one_service_at_a_time():
+    metrics_list = [{"cpu": 90, "memory": 50}, {"latency": 700}, {}, {"cpu": "n/a", "error_rate": 7}]
+    counts = np.array([[1, 0, 0, 0], [0, 0, 2, 3], [0, 0, 0, 0], [0, 6, 0, 0]])
+    service_ids = ["S1", "S2", "S3", "S4"]
+    batch = rank_root_causes(service_ids, metrics_list, counts, CATEGORIES)
+    single = [rank_root_causes([sid], [m], c[None, :], CATEGORIES)[0] for sid, m, c in zip(service_ids, metrics_list, counts)]
+    assert batch == single
+
+
+def test_count_columns_are_matched_by_category_name():
+    metrics = [{"cpu": 50}]
+    reordered = rank_root_causes(["S1"], metrics, np.array([[0, 4, 0, 0, 9]]),
+                                 ("high_latency", "memory_leak", "high_cpu_usage", "database_connection_issues", "disk"))
+    canonical = rank_root_causes(["S1"], metrics, np.array([[0, 4, 0, 0]]), CATEGORIES)
+    assert reordered == canonical
+
+
+def test_empty_batch():
+    assert rank_root_causes([], [], np.zeros((0, 4)), CATEGORIES) == []
+
+
+def test_non_positive_likelihoods_are_rejected():
+    likelihoods = copy.deepcopy(LIKELIHOODS)
+    likelihoods["high_cpu_load"]["logs"]["high_latency"] = 0.0
+    with pytest.raises(ValueError):
+        RootCauseScorer(likelihoods)
+
+
+def test_rank_keeps_table_order_on_ties():
+    scorer = RootCauseScorer()
+    ranked = scorer.rank(np.full((1, len(scorer.causes)), 1 / len(scorer.causes)), top=2)[0]
+    assert [candidate["cause"] for candidate in ranked] == list(scorer.causes[:2])
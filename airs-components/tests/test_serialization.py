@@ -0,0 +1,59 @@
+# tests/test_serialization.py
+import numpy as np
+import pytest
+
+from airs_common import serialization
+from airs_common.serialization import JsonCodec, OrjsonCodec, StdlibCodec, configure_json_codec, dumps, loads
+
+DOCUMENT = {
+    "component": "HealthChecker",
+    "status": "🔴 critical",
+    "message": "❌ Ünïcödé, \"quoted\", back\\slash, tab\t and newline\n",
+    "control": "\x00\x1f\x7f",
+    "summary": {"total": 3, "ratio": 0.25, "negative": -1.5, "large": 123456789012, "flag": True, "none": None},
+    "services": [{"id": "S1", "cpu": 91.2, "levels": ["critical", "warning"]}, {"id": "S2", "cpu": 0.0}],
+    "empty": {"list": [], "dict": {}},
+}
+
+
+def test_stdlib_writes_non_ascii_as_utf8():
+    assert StdlibCodec().dumps({"status": "✅ healthy"}) == '{"status":"✅ healthy"}'
+
+
+def test_stdlib_encodes_numpy_values():
+    assert StdlibCodec().dumps({"a": np.float64(1.5), "b": np.arange(3)}) == '{"a":1.5,"b":[0,1,2]}'
+
+
+def test_codecs_produce_identical_text():
+    pytest.importorskip("orjson")
+    assert OrjsonCodec().dumps(DOCUMENT) == StdlibCodec().dumps(DOCUMENT)
+
+
+def test_codecs_round_trip_each_other():
+    pytest.importorskip("orjson")
+    stdlib, fast = StdlibCodec(), OrjsonCodec()
+    assert fast.loads(stdlib.dumps(DOCUMENT).encode()) == DOCUMENT
+    assert stdlib.loads(fast.dumps(DOCUMENT).encode()) == DOCUMENT
+
+
+def test_configure_json_codec_switches_module_functions():
+    previous = serialization.get_json_codec().name
+    try:
+        configure_json_codec("stdlib")
+        assert serialization.get_json_codec().name == "stdlib"
+        assert loads(dumps(DOCUMENT)) == DOCUMENT
+        with pytest.raises(ValueError):
+            configure_json_codec("yaml")
+    finally:
+        configure_json_codec(previous)
+
+
+def test_codec_missing_a_method_fails_when_created():
+    class EncodeOnly(JsonCodec):
+        def dumps(self, obj):
+            return "{}"
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
+    with pytest.raises(TypeError):
+        JsonCodec()
@@ -0,0 +1,59 @@
+# tests/test_service_lister.py
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.stub_backend import StubBackend
+
+pytest.importorskip("langflow")
+from benchmarks._loader import load_components  # noqa: E402
+
+
+class _RecordingBackend(StubBackend):
+    """Stub backend that remembers the query of every /services request"""
+
+    def __init__(self, **kwargs):
+        self.queries = []
+        super().__init__(**kwargs)
+
+    def handle_get(self, path, query=None):
+        if path.strip("/") == "api/services":
+            self.queries.append({key: values[0] for key, values in (query or {}).items()})
+        return super().handle_get(path, query)
+
+
+@pytest.fixture
+def backend():
+    with _RecordingBackend(fleet_size=12, critical_ratio=0.25) as backend:
+        yield backend
+
+
+def _overview(backend, **inputs):
+    component = load_components()["ServiceLister"]()
+    component.set(backend_url=backend.url, **inputs)
+    return json.loads(asyncio.run(component.get_services_overview_async()).text)
+
+
+def test_counts_only_page_asks_the_backend_for_no_services(backend):
+    result = _overview(backend, query="How many critical services?", status_filter="critical", page_size=2)
+    assert result["summary"] == {"matching_services": 3, "returned": 0, "offset": 0}
+    assert "services" not in result
+    assert result["next_page_cursor"] is None
+    assert backend.queries[-1] == {"status": "critical", "offset": "0", "limit": "0"}
+
+
+def test_listed_page_uses_the_page_size(backend):
+    result = _overview(backend, status_filter="critical", page_size=2)
+    assert result["summary"] == {"matching_services": 3, "returned": 2, "offset": 0}
+    assert len(result["services"]) == 2
+    assert result["next_page_cursor"] == "2"
+    assert backend.queries[-1]["limit"] == "2"
+
+
+def test_counts_only_without_backend_filters_counts_locally():
+    with _RecordingBackend(fleet_size=12, critical_ratio=0.25, filters=False) as backend:
+        result = _overview(backend, query="counts only", status_filter="critical", page_size=2)
+    assert result["filtered_by"] == "local"
+    assert result["summary"] == {"matching_services": 3, "returned": 0, "offset": 0}
+    assert "services" not in result
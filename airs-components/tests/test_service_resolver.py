@@ -0,0 +1,186 @@
+# tests/test_service_resolver.py
+import asyncio
+
+import pytest
+
+from airs_common.service_resolver import ServiceResolver, _refresh_if_stale, resolve_service_id, resolve_service_ids
+
+# The backend's seeded catalog (airs-backend/models/Service.js)
+CATALOG = [
+    {"id": "S1", "name": "Payment Gateway"},
+    {"id": "S2", "name": "User Auth API"},
+    {"id": "S3", "name": "Inventory Service"},
+    {"id": "S4", "name": "Reporting Engine"},
+    {"id": "S5", "name": "Search Indexer"},
+    {"id": "S6", "name": "Log Ingestion"},
+]
+
+
+@pytest.fixture
+def resolver():
+    resolver = ServiceResolver()
+    resolver.load(CATALOG)
+    return resolver
+
+
+# Queries and the service the pre-resolver keyword mapping picked for them
+@pytest.mark.parametrize("query, expected", [
+    ("Check health of service S1", "S1"),
+    ("What's the status of Payment Gateway?", "S1"),
+    ("Analyze logs for service S1", "S1"),
+    ("Check error patterns in auth service", "S2"),
+    ("Check log errors for the auth service", "S2"),
+    ("Find root cause for service S3", "S3"),
+    ("What's causing Payment Gateway issues?", "S1"),
+    ("Recommend actions for service S4 with high CPU usage", "S4"),
+    ("Restart service S1", "S1"),
+    ("Scale instances for Payment Gateway", "S1"),
+    ("Check if the inventory service is healthy", "S3"),
+    ("Analyze the reporting engine logs", "S4"),
+    ("Find root cause for the search indexer log errors", "S5"),
+    ("Analyze logs for the log ingestion service", "S6"),
+    ("Check the log service", "S6"),
+    ("Gateway timeout errors on the search service", "S5"),
+])
+def test_resolve_matches_baseline_queries(resolver, query, expected):
+    assert resolver.resolve(query) == expected
+
+
+def test_explicit_id_beats_name_tokens(resolver):
+    assert resolver.resolve("auth errors, see S4") == "S4"
+
+
+def test_full_name_beats_single_tokens(resolver):
+    assert resolver.resolve("search is slow, check the log ingestion service") == "S6"
+
+
+def test_ids_are_matched_whole(resolver):
+    assert resolver.resolve("service S10") is None
+    assert resolver.resolve("nothing relevant here") is None
+
+
+def test_resolve_all_ignores_operational_words_next_to_real_names(resolver):
+    assert resolver.resolve_all("Find root cause for the search indexer log errors") == ["S5"]
+    assert resolver.resolve_all("Check log errors for the auth service") == ["S2"]
+
+
+def test_resolve_all_keeps_order_of_mention(resolver):
+    assert resolver.resolve_all("Compare S3, the auth API and Payment Gateway") == ["S3", "S2", "S1"]
+
+
+def test_resolve_all_falls_back_to_operational_words(resolver):
+    assert resolver.resolve_all("What is wrong with the log service?") == ["S6"]
+
+
+def test_shared_name_tokens_are_not_aliases():
+    resolver = ServiceResolver()
+    resolver.load([{"id": "A", "name": "Orders Primary"}, {"id": "B", "name": "Orders Replica"}])
+    assert resolver.resolve("orders are failing") is None
+    assert resolver.resolve("orders replica") == "B"
+
+
+def test_catalog_is_reloaded_when_stale():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return CATALOG
+
+    async def run():
+        backend = "http://resolver-reload.test"
+        first = await resolve_service_id(backend, "payment gateway", fetch)
+        second = await resolve_service_id(backend, "inventory", fetch)
+        return first, second
+
+    assert asyncio.run(run()) == ("S1", "S3")
+    assert len(calls) == 1
+
+
+def test_stale_catalog_is_kept_when_refresh_fails():
+    resolver = ServiceResolver(ttl_seconds=0)
+    resolver.load(CATALOG)
+
+    async def failing_fetch():
+        raise ConnectionError("backend down")
+
+    asyncio.run(_refresh_if_stale(resolver, failing_fetch))
+    assert resolver.resolve("payment gateway") == "S1"
+
+
+def _counting_fetch(catalog):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return list(catalog)
+
+    return fetch, calls
+
+
+def _resolver_at(monkeypatch, backend, **kwargs):
+    from airs_common import service_resolver
+
+    resolver = ServiceResolver(**kwargs)
+    monkeypatch.setitem(service_resolver._resolvers, backend, resolver)
+    return resolver
+
+
+def test_unknown_ids_follow_the_catalog_id_shape(resolver):
+    assert resolver.unknown_ids("compare S1, S7 and s12") == ["s7", "s12"]
+    assert resolver.unknown_ids("p95 latency on ec2 for S3") == []
+
+
+def test_unknown_id_forces_one_early_reload(monkeypatch):
+    backend = "http://resolver-new-id.test"
+    _resolver_at(monkeypatch, backend)
+    catalog = list(CATALOG)
+    fetch, calls = _counting_fetch(catalog)
+
+    async def run():
+        before = await resolve_service_id(backend, "check S1", fetch)
+        catalog.append({"id": "S7", "name": "Billing Worker"})
+        added = await resolve_service_id(backend, "check S7", fetch)
+        # Rate limited: another unknown ID right after a reload does not refetch
+        missing = await resolve_service_id(backend, "check S8", fetch)
+        return before, added, missing
+
+    assert asyncio.run(run()) == ("S1", "S7", None)
+    assert len(calls) == 2
+
+
+def test_unknown_id_in_a_list_forces_a_reload(monkeypatch):
+    backend = "http://resolver-new-ids.test"
+    _resolver_at(monkeypatch, backend, min_refresh_seconds=0)
+    catalog = list(CATALOG)
+    fetch, calls = _counting_fetch(catalog)
+
+    async def run():
+        await resolve_service_ids(backend, "S1", fetch)
+        catalog.append({"id": "S7", "name": "Billing Worker"})
+        return await resolve_service_ids(backend, "compare S1 and S7", fetch)
+
+    assert asyncio.run(run()) == ["S1", "S7"]
+    assert len(calls) == 2
+
+
+def test_known_ids_and_names_do_not_reload(monkeypatch):
+    backend = "http://resolver-known.test"
+    _resolver_at(monkeypatch, backend, min_refresh_seconds=0)
+    fetch, calls = _counting_fetch(CATALOG)
+
+    async def run():
+        return [await resolve_service_id(backend, query, fetch) for query in ("S1", "payment gateway", "p95 latency")]
+
+    assert asyncio.run(run()) == ["S1", "S1", None]
+    assert len(calls) == 1
+
+
+def test_failed_early_reload_keeps_the_catalog(monkeypatch):
+    backend = "http://resolver-early-failure.test"
+    resolver = _resolver_at(monkeypatch, backend, min_refresh_seconds=0)
+    resolver.load(CATALOG)
+
+    async def failing_fetch():
+        raise ConnectionError("backend down")
+
+    assert asyncio.run(resolve_service_id(backend, "S7 or S2", failing_fetch)) == "S2"
@@ -0,0 +1,178 @@
+# tests/test_thresholds.py
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from airs_common.thresholds import (
+    CRITICAL, DEFAULT_THRESHOLDS, HEALTHY, UNKNOWN, WARNING, ThresholdProfiles, ThresholdTable, _ProfileRegistry,
+)
+
+PROFILES = {
+    "default": {"cpu": {"warn": 60, "crit": 80}},
+    "tiers": {"latency-sensitive": {"latency": {"warn": 150, "crit": 250}}},
+    "services": {
+        "S1": {"tier": "latency-sensitive"},
+        "S4": {"thresholds": {"memory": {"warn": 85, "crit": 95}}},
+    },
+}
+
+
+def test_table_levels_match_backend_boundaries():
+    table = ThresholdTable(DEFAULT_THRESHOLDS)
+    assert table.assess("cpu", 69.9) == "healthy"
+    assert table.assess("cpu", 70) == "warning"
+    assert table.assess("cpu", 85) == "critical"
+    assert table.assess("cpu", "n/a") == "unknown"
+    assert table.assess("disk", 99) == "unknown"
+
+
+def test_classify_matrix_is_vectorized_over_services():
+    table = ThresholdTable(DEFAULT_THRESHOLDS)
+    values = table.values_matrix([{"cpu": 10, "memory": 80}, {"cpu": 90, "latency": None}])
+    levels = table.classify_matrix(values)
+    assert levels.shape == (2, len(table.metrics))
+    assert levels[0, table.columns["cpu"]] == HEALTHY
+    assert levels[0, table.columns["memory"]] == WARNING
+    assert levels[1, table.columns["cpu"]] == CRITICAL
+    assert levels[1, table.columns["latency"]] == UNKNOWN
+
+
+def test_tables_are_read_only():
+    table = ThresholdTable(DEFAULT_THRESHOLDS)
+    with pytest.raises(ValueError):
+        table.warn[0] = 1
+
+
+def test_profiles_layer_default_tier_and_service():
+    profiles = ThresholdProfiles(PROFILES)
+    assert profiles.classify("S9", {"cpu": 65}) == {"cpu": "warning"}
+    assert profiles.classify("S1", {"latency": 200, "cpu": 65}) == {"latency": "warning", "cpu": "warning"}
+    assert profiles.classify("S2", {"latency": 200}) == {"latency": "healthy"}
+    assert profiles.classify("S4", {"memory": 90}) == {"memory": "warning"}
+    assert profiles.table_for("S1").name == "tier:latency-sensitive"
+    assert profiles.table_for("S4").name == "service:S4"
+
+
+def test_classify_many_matches_one_at_a_time():
+    profiles = ThresholdProfiles(PROFILES)
+    service_ids = ["S1", "S2", "S4", None]
+    metrics = [{"cpu": 65, "latency": 200, "memory": 90, "error_rate": 7}] * 4
+    assert profiles.classify_many(service_ids, metrics) == [
+        profiles.classify(service_id, m) for service_id, m in zip(service_ids, metrics)
+    ]
+
+
+@pytest.mark.parametrize("config", [
+    [],
+    "profiles",
+    {"tiers": []},
+    {"tiers": "latency-sensitive"},
+    {"services": ["S1"]},
+    {"default": []},
+    {"services": {"S1": "fast"}},
+    {"services": {"S1": {"tier": "missing"}}},
+    {"default": {"cpu": {"warn": 90, "crit": 80}}},
+    {"default": {"cpu": {"warn": 90}}, "tiers": {"t": {"disk": {"warn": 1, "crit": 2}}}},
+])
+def test_malformed_profiles_raise_value_error(config):
+    with pytest.raises(ValueError):
+        ThresholdProfiles(config)
+
+
+def test_malformed_inline_profiles_fall_back_to_defaults():
+    registry = _ProfileRegistry("", json.dumps({"tiers": ["latency-sensitive"]}), 5)
+    assert registry.last_error
+    np.testing.assert_array_equal(registry.get().default.warn, ThresholdProfiles().default.warn)
+
+
+def test_file_profiles_reload_and_keep_last_good(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps(PROFILES))
+    registry = _ProfileRegistry(str(path), "", 0)
+    assert registry.get().classify("S9", {"cpu": 65}) == {"cpu": "warning"}
+
+    path.write_text(json.dumps({"default": {"cpu": {"warn": 50, "crit": 60}}}))
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    assert registry.get().classify("S9", {"cpu": 55}) == {"cpu": "warning"}
+
+    path.write_text(json.dumps({"services": []}))
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 2_000_000_000))
+    assert registry.get().classify("S9", {"cpu": 55}) == {"cpu": "warning"}
+    assert registry.last_error
+
+
+def test_load_replaces_file_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps(PROFILES))
+    registry = _ProfileRegistry(str(path), "", 0)
+    registry.load(None)
+    assert registry.get().classify("S9", {"cpu": 65}) == {"cpu": "healthy"}
+
+
+class _ProfilesHandler(BaseHTTPRequestHandler):
+    document = PROFILES
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        body = json.dumps(self.document).encode()
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def profiles_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ProfilesHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/profiles"
+    server.shutdown()
+    server.server_close()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_url_profiles_load_in_background_and_reload(profiles_url):
+    _ProfilesHandler.document = PROFILES
+    registry = _ProfileRegistry("", "", 0, profiles_url)
+    _wait_for(lambda: registry.get().classify("S9", {"cpu": 65}) == {"cpu": "warning"})
+
+    _ProfilesHandler.document = {"default": {"cpu": {"warn": 50, "crit": 60}}}
+    _wait_for(lambda: registry.get().classify("S9", {"cpu": 55}) == {"cpu": "warning"})
+
+
+def test_url_profiles_keep_last_good_on_bad_document(profiles_url):
+    _ProfilesHandler.document = PROFILES
+    registry = _ProfileRegistry("", "", 0, profiles_url)
+    _wait_for(lambda: registry.get().classify("S9", {"cpu": 65}) == {"cpu": "warning"})
+
+    _ProfilesHandler.document = {"tiers": ["broken"]}
+    _wait_for(lambda: registry.get() is not None and registry.last_error is not None)
+    assert registry.get().classify("S9", {"cpu": 65}) == {"cpu": "warning"}
+
+
+def test_unreachable_url_keeps_defaults():
+    registry = _ProfileRegistry("", "", 3600, "http://127.0.0.1:9/profiles")
+    _wait_for(lambda: registry.last_error is not None)
+    assert registry.get().classify("S9", {"cpu": 65}) == {"cpu": "healthy"}